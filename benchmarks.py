@@ -0,0 +1,252 @@
+"""
+Micro- and macro-benchmarks for Vector, Spaceship and Simulation.
+
+    python benchmarks.py                        # run, write benchmark_results.json, compare to baseline
+    python benchmarks.py --save-baseline        # run and store the results as the new baseline
+    python benchmarks.py --quick                # fewer repeats, not compared to the baseline
+    python benchmarks.py --fail-on-slowdown     # also fail on timings worse than the tolerance
+
+Timings on a shared machine vary by up to about 25% between runs, so a
+benchmark worse than the baseline by more than the tolerance is only a
+warning unless --fail-on-slowdown is given. The checks that don't depend on
+timing noise gate changes before they reach the cluster: the run exits with
+status 1 if a benchmark is missing from the baseline or the run, or if a cold
+start of `spaceship-sim run` is over its budget.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Union
+
+from spaceship_sim.vector import Vector
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.recorder import OutcomeRecorder
+from spaceship_sim.sweep import run_sweep
+
+
+RESULTS_PATH = Path("benchmark_results.json")
+BASELINE_PATH = Path("benchmark_baseline.json")
+COLD_START_BUDGET_MS = 250.0
+"""Most a fresh `spaceship-sim run` of one duel may take, interpreter start-up included"""
+
+
+@dataclasses.dataclass
+class Measurement:
+    name: str
+    value: float
+    unit: str
+    lower_is_better: bool = True
+
+
+def _per_op(name: str, statement: Callable[[], object], number: int, repeat: int) -> Measurement:
+    """Best of `repeat` runs of `number` calls, in nanoseconds per call"""
+    best = min(timeit.repeat(statement, number=number, repeat=repeat))
+    return Measurement(name, best / number * 1e9, "ns/op")
+
+
+def vector_benchmarks(number: int, repeat: int) -> list[Measurement]:
+    a = Vector(1.0, 2.0, 3.0)
+    b = Vector(-4.0, 0.5, 2.5)
+    return [
+        _per_op("vector.construct", lambda: Vector(1.0, 2.0, 3.0), number, repeat),
+        _per_op("vector.add", lambda: a + b, number, repeat),
+        _per_op("vector.sub", lambda: a - b, number, repeat),
+        _per_op("vector.mul", lambda: a * 2.5, number, repeat),
+        _per_op("vector.dot", lambda: a.dot(b), number, repeat),
+        _per_op("vector.cross", lambda: a.cross(b), number, repeat),
+        _per_op("vector.angle", lambda: Vector(1.0, 2.0, 3.0).angle(b), number, repeat),
+        _per_op("vector.rotate_towards", lambda: Vector(1.0, 2.0, 3.0).rotate_towards(b, 0.1), number, repeat),
+        # A fresh vector each time, so this is construction plus an uncached normalize
+        _per_op("vector.normalized", lambda: Vector(1.0, 2.0, 3.0).normalized, number, repeat),
+    ]
+
+
+def spaceship_benchmarks(number: int, repeat: int) -> list[Measurement]:
+    def move() -> None:
+        ship.move(enemy_position=enemy.position, enemy_direction=enemy.direction)
+
+    rng = random.Random(1)
+    ship = Spaceship(position=Vector(0.0, 0.0, 0.0), direction=Vector.random_direction(rng))
+    enemy = Spaceship(position=Vector(500.0, 200.0, -100.0), direction=Vector.random_direction(rng))
+    ship.enemy = enemy
+    enemy.enemy = ship
+    return [_per_op("spaceship.move", move, number, repeat)]
+
+
+def _random_duel(seed: int, ticks: int, adaptive: bool = False) -> Simulation:
+    rng = random.Random(seed)
+    return Simulation(
+        Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+        Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+        ticks=ticks,
+        recorder=OutcomeRecorder(),
+        adaptive=adaptive,
+        rng=rng,
+    )
+
+
+def simulation_benchmarks(duels: int) -> list[Measurement]:
+    measurements = []
+    for name, adaptive in (("simulation", False), ("simulation.adaptive", True)):
+        sims = [_random_duel(seed, ticks=10_000, adaptive=adaptive) for seed in range(duels)]
+        start = time.perf_counter()
+        for sim in sims:
+            sim.run()
+        elapsed = time.perf_counter() - start
+        ticks = sum(sim.tick_count for sim in sims)
+        measurements += [
+            Measurement(f"{name}.ticks_per_second", ticks / elapsed, "ticks/s", lower_is_better=False),
+            Measurement(f"{name}.duels_per_second", duels / elapsed, "duels/s", lower_is_better=False),
+        ]
+    return measurements
+
+
+def memory_benchmarks(duels: int) -> list[Measurement]:
+    """Peak traced memory over a serial run_sims.py-style sweep, with and without per-duel summaries"""
+    measurements = []
+    for name, keep_duels in (("sweep.peak_memory", True), ("sweep.streaming_peak_memory", False)):
+        tracemalloc.start()
+        try:
+            run_sweep(duels, master_seed=40351, workers=1, keep_duels=keep_duels)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        measurements.append(Measurement(name, peak / 1024, "KiB"))
+    return measurements
+
+
+def cold_start_benchmarks(repeat: int) -> list[Measurement]:
+    """Best wall time of a fresh interpreter running `spaceship-sim run`, as a worker or a shell user would"""
+    command = [sys.executable, "-m", "spaceship_sim.cli", "run", "--ticks", "1000"]
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, cwd=Path(__file__).parent)
+        best = min(best, time.perf_counter() - start)
+    return [Measurement("cli.run.cold_start", best * 1000, "ms")]
+
+
+def run_all(quick: bool = False) -> list[Measurement]:
+    number, repeat = (10_000, 3) if quick else (100_000, 5)
+    duels = 5 if quick else 25
+    return [
+        *vector_benchmarks(number, repeat),
+        *spaceship_benchmarks(number // 10, repeat),
+        *simulation_benchmarks(duels),
+        *memory_benchmarks(duels),
+        *cold_start_benchmarks(repeat),
+    ]
+
+
+def save(measurements: list[Measurement], path: Path) -> None:
+    document = {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "benchmarks": {
+            measurement.name: dataclasses.asdict(measurement)
+            for measurement
+            in measurements
+        },
+    }
+    path.write_text(json.dumps(document, indent=2), encoding="utf8")
+
+
+def missing(measurements: list[Measurement], baseline_path: Path) -> list[str]:
+    """Describe every benchmark that is in only one of the measurements and the baseline, since it can't be checked"""
+    baseline = json.loads(baseline_path.read_text(encoding="utf8"))["benchmarks"]
+    measured = {measurement.name for measurement in measurements}
+    return [
+        *(
+            f"{name}: in the baseline but no longer measured, save a new baseline with --save-baseline"
+            for name in sorted(baseline.keys() - measured)
+        ),
+        *(
+            f"{name}: not in the baseline, save a new baseline with --save-baseline"
+            for name in sorted(measured - baseline.keys())
+        ),
+    ]
+
+
+def compare(
+    measurements: list[Measurement],
+    baseline_path: Path,
+    tolerance: float,
+) -> list[str]:
+    """Describe every measurement more than `tolerance` (a fraction) worse than the baseline"""
+    baseline = json.loads(baseline_path.read_text(encoding="utf8"))["benchmarks"]
+    regressions = []
+    for measurement in measurements:
+        if measurement.name not in baseline:
+            continue
+        old = baseline[measurement.name]["value"]
+        if measurement.lower_is_better:
+            change = measurement.value / old - 1.0
+        else:
+            change = old / measurement.value - 1.0
+        if change > tolerance:
+            regressions.append(
+                f"{measurement.name}: {old:.4g} -> {measurement.value:.4g} {measurement.unit} ({change:+.0%} worse)"
+            )
+    return regressions
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and duels, not compared to the baseline")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH, help=f"defaults to {RESULTS_PATH}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help=f"defaults to {BASELINE_PATH}")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown, as a fraction. Defaults to 0.3")
+    parser.add_argument("--fail-on-slowdown", action="store_true", help="exit with status 1 on slowdowns, not just warn")
+    args = parser.parse_args(argv)
+
+    measurements = run_all(quick=args.quick)
+    width = max(len(measurement.name) for measurement in measurements)
+    for measurement in measurements:
+        print(f"{measurement.name:<{width}}  {measurement.value:>14.2f} {measurement.unit}")
+
+    save(measurements, args.output)
+    if args.save_baseline:
+        save(measurements, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    failures = []
+    cold_start = next(measurement for measurement in measurements if measurement.name == "cli.run.cold_start")
+    if cold_start.value > COLD_START_BUDGET_MS:
+        failures.append(f"{cold_start.name}: {cold_start.value:.4g} ms is over the {COLD_START_BUDGET_MS:.4g} ms budget")
+    if args.quick:
+        # Fewer repeats are noisier than the baseline's, so their timings say nothing about regressions
+        print("Quick run, not compared to the baseline")
+    elif not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, nothing to compare")
+    else:
+        failures += missing(measurements, args.baseline)
+        slowdowns = compare(measurements, args.baseline, args.tolerance)
+        if args.fail_on_slowdown:
+            failures += slowdowns
+        else:
+            for slowdown in slowdowns:
+                print(f"WARNING {slowdown}")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
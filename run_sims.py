@@ -1,72 +1,26 @@
-from collections import Counter
-import random
-from vector import Vector
-from spaceship import Spaceship
-from simulation import Simulation
+from spaceship_sim.sweep import run_sweep
 
 SIM_COUNT = 100
 MAX_DISTNACE = 1000.0
-random.seed(40351)
-
-results = []
-initial_distance = []
-initial_ship1_angle = []
-initial_ship2_angle = []
-simulation_length = []
-result_counter = Counter()
-
-for sim_number in range(SIM_COUNT):
-    ship1 = Spaceship(
-        position=Vector.random_direction() * MAX_DISTNACE,
-        direction=Vector.random_direction(),
-    )
-    ship2 = Spaceship(
-        # position=Vector(random.random() * 500.0, 0.0, 0.0),
-        position=Vector.random_direction() * MAX_DISTNACE,
-        direction=Vector.random_direction(),
-    )
-    sim = Simulation(ship1, ship2, ticks=10_000)
-    print(len(sim.data), sim.data[-1].result)
-
-    results.append(sim.data[-1].result)
-    initial_distance.append(sim.data[0].ship_distance)
-    initial_ship1_angle.append(sim.data[0].ship1_angle_to_enemy)
-    initial_ship2_angle.append(sim.data[0].ship2_angle_to_enemy)
-    simulation_length.append(len(sim.data))
-    result_counter[sim.data[-1].result] += 1
-
-import matplotlib.pyplot as plt
-# plt.scatter(initial_distance, results)
-
-fig, [[ax1, ax2], [ax3, ax4]] = plt.subplots(2, 2)
-ax1: plt.Axes
-ax2: plt.Axes
-ax3: plt.Axes
-ax4: plt.Axes
+MASTER_SEED = 40351
+WORKERS = None  # One per CPU
 
-ax1.scatter(initial_distance, results)
-ax1.set_title(f"Initial distance")
-ax1.set_xlabel(f"Results by initial distance")
-ax1.set_ylabel(f"Result")
 
-ax2.scatter(simulation_length, results)
-ax2.set_title(f"Simulation length (ticks)")
-ax2.set_xlabel(f"Results by Simulation length")
-ax2.set_ylabel(f"Result")
-
-ax3.scatter(initial_distance, simulation_length)
-ax3.set_title(f"Simulation length by initial distance")
-ax3.set_xlabel(f"Initial distance")
-ax3.set_ylabel(f"Length (ticks)")
-
-
-ax4.bar(result_counter.keys(), result_counter.values())
-ax4.set_title(f"Total result counts")
-ax4.set_xlabel(f"Result")
-ax4.set_ylabel(f"Count")
+if __name__ == "__main__":
+    sweep = run_sweep(
+        SIM_COUNT,
+        master_seed=MASTER_SEED,
+        workers=WORKERS,
+        max_distance=MAX_DISTNACE,
+        ticks=10_000,
+    )
+    for duel in sweep.duels:
+        print(duel.ticks, duel.result)
+    print(sweep.summary())
 
+    from spaceship_sim.plotting import plot_sweep
 
-plt.show()
+    plot_sweep(sweep)
 
 
 
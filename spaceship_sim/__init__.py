@@ -0,0 +1,11 @@
+"""
+Spaceship duel simulations.
+
+Import what you need from the modules, like `spaceship_sim.simulation`.
+Nothing is imported here, so `spaceship-sim run` only loads what it uses and
+starts quickly.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
@@ -0,0 +1,176 @@
+"""
+Streaming statistics for sweeps of many duels.
+
+A `SweepAggregate` takes duels one at a time and keeps only counts: results,
+histograms and win rates binned by initial geometry. Its memory use doesn't
+grow with the number of duels, and aggregates of separate chunks of a sweep
+`merge()` into exactly the aggregate of the whole sweep, in any order.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import math
+from collections import Counter
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    from spaceship_sim.sweep import DuelSummary
+
+
+class Histogram:
+    """Counts of values in `bins` equal-width bins from `low` to `high`.
+    Values outside the range are counted in `underflow` and `overflow`."""
+    def __init__(self, low: float, high: float, bins: int) -> None:
+        if not high > low:
+            raise ValueError(f"high must be greater than low, got {low} and {high}")
+        if bins < 1:
+            raise ValueError(f"bins must be at least 1, got {bins}")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts = [0] * bins
+        self.underflow = 0
+        self.overflow = 0
+
+    def bin(self, value: float) -> Union[int, None]:
+        """Index of the bin `value` falls in, or None if it's out of range. `high` goes in the last bin."""
+        if value < self.low or value > self.high or math.isnan(value):
+            return None
+        return min(int((value - self.low) / (self.high - self.low) * self.bins), self.bins - 1)
+
+    def add(self, value: float) -> None:
+        number = self.bin(value)
+        if number is not None:
+            self.counts[number] += 1
+        elif value < self.low:
+            self.underflow += 1
+        else:
+            self.overflow += 1
+
+    @property
+    def edges(self) -> list[float]:
+        """The `bins + 1` bin edges"""
+        width = (self.high - self.low) / self.bins
+        return [self.low + number * width for number in range(self.bins)] + [self.high]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts) + self.underflow + self.overflow
+
+    def _check_compatible(self, other: "Histogram") -> None:
+        if (self.low, self.high, self.bins) != (other.low, other.high, other.bins):
+            raise ValueError(
+                f"Can't merge histograms with different bins: "
+                f"{(self.low, self.high, self.bins)} and {(other.low, other.high, other.bins)}"
+            )
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the counts of another histogram with the same bins"""
+        self._check_compatible(other)
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+
+class BinnedResults(Histogram):
+    """A histogram that also counts each result in each bin"""
+    def __init__(self, low: float, high: float, bins: int) -> None:
+        super().__init__(low, high, bins)
+        self.results = [Counter() for _ in range(bins)]
+
+    def add_result(self, value: float, result: str) -> None:
+        self.add(value)
+        number = self.bin(value)
+        if number is not None:
+            self.results[number][result] += 1
+
+    def rates(self, result: str) -> list[Union[float, None]]:
+        """Fraction of the duels in each bin that ended with `result`. None for empty bins."""
+        return [
+            counter[result] / count if count else None
+            for counter, count
+            in zip(self.results, self.counts)
+        ]
+
+    def merge(self, other: "BinnedResults") -> None:
+        super().merge(other)
+        for mine, theirs in zip(self.results, other.results):
+            mine.update(theirs)
+
+
+class SweepAggregate:
+    """Running statistics of a sweep, fed one duel at a time with `add()`"""
+    def __init__(
+        self,
+        max_distance: float = 1000.0,
+        ticks: int = 10_000,
+        bins: int = 20,
+    ) -> None:
+        """_summary_
+
+        Args:
+            max_distance (float, optional): Distance of each ship from the origin at the start, which bounds the initial distance at twice this. Defaults to 1000.0.
+            ticks (int, optional): Tick limit of each duel. Defaults to 10_000.
+            bins (int, optional): Bins per histogram. Defaults to 20.
+        """
+        self.max_distance = max_distance
+        self.tick_limit = ticks
+        self.result_counter: Counter = Counter()
+        self.count = 0
+        # Tick counts are ints, so their sum is exact whatever the order of add() and merge()
+        self.total_ticks = 0
+        self.min_ticks: Union[int, None] = None
+        self.max_ticks: Union[int, None] = None
+        self.ticks = Histogram(0.0, float(ticks), bins)
+        self.by_distance = BinnedResults(0.0, 2.0 * max_distance, bins)
+        self.by_ship1_angle = BinnedResults(0.0, 180.0, bins)
+        self.by_ship2_angle = BinnedResults(0.0, 180.0, bins)
+
+    def add(self, duel: "DuelSummary") -> None:
+        self.result_counter[duel.result] += 1
+        self.count += 1
+        self.total_ticks += duel.ticks
+        self.min_ticks = duel.ticks if self.min_ticks is None else min(self.min_ticks, duel.ticks)
+        self.max_ticks = duel.ticks if self.max_ticks is None else max(self.max_ticks, duel.ticks)
+        self.ticks.add(duel.ticks)
+        self.by_distance.add_result(duel.initial_distance, duel.result)
+        self.by_ship1_angle.add_result(duel.initial_ship1_angle, duel.result)
+        self.by_ship2_angle.add_result(duel.initial_ship2_angle, duel.result)
+
+    def merge(self, other: "SweepAggregate") -> None:
+        """Fold in the aggregate of another part of the same sweep"""
+        self.result_counter.update(other.result_counter)
+        self.count += other.count
+        self.total_ticks += other.total_ticks
+        for name, pick in (("min_ticks", min), ("max_ticks", max)):
+            mine = getattr(self, name)
+            theirs = getattr(other, name)
+            if theirs is not None:
+                setattr(self, name, theirs if mine is None else pick(mine, theirs))
+        self.ticks.merge(other.ticks)
+        self.by_distance.merge(other.by_distance)
+        self.by_ship1_angle.merge(other.by_ship1_angle)
+        self.by_ship2_angle.merge(other.by_ship2_angle)
+
+    @property
+    def mean_ticks(self) -> float:
+        return self.total_ticks / self.count
+
+    def summary(self) -> str:
+        rv = ""
+        rv += f"DUELS: {self.count}\n"
+        rv += f"TICKS: min {self.min_ticks}  mean {self.mean_ticks:.2f}  max {self.max_ticks}\n"
+        rv += "RESULTS:\n"
+        rv += "\n".join([
+            f"  {result}: {count}"
+            for result, count
+            in sorted(self.result_counter.items())
+        ])
+        rv += "\nSHIP 1 WIN RATE BY INITIAL DISTANCE:"
+        edges = self.by_distance.edges
+        for number, rate in enumerate(self.by_distance.rates("SHIP_1_WINS")):
+            if rate is not None:
+                rv += f"\n  {edges[number]:8.1f} - {edges[number + 1]:8.1f}: {rate:6.1%} of {self.by_distance.counts[number]}"
+        return rv
@@ -0,0 +1,343 @@
+"""
+A vectorized duel engine.
+
+Holds N independent duels as structure-of-arrays and advances all of them
+at once with NumPy. Every step mirrors `Simulation`, `Spaceship` and `Vector`
+operation for operation, so each duel ends with the same result after the
+same number of ticks as the equivalent `Simulation`. The ships' positions and
+directions can still differ in the last bit: `Vector` squares with Python's
+`x ** 2`, which goes through `pow` and can be one ulp off, where NumPy
+squares exactly.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import math
+from typing import Sequence, Union
+
+import numpy as np
+
+from spaceship_sim.recorder import RESULTS
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.strategies import CHASE_ANGLE, CHASE_DISTANCE, EVADE, PATROL
+from spaceship_sim.vector import Vector, cone_limit, epsilon, in_cone_array, turn_limit, turn_with_rate_limit_array
+
+
+ONGOING = RESULTS.index("ONGOING")
+SHIP_1_WINS = RESULTS.index("SHIP_1_WINS")
+SHIP_2_WINS = RESULTS.index("SHIP_2_WINS")
+BOTH_DESTROYED = RESULTS.index("BOTH_DESTROYED")
+
+# Same constant as `math.degrees`
+_RAD_TO_DEG = 180.0 / math.pi
+
+
+# Vectors are stored as arrays of shape (3, n), so `v[0]` is every x coordinate.
+# These helpers spell out the same arithmetic, in the same order, as `Vector`.
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.stack([
+        a[1] * b[2] - a[2] * b[1],
+        -(a[0] * b[2] - a[2] * b[0]),
+        a[0] * b[1] - a[1] * b[0],
+    ])
+
+
+def _magnitude(a: np.ndarray) -> np.ndarray:
+    return np.sqrt(a[0] ** 2 + a[1] ** 2 + a[2] ** 2)
+
+
+def _normalized(a: np.ndarray) -> np.ndarray:
+    return a * (1.0 / _magnitude(a))
+
+
+def _angle_degrees(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Angle in degrees, like `Vector.angle_degrees`. NaN where `Vector.angle` would raise."""
+    denominator = _magnitude(a) * _magnitude(b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.clip(_dot(a, b) / denominator, -1.0, 1.0)
+    cosine[denominator < epsilon] = np.nan
+    return np.arccos(cosine) * _RAD_TO_DEG
+
+
+def weapon_range_squared(weapon_range: float) -> float:
+    """Same as `Spaceship`: nothing is in a negative range"""
+    return weapon_range * weapon_range if weapon_range >= 0.0 else -math.inf
+
+
+@dataclasses.dataclass
+class ShipArrays:
+    """State of one side of every duel, one column per duel"""
+    position: np.ndarray
+    direction: np.ndarray
+    speed: np.ndarray
+    turning_speed: np.ndarray
+    weapon_range: np.ndarray
+    weapon_angle_degrees: np.ndarray
+    strategy: np.ndarray
+    # cos and sin of `turning_speed`, from `turn_limit` like `Spaceship`
+    turn_cos: np.ndarray
+    turn_sin: np.ndarray
+    # Squared `weapon_range` and `cone_limit` of `weapon_angle_degrees`, like `Spaceship`
+    weapon_range_squared: np.ndarray
+    weapon_cone: np.ndarray
+    # `StrategyParameters` fields
+    chase_distance_factor: np.ndarray
+    chase_angle_degrees: np.ndarray
+    evade_retreat: np.ndarray
+    # Each ship's `rng`, as an object array, so random turns match `Spaceship`'s
+    rng: np.ndarray
+
+    @classmethod
+    def from_ships(cls, ships: Sequence[Spaceship]) -> "ShipArrays":
+        """Copy of the ships' state. Only reads public attributes, so `registry.ShipView`s work too."""
+        return cls(
+            position=np.array([tuple(ship.position) for ship in ships], dtype=np.float64).reshape(-1, 3).T.copy(),
+            direction=np.array([tuple(ship.direction) for ship in ships], dtype=np.float64).reshape(-1, 3).T.copy(),
+            speed=np.array([ship.speed for ship in ships], dtype=np.float64),
+            turning_speed=np.array([ship.turning_speed for ship in ships], dtype=np.float64),
+            weapon_range=np.array([ship.weapon_range for ship in ships], dtype=np.float64),
+            weapon_angle_degrees=np.array([ship.weapon_angle_degrees for ship in ships], dtype=np.float64),
+            strategy=np.array([ship.strategy_code for ship in ships], dtype=np.int8),
+            turn_cos=np.array([turn_limit(ship.turning_speed)[0] for ship in ships], dtype=np.float64),
+            turn_sin=np.array([turn_limit(ship.turning_speed)[1] for ship in ships], dtype=np.float64),
+            weapon_range_squared=np.array([weapon_range_squared(ship.weapon_range) for ship in ships], dtype=np.float64),
+            weapon_cone=np.array([cone_limit(ship.weapon_angle_degrees) for ship in ships], dtype=np.float64),
+            chase_distance_factor=np.array([ship.strategy_parameters.chase_distance_factor for ship in ships], dtype=np.float64),
+            chase_angle_degrees=np.array([ship.strategy_parameters.chase_angle_degrees for ship in ships], dtype=np.float64),
+            evade_retreat=np.array([ship.strategy_parameters.evade_retreat for ship in ships], dtype=np.float64),
+            rng=np.array([ship.rng for ship in ships], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.speed)
+
+    def take(self, index: np.ndarray) -> "ShipArrays":
+        """Copy of the given duels only"""
+        return ShipArrays(
+            position=self.position[:, index],
+            direction=self.direction[:, index],
+            speed=self.speed[index],
+            turning_speed=self.turning_speed[index],
+            weapon_range=self.weapon_range[index],
+            weapon_angle_degrees=self.weapon_angle_degrees[index],
+            strategy=self.strategy[index],
+            turn_cos=self.turn_cos[index],
+            turn_sin=self.turn_sin[index],
+            weapon_range_squared=self.weapon_range_squared[index],
+            weapon_cone=self.weapon_cone[index],
+            chase_distance_factor=self.chase_distance_factor[index],
+            chase_angle_degrees=self.chase_angle_degrees[index],
+            evade_retreat=self.evade_retreat[index],
+            rng=self.rng[index],
+        )
+
+    def is_in_weapon_range(self, point: np.ndarray) -> np.ndarray:
+        """Vectorized `Spaceship.is_in_weapon_range`"""
+        vector_to_target = point - self.position
+        return (
+            (_dot(vector_to_target, vector_to_target) <= self.weapon_range_squared)
+            & in_cone_array(self.direction, vector_to_target, self.weapon_cone)
+        )
+
+    def choose_strategy(self, enemy: "ShipArrays") -> None:
+        """Vectorized `Spaceship.choose_strategy`, reading the enemy's current position"""
+        vector_to_enemy = enemy.position - self.position
+        distance = _magnitude(vector_to_enemy)
+        angle = _angle_degrees(vector_to_enemy, self.direction)
+        self.strategy = np.where(
+            distance > self.chase_distance_factor * enemy.weapon_range,
+            CHASE_DISTANCE,
+            np.where(angle < self.chase_angle_degrees, CHASE_ANGLE, EVADE),
+        ).astype(np.int8)
+
+    def implement_strategy(self, enemy_position: np.ndarray, enemy_direction: np.ndarray) -> None:
+        """Vectorized `Spaceship.implement_strategy`"""
+        vector_to_enemy = enemy_position - self.position
+
+        # Chase: `turn_towards` is handed the vector to the enemy as a point
+        point = vector_to_enemy.copy()
+
+        evade = self.strategy == EVADE
+        if evade.any():
+            candidate_1 = _cross(vector_to_enemy[:, evade], enemy_direction[:, evade])
+            parallel = np.all(np.abs(candidate_1) < epsilon, axis=0)
+            evade_columns = np.flatnonzero(evade)
+            for column in np.flatnonzero(parallel):
+                rng = self.rng[evade_columns[column]]
+                while np.all(np.abs(candidate_1[:, column]) < epsilon):
+                    candidate_1[:, column] = tuple(
+                        Vector.random_direction(rng).cross(Vector(*enemy_direction[:, evade_columns[column]]))
+                    )
+            candidate_2 = -candidate_1
+            direction = self.direction[:, evade]
+            use_1 = _angle_degrees(candidate_1, direction) < _angle_degrees(candidate_2, direction)
+            chosen = np.where(use_1, candidate_1, candidate_2)
+            retreat = self.evade_retreat[evade]
+            lean = retreat != 0.0
+            if lean.any():
+                chosen[:, lean] = (
+                    _normalized(chosen[:, lean]) * (1.0 - retreat[lean])
+                    - _normalized(vector_to_enemy[:, evade][:, lean]) * retreat[lean]
+                )
+            point[:, evade] = chosen
+
+        patrol = self.strategy == PATROL
+        for column in np.flatnonzero(patrol):
+            point[:, column] = tuple(Vector.random_direction(self.rng[column]))
+
+        self.turn_towards(point)
+
+    def turn_towards(self, point: np.ndarray) -> None:
+        """Vectorized `Spaceship.turn_towards`"""
+        desired_direction = point - self.position
+        self.direction = turn_with_rate_limit_array(self.direction, desired_direction, self.turn_cos, self.turn_sin)
+
+    def advance(self) -> None:
+        """Vectorized position update at the end of `Spaceship.move`"""
+        self.position = self.position + _normalized(self.direction) * self.speed
+
+
+class BatchSimulation:
+    """Many independent duels, run together.
+
+    `ship1s[i]` fights `ship2s[i]`. Like `Simulation`, nothing runs until
+    `step()` or `run()`. Once `finished`, `result[i]` is the index into
+    `RESULTS` and `ticks[i]` the `tick_count` that `Simulation` would give for
+    that pair.
+    """
+    def __init__(
+        self,
+        ship1s: Sequence[Spaceship],
+        ship2s: Sequence[Spaceship],
+        ticks: int = 100,
+    ) -> None:
+        if len(ship1s) != len(ship2s):
+            raise ValueError(f"Need the same number of ships on each side, got {len(ship1s)} and {len(ship2s)}")
+
+        self.ship1 = ShipArrays.from_ships(ship1s)
+        self.ship2 = ShipArrays.from_ships(ship2s)
+        count = len(self.ship1)
+        self.max_ticks = ticks
+        self.tick_count = 0
+
+        self.result = np.full(count, ONGOING, dtype=np.int8)
+        self.ticks = np.zeros(count, dtype=np.int64)
+
+        vector_to_enemy = self.ship2.position - self.ship1.position
+        self.initial_distance = _magnitude(vector_to_enemy)
+        self.initial_ship1_angle = _angle_degrees(vector_to_enemy, self.ship1.direction)
+        self.initial_ship2_angle = _angle_degrees(-vector_to_enemy, self.ship2.direction)
+
+        # `_active` maps columns of the working arrays back to duels, and
+        # shrinks as duels finish
+        self._active = np.arange(count)
+        self._ship1 = self.ship1.take(self._active)
+        self._ship2 = self.ship2.take(self._active)
+
+    @property
+    def finished(self) -> bool:
+        """Every duel has a result, or the tick limit is reached"""
+        return len(self._active) == 0 or self.tick_count >= self.max_ticks
+
+    def step(self) -> None:
+        """Run one tick of every unfinished duel. Does nothing once `finished`."""
+        if self.finished:
+            return
+        ship1 = self._ship1
+        ship2 = self._ship2
+
+        # Ships move between ticks, so the state after the last tick is left as is
+        if self.tick_count > 0:
+            ship1_pos = ship1.position
+            ship1_dir = ship1.direction
+            ship2_pos = ship2.position
+            ship2_dir = ship2.direction
+
+            ship1.choose_strategy(ship2)
+            ship1.implement_strategy(ship2_pos, ship2_dir)
+            ship1.advance()
+
+            # Like `Simulation`, ship 2 picks its strategy after ship 1 has moved,
+            # but steers using ship 1's position from before the move.
+            ship2.choose_strategy(ship1)
+            ship2.implement_strategy(ship1_pos, ship1_dir)
+            ship2.advance()
+
+        ship1_win = ship1.is_in_weapon_range(ship2.position)
+        ship2_win = ship2.is_in_weapon_range(ship1.position)
+
+        result = np.full(len(self._active), ONGOING, dtype=np.int8)
+        result[ship2_win] = SHIP_2_WINS
+        result[ship1_win] = SHIP_1_WINS
+        result[ship1_win & ship2_win] = BOTH_DESTROYED
+
+        self.tick_count += 1
+        self.ticks[self._active] = self.tick_count
+        done = result != ONGOING
+        if done.any():
+            self.result[self._active[done]] = result[done]
+            keep = ~done
+            self._active = self._active[keep]
+            self._ship1 = ship1.take(keep)
+            self._ship2 = ship2.take(keep)
+
+    def run(self, max_ticks: Union[int, None] = None) -> None:
+        """Step until `finished`, or until `max_ticks` more ticks have run"""
+        stop = self.max_ticks if max_ticks is None else min(self.max_ticks, self.tick_count + max_ticks)
+        while self.tick_count < stop and not self.finished:
+            self.step()
+
+    def __len__(self) -> int:
+        return len(self.result)
+
+    def results(self) -> list[str]:
+        """Per-duel result names, as found in `Data.result`"""
+        return [RESULTS[code] for code in self.result]
+
+
+if __name__ == "__main__":
+    import time
+    from collections import Counter
+
+    from spaceship_sim.rng import stream
+    from spaceship_sim.simulation import Simulation
+
+    SIM_COUNT = 200
+    MAX_DISTANCE = 1000.0
+    MASTER_SEED = 40351
+
+    def random_pair(index: int) -> tuple[Spaceship, Spaceship]:
+        position1, direction1, position2, direction2 = Vector.random_directions(4, stream(MASTER_SEED, index))
+        # Both ships of a duel share its stream of random turns, like `Simulation(rng=...)`
+        turns = stream(MASTER_SEED, index, "turns")
+        return (
+            Spaceship(position=position1 * MAX_DISTANCE, direction=direction1, rng=turns),
+            Spaceship(position=position2 * MAX_DISTANCE, direction=direction2, rng=turns),
+        )
+
+    pairs = [random_pair(index) for index in range(SIM_COUNT)]
+
+    start = time.perf_counter()
+    batch = BatchSimulation([pair[0] for pair in pairs], [pair[1] for pair in pairs], ticks=10_000)
+    batch.run()
+    batch_time = time.perf_counter() - start
+    print(f"Batch: {SIM_COUNT} duels in {batch_time:.2f} s  {Counter(batch.results())}")
+
+    start = time.perf_counter()
+    mismatches = 0
+    for index, (ship1, ship2) in enumerate(pairs):
+        # A fresh copy of the duel's stream, as the batch has used up the ships'
+        sim = Simulation(ship1, ship2, ticks=10_000, rng=stream(MASTER_SEED, index, "turns"))
+        sim.run()
+        if sim.data[-1].result != batch.results()[index] or len(sim.data) != batch.ticks[index]:
+            mismatches += 1
+    serial_time = time.perf_counter() - start
+    print(f"Serial: {SIM_COUNT} duels in {serial_time:.2f} s  {mismatches} mismatches")
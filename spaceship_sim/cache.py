@@ -0,0 +1,207 @@
+"""
+An on-disk cache of duel results, so repeated sweeps don't rerun duels.
+
+Entries are keyed by a SHA-256 of everything that decides how a duel plays
+out: the simulation's initial settings, the RNG seed, the tick limit and
+`spaceship.STRATEGY_VERSION`. Any change to ship behaviour bumps the version,
+so results from older strategy logic are never returned. `purge_stale()`
+reclaims their space.
+
+Stored in a single SQLite file, safe to share between worker processes.
+Least recently used entries are evicted beyond `max_entries` or `max_bytes`.
+Each `ResultCache` keeps a running count of the entries and bytes instead of
+counting the table on every put. So with several processes sharing a file,
+the limits can be overshot by the others' puts until the next eviction.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Union
+
+from spaceship_sim.spaceship import STRATEGY_VERSION
+from spaceship_sim.vector import Vector
+
+
+EVICT_TO = 0.9
+"""A put over a limit evicts down to this fraction of it, so the next eviction is many puts away"""
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, Vector):
+        return [value.x, value.y, value.z]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def duel_key(initial_settings: dict[str, Any], seed: int, ticks: int, **extra: Any) -> str:
+    """Cache key for a duel. Pass anything else that changes the outcome,
+    like stall detector settings, as `extra`."""
+    document = {
+        "initial_settings": _canonical(initial_settings),
+        "seed": seed,
+        "ticks": ticks,
+        "strategy_version": STRATEGY_VERSION,
+        "extra": _canonical(extra),
+    }
+    # Sorted keys, no whitespace and shortest round-trip floats make this canonical
+    text = json.dumps(document, sort_keys=True, separators=(",", ":"), allow_nan=True)
+    return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+
+class ResultCache:
+    """Maps `duel_key()`s to JSON-able results. Use as a context manager, or call `close()`."""
+    def __init__(
+        self,
+        path: Union[Path, str],
+        max_entries: Union[int, None] = None,
+        max_bytes: Union[int, None] = None,
+    ) -> None:
+        """_summary_
+
+        Args:
+            path (Path | str): SQLite database file. Created if need be.
+            max_entries (int | None, optional): Evict beyond this many entries. Defaults to None, no limit.
+            max_bytes (int | None, optional): Evict beyond this many bytes of stored results. Defaults to None, no limit.
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(self.path, timeout=60.0)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used INTEGER NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._connection.commit()
+        # Running counts, see the module docstring. Only needed with a limit.
+        self._entries = 0
+        self._bytes = 0
+        if max_entries is not None or max_bytes is not None:
+            self._entries = len(self)
+            self._bytes = self.size_bytes
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def get(self, key: str) -> Union[Any, None]:
+        """The stored result, or None"""
+        row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._connection:
+            self._connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        text = json.dumps(value, separators=(",", ":"))
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, version, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, STRATEGY_VERSION, text, len(text), time.time_ns()),
+            )
+        # Replacing an entry counts it twice, which only brings the next eviction forward
+        self._entries += 1
+        self._bytes += len(text)
+        if (
+            (self.max_entries is not None and self._entries > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._evict(EVICT_TO)
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored results"""
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until within `max_entries` and `max_bytes`. Returns how many."""
+        return self._evict(1.0)
+
+    def _evict(self, fraction: float) -> int:
+        """Drop least recently used entries until within `fraction` of the limits. Returns how many."""
+        evicted = 0
+        with self._connection:
+            if self.max_entries is not None:
+                excess = len(self) - math.floor(self.max_entries * fraction)
+                if excess > 0:
+                    evicted += self._connection.execute(
+                        "DELETE FROM results WHERE key IN"
+                        " (SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+            if self.max_bytes is not None:
+                excess = self.size_bytes - math.floor(self.max_bytes * fraction)
+                if excess > 0:
+                    # Oldest first, until enough bytes are freed
+                    keys = []
+                    for key, size in self._connection.execute("SELECT key, size FROM results ORDER BY last_used"):
+                        if excess <= 0:
+                            break
+                        keys.append((key,))
+                        excess -= size
+                    evicted += self._connection.executemany("DELETE FROM results WHERE key = ?", keys).rowcount
+        self._entries = len(self)
+        self._bytes = self.size_bytes
+        return evicted
+
+    def purge_stale(self) -> int:
+        """Drop entries from other strategy versions, which can never be hit. Returns how many."""
+        with self._connection:
+            purged = self._connection.execute(
+                "DELETE FROM results WHERE version != ?",
+                (STRATEGY_VERSION,),
+            ).rowcount
+        self._entries = len(self)
+        self._bytes = self.size_bytes
+        return purged
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM results")
+        self._entries = 0
+        self._bytes = 0
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from spaceship_sim.sweep import run_sweep
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "results.sqlite"
+        for _ in range(2):
+            start = time.perf_counter()
+            result = run_sweep(100, 40351, cache_path=path)
+            print(f"{result.cache_hits} of {len(result.duels)} duels from the cache, {time.perf_counter() - start:.2f}s")
+        with ResultCache(path, max_entries=50) as cache:
+            cache.evict()
+            print(f"{len(cache)} entries, {cache.size_bytes} bytes after evicting to 50")
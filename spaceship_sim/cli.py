@@ -0,0 +1,170 @@
+"""
+Command line interface.
+
+    spaceship-sim run [--seed S] [--index I] [--csv PATH]   one duel
+    spaceship-sim sweep COUNT [--workers N] [--plot PATH]   many duels
+    spaceship-sim export PATH [--count N]                   record duels to a .dlt, .bin or .csv file
+    spaceship-sim plot [--archive PATH] [--output PATH]     plot one duel
+
+Duel number I of seed S starts the same as duel I of a sweep with master
+seed S. Or run as `python -m spaceship_sim.cli ...` without installing.
+
+Only the core simulation modules are imported up front. Commands import
+what else they need, so `run` never loads NumPy, matplotlib, SQLite or
+multiprocessing, and starts quickly.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Union
+
+from spaceship_sim.vector import Vector
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.recorder import OutcomeRecorder, TraceRecorder
+from spaceship_sim.rng import derive_seed
+
+
+def make_duel(
+    seed: int,
+    index: int = 0,
+    max_distance: float = 1000.0,
+    ticks: int = 10_000,
+    trace: bool = False,
+) -> Simulation:
+    """Duel number `index` of seed `seed`, set up like `sweep.run_duel` does"""
+    rng = random.Random(derive_seed(seed, index))
+    ship1 = Spaceship(position=Vector.random_direction(rng) * max_distance, direction=Vector.random_direction(rng))
+    ship2 = Spaceship(position=Vector.random_direction(rng) * max_distance, direction=Vector.random_direction(rng))
+    recorder = TraceRecorder() if trace else OutcomeRecorder()
+    return Simulation(ship1, ship2, ticks=ticks, recorder=recorder, adaptive=True, rng=rng)
+
+
+def _run(args: argparse.Namespace) -> int:
+    sim = make_duel(args.seed, args.index, args.max_distance, args.ticks, trace=args.csv is not None)
+    sim.run()
+    print(f"{sim.result} after {sim.tick_count} ticks")
+    if args.csv is not None:
+        sim.to_csv(args.csv)
+    return 0
+
+
+def _sweep(args: argparse.Namespace) -> int:
+    from spaceship_sim.sweep import run_sweep
+
+    sweep = run_sweep(
+        args.count,
+        master_seed=args.seed,
+        workers=args.workers,
+        max_distance=args.max_distance,
+        ticks=args.ticks,
+        keep_duels=args.plot is not None,
+        cache_path=args.cache,
+    )
+    print(sweep.summary())
+    if args.plot is not None:
+        from spaceship_sim.plotting import plot_sweep
+
+        plot_sweep(sweep, path=args.plot)
+    return 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    suffix = args.path.suffix
+    if suffix == ".csv":
+        if args.count != 1:
+            print("A CSV file holds one duel, use --count 1", file=sys.stderr)
+            return 2
+        sim = make_duel(args.seed, args.index, args.max_distance, args.ticks, trace=True)
+        sim.run()
+        sim.to_csv(args.path)
+        return 0
+    if suffix == ".dlt":
+        from spaceship_sim.deltastream import DeltaStreamWriter as Writer
+    elif suffix == ".bin":
+        from spaceship_sim.trajectory import TrajectoryWriter as Writer
+    else:
+        print(f"Unknown archive type {suffix!r}, use .dlt, .bin or .csv", file=sys.stderr)
+        return 2
+
+    with Writer(args.path) as writer:
+        for index in range(args.index, args.index + args.count):
+            sim = make_duel(args.seed, index, args.max_distance, args.ticks, trace=True)
+            sim.run()
+            writer.add(sim)
+    print(f"Wrote {args.count} duels to {args.path} ({args.path.stat().st_size} bytes)")
+    return 0
+
+
+def _plot(args: argparse.Namespace) -> int:
+    from spaceship_sim.plotting import plot_duel
+
+    if args.archive is None:
+        sim = make_duel(args.seed, args.index, args.max_distance, args.ticks, trace=True)
+        sim.run()
+        plot_duel(sim.data, text=sim.summary(), path=args.output)
+        return 0
+
+    if args.archive.suffix == ".dlt":
+        from spaceship_sim.deltastream import DeltaStreamReader as Reader
+    else:
+        from spaceship_sim.trajectory import TrajectoryReader as Reader
+    duel = Reader(args.archive)[args.index]
+    rows = [duel.row(number) for number in range(len(duel))]
+    plot_duel(rows, text=f"{duel.result} after {duel.ticks} ticks", path=args.output)
+    return 0
+
+
+def _add_duel_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--seed", type=int, default=40351, help="master seed. Defaults to 40351")
+    parser.add_argument("--ticks", type=int, default=10_000, help="tick limit. Defaults to 10000")
+    parser.add_argument("--max-distance", type=float, default=1000.0, help="starting distance from the origin. Defaults to 1000")
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="spaceship-sim", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run one duel")
+    _add_duel_arguments(run)
+    run.add_argument("--index", type=int, default=0, help="duel number. Defaults to 0")
+    run.add_argument("--csv", type=Path, help="write every tick to this CSV file")
+    run.set_defaults(handler=_run)
+
+    sweep = commands.add_parser("sweep", help="run many duels in parallel")
+    sweep.add_argument("count", type=int)
+    _add_duel_arguments(sweep)
+    sweep.add_argument("--workers", type=int, help="worker processes. Defaults to one per CPU")
+    sweep.add_argument("--cache", type=Path, help="SQLite result cache file")
+    sweep.add_argument("--plot", type=Path, help="save plots of the results to this image file")
+    sweep.set_defaults(handler=_sweep)
+
+    export = commands.add_parser("export", help="record duels to a file")
+    export.add_argument("path", type=Path, help=".dlt (compressed), .bin (raw) or .csv (one duel)")
+    _add_duel_arguments(export)
+    export.add_argument("--index", type=int, default=0, help="first duel number. Defaults to 0")
+    export.add_argument("--count", type=int, default=1, help="number of duels. Defaults to 1")
+    export.set_defaults(handler=_export)
+
+    plot = commands.add_parser("plot", help="plot one duel")
+    _add_duel_arguments(plot)
+    plot.add_argument("--index", type=int, default=0, help="duel number. Defaults to 0")
+    plot.add_argument("--archive", type=Path, help="plot a duel from this .dlt or .bin file instead of running it")
+    plot.add_argument("--output", type=Path, help="save to this image file instead of showing a window")
+    plot.set_defaults(handler=_plot)
+    return parser
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    args = parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Compressed trajectory archives: quantized deltas in zlib blocks.
+
+Much smaller than `trajectory.py`'s raw float files or CSV, at the cost of
+rounding positions to `position_quantum` and directions to `direction_quantum`.
+Distances and angles aren't stored, they're recomputed from those on reading.
+
+Each duel's recorded rows are cut into blocks of `block_rows`. Within a block:
+    numbers     tick index, positions and directions as integer multiples of
+                their quantum, the first row as is and then the change from
+                row to row, zigzag-encoded and byte-shuffled so that small
+                changes compress to almost nothing
+    events      (row, field, code) for the result and both ships' strategies,
+                only where they change, plus their values on the first row
+Every block is compressed on its own, so any range of ticks can be read by
+decompressing only the blocks it covers.
+
+Layout (all little-endian):
+    header   32 bytes: magic, format version, block rows, both quanta
+    blocks   every duel's blocks, back to back
+    index    JSON: per duel, the initial settings, result, tick count and
+             the first tick, row count, byte offset and byte length of each block
+    trailer  16 bytes: byte offset of the index, then the magic again
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import bisect
+import json
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Union
+
+import numpy as np
+
+from spaceship_sim.recorder import ROW_WIDTH, TraceRecorder
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.trajectory import DuelTrajectory, TrajectoryReader, _COLUMN, _jsonable
+
+
+MAGIC = b"SSIMDLT\0"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIdd")
+_TRAILER = struct.Struct("<Q8s")
+_BLOCK = struct.Struct("<II")
+
+# Stored as quantized deltas: the tick index, then positions and directions
+_NUMBER_COLUMNS = (_COLUMN["index"], *range(_COLUMN["ship1_position_x"], _COLUMN["ship2_direction_z"] + 1))
+_POSITION_COLUMNS = slice(1, 7)
+_DIRECTION_COLUMNS = slice(7, 13)
+# Stored as change events: result and strategy codes
+_EVENT_COLUMNS = (_COLUMN["result"], _COLUMN["ship1_strategy"], _COLUMN["ship2_strategy"])
+
+_RAD_TO_DEG = 180.0 / np.pi
+
+
+def _shuffle(numbers: np.ndarray) -> bytes:
+    """Zigzag-encode signed ints and group their bytes by significance"""
+    zigzag = (numbers << 1) ^ (numbers >> 63)
+    return zigzag.astype("<u8").view(np.uint8).reshape(-1, 8).T.tobytes()
+
+
+def _unshuffle(data: bytes, count: int) -> np.ndarray:
+    zigzag = np.frombuffer(data, dtype=np.uint8).reshape(8, count).T.copy().view("<u8").reshape(count)
+    return (zigzag >> 1).astype(np.int64) ^ -(zigzag & 1).astype(np.int64)
+
+
+def _angle_degrees(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise angle between (n, 3) arrays, like `Vector.angle_degrees`"""
+    denominator = np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.clip((a * b).sum(axis=1) / denominator, -1.0, 1.0)
+    return np.arccos(cosine) * _RAD_TO_DEG
+
+
+class DeltaStreamWriter:
+    """Appends duels to a compressed archive, a block at a time.
+    Use as a context manager, or call `close()`."""
+    def __init__(
+        self,
+        path: Union[Path, str],
+        position_quantum: float = 1e-3,
+        direction_quantum: float = 1e-6,
+        block_rows: int = 1024,
+        level: int = 6,
+    ) -> None:
+        """_summary_
+
+        Args:
+            path (Path | str): Archive to write.
+            position_quantum (float, optional): Positions are rounded to a multiple of this. Defaults to 1e-3.
+            direction_quantum (float, optional): Direction components are rounded to a multiple of this. Defaults to 1e-6.
+            block_rows (int, optional): Rows per compressed block, the granularity of random access. Defaults to 1024.
+            level (int, optional): zlib compression level. Defaults to 6.
+        """
+        if not (position_quantum > 0.0 and direction_quantum > 0.0):
+            raise ValueError(f"Quanta must be positive, got {position_quantum} and {direction_quantum}")
+        if block_rows < 1:
+            raise ValueError(f"block_rows must be at least 1, got {block_rows}")
+        self.path = Path(path)
+        self.position_quantum = position_quantum
+        self.direction_quantum = direction_quantum
+        self.block_rows = block_rows
+        self.level = level
+        # Per stored column, what to divide by before rounding
+        self._scale = np.ones(len(_NUMBER_COLUMNS))
+        self._scale[_POSITION_COLUMNS] = position_quantum
+        self._scale[_DIRECTION_COLUMNS] = direction_quantum
+        self._file = open(self.path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, block_rows, position_quantum, direction_quantum))
+        self._duels: list[dict[str, Any]] = []
+
+    def __enter__(self) -> "DeltaStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _encode_block(self, rows: np.ndarray) -> bytes:
+        numbers = np.rint(rows[:, _NUMBER_COLUMNS] / self._scale).astype(np.int64)
+        deltas = np.diff(numbers, axis=0, prepend=np.zeros((1, numbers.shape[1]), dtype=np.int64))
+
+        codes = rows[:, _EVENT_COLUMNS].astype(np.int32)
+        changed = np.ones(codes.shape, dtype=bool)
+        changed[1:] = codes[1:] != codes[:-1]
+        event_rows, event_fields = np.nonzero(changed)
+        events = np.stack([event_rows, event_fields, codes[event_rows, event_fields]], axis=1).astype("<i4")
+
+        payload = _BLOCK.pack(len(rows), len(events)) + _shuffle(deltas.T.ravel()) + events.tobytes()
+        return zlib.compress(payload, self.level)
+
+    def add_rows(self, rows: np.ndarray, info: dict[str, Any]) -> None:
+        """Append a duel's recorded rows, shape (n, ROW_WIDTH), as `Row` fields.
+        `info` is saved in the index, and needs at least "result" and "ticks"."""
+        blocks = []
+        for start in range(0, len(rows), self.block_rows):
+            block = rows[start:start + self.block_rows]
+            data = self._encode_block(block)
+            blocks.append([int(block[0, _COLUMN["index"]]), len(block), self._file.tell(), len(data)])
+            self._file.write(data)
+        self._duels.append({**info, "rows": len(rows), "blocks": blocks})
+
+    def add(self, sim: Simulation) -> None:
+        """Append every row recorded so far by a simulation, normally a finished one"""
+        if not isinstance(sim.recorder, TraceRecorder):
+            raise TypeError(f"Need a TraceRecorder to write a trajectory, got {type(sim.recorder).__name__}")
+        rows = np.frombuffer(sim.recorder.buffer, dtype=np.float64)[:len(sim.recorder) * ROW_WIDTH]
+        self.add_rows(
+            rows.reshape(-1, ROW_WIDTH),
+            {"initial_settings": _jsonable(sim.initial_settings), "result": sim.result, "ticks": sim.tick_count},
+        )
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(json.dumps({"duels": self._duels}).encode("utf8"))
+        self._file.write(_TRAILER.pack(index_offset, MAGIC))
+        self._file.close()
+
+
+class DeltaStreamReader:
+    """Reads a compressed archive. `reader[i]` is all of duel number i, and
+    `reader.ticks(i, start, stop)` just part of it, as `DuelTrajectory`s."""
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        magic, version, self.block_rows, self.position_quantum, self.direction_quantum = _HEADER.unpack(
+            self._file.read(_HEADER.size)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a delta stream file")
+        if version != VERSION:
+            raise ValueError(f"{self.path} is delta stream format version {version}, expected {VERSION}")
+
+        self._file.seek(-_TRAILER.size, 2)
+        trailer_offset = self._file.tell()
+        index_offset, end_magic = _TRAILER.unpack(self._file.read(_TRAILER.size))
+        if end_magic != MAGIC:
+            raise ValueError(f"{self.path} is truncated or was not closed")
+        self._file.seek(index_offset)
+        self._duels: list[dict[str, Any]] = json.loads(self._file.read(trailer_offset - index_offset))["duels"]
+
+        self._scale = np.ones(len(_NUMBER_COLUMNS))
+        self._scale[_POSITION_COLUMNS] = self.position_quantum
+        self._scale[_DIRECTION_COLUMNS] = self.direction_quantum
+
+    def __enter__(self) -> "DeltaStreamReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._duels)
+
+    def __getitem__(self, duel: int) -> DuelTrajectory:
+        return self.ticks(duel)
+
+    def _decode_block(self, offset: int, length: int) -> np.ndarray:
+        self._file.seek(offset)
+        payload = zlib.decompress(self._file.read(length))
+        count, event_count = _BLOCK.unpack_from(payload)
+        numbers_size = 8 * count * len(_NUMBER_COLUMNS)
+        deltas = _unshuffle(payload[_BLOCK.size:_BLOCK.size + numbers_size], count * len(_NUMBER_COLUMNS))
+        numbers = np.cumsum(deltas.reshape(len(_NUMBER_COLUMNS), count), axis=1).T
+
+        rows = np.empty((count, ROW_WIDTH))
+        rows[:, _NUMBER_COLUMNS] = numbers * self._scale
+        # Codes hold until the next change. Every code changes on the first row.
+        events = np.frombuffer(payload, dtype="<i4", offset=_BLOCK.size + numbers_size).reshape(event_count, 3)
+        for field, column in enumerate(_EVENT_COLUMNS):
+            changes = events[events[:, 1] == field]
+            runs = np.diff(np.append(changes[:, 0], count))
+            rows[:, column] = np.repeat(changes[:, 2], runs)
+
+        ship1_position = rows[:, _COLUMN["ship1_position_x"]:_COLUMN["ship1_position_x"] + 3]
+        ship2_position = rows[:, _COLUMN["ship2_position_x"]:_COLUMN["ship2_position_x"] + 3]
+        to_enemy = ship2_position - ship1_position
+        rows[:, _COLUMN["ship_distance"]] = np.sqrt((to_enemy * to_enemy).sum(axis=1))
+        rows[:, _COLUMN["ship1_angle_to_enemy"]] = _angle_degrees(
+            to_enemy,
+            rows[:, _COLUMN["ship1_direction_x"]:_COLUMN["ship1_direction_x"] + 3],
+        )
+        rows[:, _COLUMN["ship2_angle_to_enemy"]] = _angle_degrees(
+            -to_enemy,
+            rows[:, _COLUMN["ship2_direction_x"]:_COLUMN["ship2_direction_x"] + 3],
+        )
+        return rows
+
+    def ticks(
+        self,
+        duel: int,
+        start: Union[int, None] = None,
+        stop: Union[int, None] = None,
+    ) -> DuelTrajectory:
+        """The rows of a duel recorded at ticks `start` <= tick < `stop`,
+        decompressing only the blocks they're in"""
+        info = self._duels[duel]
+        blocks = info["blocks"]
+        first_ticks = [block[0] for block in blocks]
+        first = 0 if start is None else max(bisect.bisect_right(first_ticks, start) - 1, 0)
+        last = len(blocks) if stop is None else bisect.bisect_left(first_ticks, stop)
+        parts = [self._decode_block(offset, length) for _, _, offset, length in blocks[first:last]]
+        rows = np.concatenate(parts) if parts else np.empty((0, ROW_WIDTH))
+        index = rows[:, _COLUMN["index"]]
+        keep = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            keep &= index >= start
+        if stop is not None:
+            keep &= index < stop
+        return DuelTrajectory(rows[keep], info)
+
+
+def from_trajectory(trajectory_path: Union[Path, str], path: Union[Path, str], **options: Any) -> None:
+    """Convert a `trajectory.py` file to a delta stream archive. `options` go to `DeltaStreamWriter`."""
+    reader = TrajectoryReader(trajectory_path)
+    with DeltaStreamWriter(path, **options) as writer:
+        for number in range(len(reader)):
+            duel = reader[number]
+            writer.add_rows(
+                np.asarray(duel.rows, dtype=np.float64),
+                {"initial_settings": duel.initial_settings, "result": duel.result, "ticks": duel.ticks},
+            )
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from spaceship_sim.rng import stream
+    from spaceship_sim.spaceship import Spaceship
+    from spaceship_sim.trajectory import TrajectoryWriter
+    from spaceship_sim.vector import Vector
+
+    sims = []
+    for index in range(10):
+        rng = stream(40351, index)
+        sim = Simulation(
+            Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+            Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+            ticks=10_000,
+            rng=rng,
+        )
+        sim.run()
+        sims.append(sim)
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "data.csv"
+        raw_path = Path(directory) / "trajectories.bin"
+        path = Path(directory) / "trajectories.dlt"
+        csv_size = 0
+        for sim in sims:
+            sim.to_csv(csv_path)
+            csv_size += csv_path.stat().st_size
+        with TrajectoryWriter(raw_path) as writer:
+            for sim in sims:
+                writer.add(sim)
+        start = time.perf_counter()
+        with DeltaStreamWriter(path) as writer:
+            for sim in sims:
+                writer.add(sim)
+        write_time = time.perf_counter() - start
+        size = path.stat().st_size
+        print(f"CSV {csv_size} bytes, raw {raw_path.stat().st_size} bytes, delta stream {size} bytes "
+              f"({csv_size / size:.0f}x smaller than CSV) written in {write_time:.3f} s")
+
+        with DeltaStreamReader(path) as reader:
+            start = time.perf_counter()
+            duels = [reader[number] for number in range(len(reader))]
+            load_time = time.perf_counter() - start
+            worst = max(
+                np.abs(duel.rows[:, 4:16] - np.frombuffer(sim.recorder.buffer).reshape(-1, ROW_WIDTH)[:, 4:16]).max()
+                for duel, sim in zip(duels, sims)
+            )
+            print(f"Loaded {sum(len(duel) for duel in duels)} rows in {load_time:.3f} s, worst rounding {worst:.2e}")
+            middle = duels[0].ticks // 2
+            part = reader.ticks(0, middle, middle + 5)
+            print(f"Ticks {middle} to {middle + 4} of duel 0: distances {np.round(part.distance, 3).tolist()}")
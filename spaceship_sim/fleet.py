@@ -0,0 +1,355 @@
+"""
+N-vs-M fleet battles.
+
+Every tick each ship targets the nearest ship of the opposing fleet, then
+any ship with an enemy in its weapon cone destroys it. Both fleets live in
+one `ShipRegistry`, so every ship moves at once with `ShipRegistry.move`.
+Instead of checking every pair of ships, each fleet is bucketed into a
+uniform `SpatialGrid` every tick, and only ships in neighbouring cells are
+compared, with NumPy, a whole fleet at a time: weapon-range-sized cells for
+the weapon checks, and cells that double in size until every ship's nearest
+enemy is found for targeting.
+
+Like `registry`, ships move with the vectorized `Spaceship.move`, so a
+battle can differ in the last bit from moving each `Spaceship` in turn.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import itertools
+import math
+from typing import Sequence, Union
+
+import numpy as np
+
+from spaceship_sim.vector import Vector
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.registry import ShipRegistry, ShipView
+
+
+FLEET_RESULTS = ("ONGOING", "FLEET_1_WINS", "FLEET_2_WINS", "BOTH_DESTROYED")
+"""Every possible `FleetSimulation.result`"""
+
+
+class SpatialGrid:
+    """Points, shape (3, n), bucketed into cubic cells of side `cell_size`"""
+    def __init__(self, points: np.ndarray, cell_size: float) -> None:
+        if not cell_size > 0.0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.cell_size = cell_size
+        self.points = points
+        cells = np.floor(points / cell_size).astype(np.int64)
+        if points.shape[1] > 0:
+            self._low = cells.min(axis=1)
+            self._span = cells.max(axis=1) - self._low + 1
+        else:
+            self._low = np.zeros(3, dtype=np.int64)
+            self._span = np.zeros(3, dtype=np.int64)
+        keys, _ = self._keys(cells)
+        # Points sorted by cell, and where each occupied cell's run starts
+        self._order = np.argsort(keys, kind="stable")
+        self._cell_keys, self._starts, self._counts = np.unique(
+            keys[self._order],
+            return_index=True,
+            return_counts=True,
+        )
+
+    def _keys(self, cells: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """One integer per cell, and whether each cell is inside the grid at all.
+        `cells` has the three cell coordinates first, and any shape after that."""
+        low = self._low.reshape((3,) + (1,) * (cells.ndim - 1))
+        span = self._span.reshape((3,) + (1,) * (cells.ndim - 1))
+        offset = cells - low
+        inside = np.all((offset >= 0) & (offset < span), axis=0)
+        keys = (offset[0] * self._span[1] + offset[1]) * self._span[2] + offset[2]
+        return keys, inside
+
+    def __len__(self) -> int:
+        return self.points.shape[1]
+
+    def neighbours(self, points: np.ndarray, reach: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """Every occupied cell at most `reach` cells from each column of `points`
+        on every axis, as column numbers into `points` and matching cell
+        numbers. `pairs` expands these into the points of each cell, and
+        `size(cells)` says how many pairs that makes."""
+        if len(self._cell_keys) == 0 or points.shape[1] == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        # Every neighbouring cell of every query at once, shape (3, steps, queries)
+        steps = np.array(list(itertools.product(range(-reach, reach + 1), repeat=3)), dtype=np.int64).T
+        keys, inside = self._keys(cells[:, None, :] + steps[:, :, None])
+        keys = keys.ravel()
+        cell = np.minimum(np.searchsorted(self._cell_keys, keys), len(self._cell_keys) - 1)
+        neighbour = np.flatnonzero(inside.ravel() & (self._cell_keys[cell] == keys))
+        return neighbour % points.shape[1], cell[neighbour]
+
+    def size(self, cells: np.ndarray) -> int:
+        """Number of points in all of `cells`, counting repeats"""
+        return int(self._counts[cells].sum())
+
+    def pairs(self, points: np.ndarray, reach: int = 1, neighbours: Union[tuple[np.ndarray, np.ndarray], None] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Every (query, point) pair of a column of `points` and a point of the
+        grid at most `reach` cells apart on each axis. That includes every pair
+        within `reach * cell_size` of each other, and some further apart.
+
+        Args:
+            points (np.ndarray): Query points, shape (3, n).
+            reach (int, optional): Cells apart on each axis. Defaults to 1.
+            neighbours (tuple[np.ndarray, np.ndarray] | None, optional): `neighbours(points, reach)`, if already known. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Column numbers into `points`, and the matching column numbers into the grid's points.
+        """
+        query, cell = self.neighbours(points, reach) if neighbours is None else neighbours
+        counts = self._counts[cell]
+        # Every point of each matching cell, in turn
+        first = np.repeat(self._starts[cell] - (np.cumsum(counts) - counts), counts)
+        return np.repeat(query, counts), self._order[first + np.arange(len(first))]
+
+
+# About how many pairs `_closest` compares in the time it takes `nearest` to look up one in a grid
+CLOSEST_COST = 16
+
+
+def _closest(points: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """`nearest` by comparing every point with every target, in blocks of
+    points small enough for the distances to stay in cache"""
+    count = points.shape[1]
+    best = np.empty(count, dtype=np.int64)
+    block = max(1, 2**16 // targets.shape[1])
+    distance_squared = np.empty((block, targets.shape[1]))
+    term = np.empty((block, targets.shape[1]))
+    for start in range(0, count, block):
+        stop = min(count, start + block)
+        total = distance_squared[:stop - start]
+        square = term[:stop - start]
+        # (target - point) squared and summed, x, y then z, as `Vector` does
+        np.subtract(targets[0], points[0, start:stop, None], out=total)
+        total *= total
+        for axis in (1, 2):
+            np.subtract(targets[axis], points[axis, start:stop, None], out=square)
+            square *= square
+            total += square
+        best[start:stop] = np.argmin(total, axis=1)
+    return best
+
+
+def nearest(
+    points: np.ndarray,
+    targets: np.ndarray,
+    cell_size: float,
+    hint: Union[np.ndarray, None] = None,
+) -> np.ndarray:
+    """Column number of the closest of `targets` to each column of `points`,
+    both shape (3, n). All -1 if there are no targets.
+
+    Searches neighbouring cells of a `SpatialGrid` of the targets, first of
+    side `cell_size` and then twice as large each time, until every point
+    has a target no more than a cell side away. No target outside the
+    neighbouring cells can be that close. Once the cells hold so many
+    targets that comparing the points left with every target is quicker,
+    they are. Ties go to the lowest column.
+
+    Args:
+        points (np.ndarray): Points to find targets for, shape (3, n).
+        targets (np.ndarray): Targets, shape (3, m).
+        cell_size (float): Side of the smallest cells searched.
+        hint (np.ndarray | None, optional): A column of `targets` for each point, probably close (like last tick's answer), or -1. Points with a hint skip the cells too small to hold it. Defaults to None.
+    """
+    best = np.full(points.shape[1], -1, dtype=np.int64)
+    if targets.shape[1] == 0 or points.shape[1] == 0:
+        return best
+    low = np.minimum(points.min(axis=1), targets.min(axis=1))
+    high = np.maximum(points.max(axis=1), targets.max(axis=1))
+    extent = float(np.max(high - low))
+    # No point can be further from its closest target than from its hint
+    bound = np.full(points.shape[1], math.inf)
+    if hint is not None:
+        hinted = hint >= 0
+        offset = targets[:, hint[hinted]] - points[:, hinted]
+        bound[hinted] = np.sqrt(offset[0] * offset[0] + offset[1] * offset[1] + offset[2] * offset[2])
+    remaining = np.arange(points.shape[1])
+    size = cell_size
+    while len(remaining) > 0 and size < extent:
+        # Points whose hint is further than a cell side wait for bigger cells
+        search = remaining[(bound[remaining] <= size) | (bound[remaining] == math.inf)]
+        if len(search) > 0:
+            grid = SpatialGrid(targets, size)
+            neighbours = grid.neighbours(points[:, search])
+            # Looking up each pair costs far more than a pair of `_closest`
+            if grid.size(neighbours[1]) * CLOSEST_COST > len(search) * targets.shape[1]:
+                break
+            query, target = grid.pairs(points[:, search], neighbours=neighbours)
+            offset = np.take(targets, target, axis=1) - np.take(points, search[query], axis=1)
+            distance_squared = offset[0] * offset[0] + offset[1] * offset[1] + offset[2] * offset[2]
+            # The closest distance for each query, then the lowest target that far away
+            closest = np.full(len(search), math.inf)
+            np.minimum.at(closest, query, distance_squared)
+            at_closest = distance_squared == closest[query]
+            choice = np.full(len(search), targets.shape[1], dtype=np.int64)
+            np.minimum.at(choice, query[at_closest], target[at_closest])
+            found = closest <= size * size
+            best[search[found]] = choice[found]
+            remaining = remaining[best[remaining] < 0]
+        size *= 2.0
+    if len(remaining) > 0:
+        best[remaining] = _closest(points[:, remaining], targets)
+    return best
+
+
+class FleetSimulation:
+    """A battle between two fleets, with the same step()/run() lifecycle as `Simulation`.
+
+    `Spaceship`s are copied into a new `ShipRegistry`, and left as they
+    were. Views of one registry are used in place. Either way `fleet1`,
+    `fleet2` and `destroyed` hold views of `registry`.
+    """
+    def __init__(
+        self,
+        fleet1: Sequence[Union[Spaceship, ShipView]],
+        fleet2: Sequence[Union[Spaceship, ShipView]],
+        ticks: int = 100,
+        cell_size: Union[float, None] = None,
+    ) -> None:
+        """_summary_
+
+        Args:
+            fleet1 (Sequence[Spaceship | ShipView]): _description_
+            fleet2 (Sequence[Spaceship | ShipView]): _description_
+            ticks (int, optional): Tick limit. Defaults to 100.
+            cell_size (float | None, optional): Spatial grid cell size for weapon checks. Defaults to the longest weapon range.
+        """
+        ships = list(fleet1) + list(fleet2)
+        registries = {id(ship.registry): ship.registry for ship in ships if isinstance(ship, ShipView)}
+        if len(registries) == 1 and all(isinstance(ship, ShipView) for ship in ships):
+            (self.registry,) = registries.values()
+            index = np.array([ship.index for ship in ships], dtype=np.int64)
+        else:
+            self.registry = ShipRegistry.from_ships(ships)
+            index = np.arange(len(ships), dtype=np.int64)
+        self._alive1 = index[:len(fleet1)]
+        self._alive2 = index[len(fleet1):]
+        self.ticks = ticks
+        if cell_size is None:
+            cell_size = max(ship.weapon_range for ship in ships)
+        if not cell_size > 0.0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.cell_size = cell_size
+
+        self.destroyed: list[tuple[int, ShipView]] = []
+        """(tick index, ship) for every ship destroyed so far"""
+        self.result = "ONGOING"
+        self.tick_count = 0
+
+    @property
+    def fleet1(self) -> list[ShipView]:
+        """Ships of fleet 1 still in the battle"""
+        return [ShipView(self.registry, index) for index in self._alive1.tolist()]
+
+    @property
+    def fleet2(self) -> list[ShipView]:
+        """Ships of fleet 2 still in the battle"""
+        return [ShipView(self.registry, index) for index in self._alive2.tolist()]
+
+    @property
+    def finished(self) -> bool:
+        return self.result != "ONGOING" or self.tick_count >= self.ticks
+
+    def _hits(self, fleet: np.ndarray, enemies: np.ndarray) -> np.ndarray:
+        """Registry numbers of every one of `enemies` in the weapon cone of some ship of `fleet`"""
+        if len(fleet) == 0 or len(enemies) == 0:
+            return np.zeros(0, dtype=np.int64)
+        position = self.registry.position
+        weapon_range = float(self.registry.weapon_range[fleet].max())
+        reach = max(1, math.ceil(weapon_range / self.cell_size))
+        shooter, target = SpatialGrid(position[:, enemies], self.cell_size).pairs(position[:, fleet], reach)
+        shooter = fleet[shooter]
+        target = enemies[target]
+        in_range = self.registry.is_in_weapon_range(shooter, position[:, target])
+        return np.unique(target[in_range])
+
+    def _target(self, fleet: np.ndarray, enemies: np.ndarray) -> None:
+        """Point every ship of `fleet` at its nearest ship of `enemies`"""
+        position = self.registry.position
+        enemy = self.registry.enemy
+        # Last tick's targets, as columns of `enemies`, are probably still close.
+        # The extra last entry stays -1, for ships with no enemy (-1) yet.
+        column = np.full(len(self.registry) + 1, -1, dtype=np.int64)
+        column[enemies] = np.arange(len(enemies))
+        hint = column[enemy[fleet]]
+        enemy[fleet] = enemies[nearest(position[:, fleet], position[:, enemies], self.cell_size, hint)]
+
+    def step(self) -> str:
+        """Run one tick and return its result. Does nothing once `finished`."""
+        if self.finished:
+            return self.result
+
+        # Ships move between ticks, like `Simulation`, each steering by its
+        # target's state at the start of the move
+        if self.tick_count > 0:
+            alive = np.concatenate([self._alive1, self._alive2])
+            self.registry.move(alive[self.registry.enemy[alive] >= 0])
+
+        index = self.tick_count
+
+        # Simultaneous fire: a ship destroyed this tick still gets its shot
+        hit1 = self._hits(self._alive2, self._alive1)
+        hit2 = self._hits(self._alive1, self._alive2)
+        if len(hit1) or len(hit2):
+            destroyed1 = np.isin(self._alive1, hit1)
+            destroyed2 = np.isin(self._alive2, hit2)
+            self.destroyed.extend((index, ShipView(self.registry, ship)) for ship in self._alive1[destroyed1].tolist())
+            self.destroyed.extend((index, ShipView(self.registry, ship)) for ship in self._alive2[destroyed2].tolist())
+            self._alive1 = self._alive1[~destroyed1]
+            self._alive2 = self._alive2[~destroyed2]
+
+        if len(self._alive1) == 0 and len(self._alive2) == 0:
+            result = "BOTH_DESTROYED"
+        elif len(self._alive2) == 0:
+            result = "FLEET_1_WINS"
+        elif len(self._alive1) == 0:
+            result = "FLEET_2_WINS"
+        else:
+            result = "ONGOING"
+            self._target(self._alive1, self._alive2)
+            self._target(self._alive2, self._alive1)
+
+        self.result = result
+        self.tick_count = index + 1
+        return result
+
+    def run(self, max_ticks: Union[int, None] = None) -> str:
+        """Step until `finished`, or until `max_ticks` more ticks have run. Returns the latest result."""
+        stop = self.ticks if max_ticks is None else min(self.ticks, self.tick_count + max_ticks)
+        while self.tick_count < stop and not self.finished:
+            self.step()
+        return self.result
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(40351)
+    FLEET_SIZE = 5_000
+    SPREAD = 2_000.0
+
+    def fleet(center: Vector) -> list[Spaceship]:
+        return [
+            Spaceship(
+                position=center + Vector.random_direction() * (random.random() * SPREAD),
+                direction=Vector.random_direction(),
+            )
+            for _ in range(FLEET_SIZE)
+        ]
+
+    battle = FleetSimulation(fleet(Vector(-1000.0, 0.0, 0.0)), fleet(Vector(1000.0, 0.0, 0.0)), ticks=20)
+    for _ in range(battle.ticks):
+        start = time.perf_counter()
+        battle.step()
+        print(
+            f"tick {battle.tick_count - 1}: {time.perf_counter() - start:.3f} s  "
+            f"{len(battle.fleet1)} vs {len(battle.fleet2)}  {battle.result}"
+        )
@@ -0,0 +1,188 @@
+"""
+Enemy-relative geometry of a dueling pair, shared by both ships.
+
+Within a tick, the result check, strategy choice, adaptive coasting, stall
+detection and recorders all ask for the vector between the two ships, its
+length and each ship's angle to the other. `Simulation` gives both ships one
+`RelativeGeometry`, which works each of these out the first time it is asked
+for and keeps it until either ship moves or turns.
+
+Each value is computed with the same operations, in the same order, as the
+`Spaceship` method it stands in for, so duels play out bit for bit as before.
+Both directions between the ships come from one pass over the positions, and
+the distance is the same from either side.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+from typing import TYPE_CHECKING, Union
+
+from spaceship_sim.vector import CacheInfo, MutableVector, _CacheStats
+
+if TYPE_CHECKING:
+    from spaceship_sim.spaceship import Spaceship
+
+
+_cache_stats = _CacheStats()
+
+
+def cache_info() -> CacheInfo:
+    """Hit/miss counts for every `RelativeGeometry` since start up, or since the last `cache_clear_stats()`"""
+    return CacheInfo(hits=_cache_stats.hits, misses=_cache_stats.misses)
+
+
+def cache_clear_stats() -> None:
+    _cache_stats.hits = 0
+    _cache_stats.misses = 0
+
+
+class RelativeGeometry:
+    """The vector, distance and angles between two ships, each computed at most
+    once between moves. Constructing one attaches it to both ships, and
+    setting either ship's `enemy` detaches it from that ship."""
+    __slots__ = (
+        "_position1",
+        "_direction1",
+        "_position2",
+        "_direction2",
+        "_to_ship2",
+        "_to_ship1",
+        "_offset_ready",
+        "_distance",
+        "_distance_squared",
+        "_angle1",
+        "_angle2",
+    )
+
+    def __init__(self, ship1: "Spaceship", ship2: "Spaceship") -> None:
+        # The ships' own state vectors, which are updated in place and never replaced
+        self._position1 = ship1._position
+        self._direction1 = ship1._direction
+        self._position2 = ship2._position
+        self._direction2 = ship2._direction
+        self._to_ship2 = MutableVector()
+        self._to_ship1 = MutableVector()
+        self._offset_ready = False
+        self._distance: Union[float, None] = None
+        self._distance_squared: Union[float, None] = None
+        self._angle1: Union[float, None] = None
+        self._angle2: Union[float, None] = None
+        ship1._geometry = self
+        ship1._geometry_first = True
+        ship2._geometry = self
+        ship2._geometry_first = False
+
+    def invalidate(self) -> None:
+        """Forget everything, after either ship moves or turns"""
+        # Everything cached needs the offsets first, so there's nothing to forget without them
+        if self._offset_ready:
+            self._offset_ready = False
+            self._distance = None
+            self._distance_squared = None
+            self._angle1 = None
+            self._angle2 = None
+
+    def _offsets(self) -> None:
+        self._to_ship2.set_difference(self._position2, self._position1)
+        self._to_ship1.set_difference(self._position1, self._position2)
+        self._offset_ready = True
+
+    def offset(self, first: bool) -> MutableVector:
+        """Vector to the enemy, from ship 1 if `first` or else from ship 2. Don't change it."""
+        if self._offset_ready:
+            _cache_stats.hits += 1
+        else:
+            _cache_stats.misses += 1
+            self._offsets()
+        return self._to_ship2 if first else self._to_ship1
+
+    def distance(self) -> float:
+        """`Spaceship.distance_to_enemy`, the same from either side"""
+        distance = self._distance
+        if distance is None:
+            _cache_stats.misses += 1
+            if not self._offset_ready:
+                self._offsets()
+            distance = self._distance = self._to_ship2.magnitude()
+        else:
+            _cache_stats.hits += 1
+        return distance
+
+    def distance_squared(self) -> float:
+        """The squared distance `Spaceship.is_in_weapon_range` compares with the squared range"""
+        distance_squared = self._distance_squared
+        if distance_squared is None:
+            _cache_stats.misses += 1
+            if not self._offset_ready:
+                self._offsets()
+            to_ship2 = self._to_ship2
+            distance_squared = self._distance_squared = to_ship2.dot(to_ship2)
+        else:
+            _cache_stats.hits += 1
+        return distance_squared
+
+    def angle_degrees(self, first: bool) -> float:
+        """`Spaceship.angle_to_enemy_degree` of ship 1 if `first`, or else of ship 2"""
+        angle = self._angle1 if first else self._angle2
+        if angle is not None:
+            _cache_stats.hits += 1
+            return angle
+        _cache_stats.misses += 1
+        if not self._offset_ready:
+            self._offsets()
+        if first:
+            angle = self._angle1 = self._to_ship2.angle_degrees(self._direction1)
+        else:
+            angle = self._angle2 = self._to_ship1.angle_degrees(self._direction2)
+        return angle
+
+
+if __name__ == "__main__":
+    import random
+
+    # This module's counters, not the copy running as __main__
+    from spaceship_sim import geometry
+    from spaceship_sim.vector import Vector
+    from spaceship_sim.spaceship import Spaceship
+    from spaceship_sim.simulation import Simulation
+    from spaceship_sim.profiling import Profiler
+    from spaceship_sim.rng import derive_seed
+
+    DUELS = 20
+
+    class UncachedSimulation(Simulation):
+        """Every ship works out its own geometry, as before `RelativeGeometry`"""
+        def reset(self, *args, **kwargs) -> None:
+            super().reset(*args, **kwargs)
+            self.ship1._geometry = None
+            self.ship2._geometry = None
+
+    def profile(simulation_class: type) -> tuple[Profiler, list[tuple[str, int]], list]:
+        profiler = Profiler(track_allocations=False)
+        outcomes = []
+        rows = []
+        for index in range(DUELS):
+            rng = random.Random(derive_seed(40351, index))
+            sim = simulation_class(
+                Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+                Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+                ticks=10_000,
+                profiler=profiler,
+                rng=rng,
+            )
+            sim.run()
+            outcomes.append((sim.result, sim.tick_count))
+            rows += sim.recorder.rows()
+        return profiler, outcomes, rows
+
+    uncached, uncached_outcomes, uncached_rows = profile(UncachedSimulation)
+    geometry.cache_clear_stats()
+    cached, cached_outcomes, cached_rows = profile(Simulation)
+
+    print(f"{DUELS} duels, every tick recorded. Same outcomes and rows: {uncached_outcomes == cached_outcomes and uncached_rows == cached_rows}")
+    print(f"{geometry.cache_info()}")
+    print(f"{'phase':<20}{'uncached ms':>14}{'cached ms':>14}")
+    for phase, stats in uncached.phases.items():
+        print(f"{phase:<20}{stats.seconds * 1000:>14.1f}{cached.phases[phase].seconds * 1000:>14.1f}")
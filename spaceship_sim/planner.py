@@ -0,0 +1,367 @@
+"""
+Parameter-space sweeps: vary ship parameters over declared ranges.
+
+Declare a `ParameterRange` for each ship parameter to vary, like
+`ParameterRange("ship1.speed", 0.5, 2.0)`, pick a space-filling design and
+`run_plan()` runs `duels_per_point` duels at every design point:
+
+    grid    every combination of `count` evenly spaced values per parameter
+    lhs     `count` points, a Latin hypercube: one point in each of `count`
+            slices of every parameter's range
+    sobol   the first `count` points of a Sobol sequence (Joe and Kuo's
+            direction numbers), which fills the space evenly at any count
+
+Duel number r of every point starts from the same random positions and
+directions, so differences between points come from the parameters alone.
+
+Finished chunks of duels are checkpointed to a directory. Running the same
+plan with the same directory again skips every chunk already done, so an
+interrupted sweep picks up where it left off.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import itertools
+import json
+import math
+import os
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Union
+
+from spaceship_sim.cache import ResultCache
+from spaceship_sim.sweep import DuelSummary, run_duel
+
+
+SHIP_PARAMETERS = ("speed", "turning_speed", "weapon_range", "weapon_angle_degrees")
+"""Spaceship parameters a plan can vary, for "ship1" and "ship2" """
+
+
+@dataclasses.dataclass(frozen=True)
+class ParameterRange:
+    """A range of values for one ship's parameter, like "ship2.weapon_range" """
+    name: str
+    low: float
+    high: float
+
+    def __post_init__(self) -> None:
+        ship, _, parameter = self.name.partition(".")
+        if ship not in ("ship1", "ship2") or parameter not in SHIP_PARAMETERS:
+            raise ValueError(
+                f"Parameter name must be ship1.<parameter> or ship2.<parameter>, "
+                f"with <parameter> one of {SHIP_PARAMETERS}, got {self.name!r}"
+            )
+        if self.high < self.low:
+            raise ValueError(f"{self.name}: high must be at least low, got {self.low} and {self.high}")
+
+    def scale(self, unit: float) -> float:
+        """Map 0.0 <= unit <= 1.0 onto the range"""
+        return self.low + unit * (self.high - self.low)
+
+
+# Designs generate points in the unit cube [0, 1) ** dimensions
+
+def grid(dimensions: int, count: int, seed: int = 0) -> list[tuple[float, ...]]:
+    """`count` evenly spaced values per dimension, including both ends. `seed` is unused."""
+    if count == 1:
+        values = [0.5]
+    else:
+        values = [number / (count - 1) for number in range(count)]
+    return list(itertools.product(values, repeat=dimensions))
+
+
+def latin_hypercube(dimensions: int, count: int, seed: int = 0) -> list[tuple[float, ...]]:
+    """`count` random points, exactly one in each of `count` equal slices of every dimension"""
+    rng = random.Random(seed)
+    columns = []
+    for _ in range(dimensions):
+        slices = list(range(count))
+        rng.shuffle(slices)
+        columns.append([(number + rng.random()) / count for number in slices])
+    return list(zip(*columns))
+
+
+_SOBOL_BITS = 32
+
+# (s, a, m_1 ... m_s) for dimensions 2 onwards, from new-joe-kuo-6.21201:
+# S. Joe and F. Y. Kuo, "Constructing Sobol sequences with better two-dimensional
+# projections", SIAM J. Sci. Comput. 30, 2635-2654 (2008).
+# https://web.maths.unsw.edu.au/~fkuo/sobol/
+_SOBOL_DIRECTION_NUMBERS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+)
+
+
+def _sobol_directions(dimension: int) -> list[int]:
+    """Direction numbers, scaled to `_SOBOL_BITS` bits, for a 0-based dimension"""
+    if dimension == 0:
+        return [1 << (_SOBOL_BITS - 1 - bit) for bit in range(_SOBOL_BITS)]
+    s, a, m = _SOBOL_DIRECTION_NUMBERS[dimension - 1]
+    directions = [m[bit] << (_SOBOL_BITS - 1 - bit) for bit in range(s)]
+    for bit in range(s, _SOBOL_BITS):
+        direction = directions[bit - s] ^ (directions[bit - s] >> s)
+        for k in range(1, s):
+            if (a >> (s - 1 - k)) & 1:
+                direction ^= directions[bit - k]
+        directions.append(direction)
+    return directions
+
+
+def sobol(dimensions: int, count: int, seed: int = 0) -> list[tuple[float, ...]]:
+    """The first `count` points of the Sobol sequence, starting at the origin.
+    Unscrambled, so `seed` is unused. Balanced best when `count` is a power of 2."""
+    if dimensions > len(_SOBOL_DIRECTION_NUMBERS) + 1:
+        raise ValueError(f"Sobol designs support up to {len(_SOBOL_DIRECTION_NUMBERS) + 1} dimensions, got {dimensions}")
+    if count > 1 << _SOBOL_BITS:
+        raise ValueError(f"Sobol designs support up to 2**{_SOBOL_BITS} points, got {count}")
+    directions = [_sobol_directions(dimension) for dimension in range(dimensions)]
+    state = [0] * dimensions
+    scale = 1.0 / (1 << _SOBOL_BITS)
+    points = []
+    for number in range(count):
+        points.append(tuple(value * scale for value in state))
+        # Gray code order: flip the direction of the lowest zero bit of `number`
+        bit = ((~number) & (number + 1)).bit_length() - 1
+        state = [value ^ directions[dimension][bit] for dimension, value in enumerate(state)]
+    return points
+
+
+DESIGNS: dict[str, Callable[[int, int, int], list[tuple[float, ...]]]] = {
+    "grid": grid,
+    "lhs": latin_hypercube,
+    "sobol": sobol,
+}
+
+
+@dataclasses.dataclass
+class SweepPlan:
+    """What to sweep. `count` is points per parameter for "grid", or total points otherwise."""
+    ranges: list[ParameterRange]
+    design: str = "sobol"
+    count: int = 64
+    duels_per_point: int = 10
+    master_seed: int = 40351
+    max_distance: float = 1000.0
+    ticks: int = 10_000
+
+    def __post_init__(self) -> None:
+        if self.design not in DESIGNS:
+            raise ValueError(f"design must be one of {tuple(DESIGNS)}, got {self.design!r}")
+        names = [parameter.name for parameter in self.ranges]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Each parameter can only have one range, got {names}")
+
+    def points(self) -> list[dict[str, float]]:
+        """Every design point, as {"ship1.speed": 1.25, ...}"""
+        units = DESIGNS[self.design](len(self.ranges), self.count, self.master_seed)
+        return [
+            {parameter.name: parameter.scale(unit) for parameter, unit in zip(self.ranges, point)}
+            for point
+            in units
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, dict_: dict[str, Any]) -> "SweepPlan":
+        return cls(**{
+            **dict_,
+            "ranges": [ParameterRange(**parameter) for parameter in dict_["ranges"]],
+        })
+
+
+@dataclasses.dataclass(frozen=True)
+class PlannedDuel:
+    """One duel of a plan: design point number `point`, and how it went"""
+    point: int
+    summary: DuelSummary
+
+
+def _ship_parameters(point: dict[str, float], ship: str) -> dict[str, float]:
+    prefix = ship + "."
+    return {name[len(prefix):]: value for name, value in point.items() if name.startswith(prefix)}
+
+
+def _run_plan_chunk(
+    plan_dict: dict[str, Any],
+    start: int,
+    stop: int,
+    cache_path: Union[str, None] = None,
+) -> list[dict[str, Any]]:
+    """Duels number `start` to `stop` of the plan, as JSON-ready dicts"""
+    plan = SweepPlan.from_dict(plan_dict)
+    points = plan.points()
+    rows = []
+    cache = None if cache_path is None else ResultCache(cache_path)
+    try:
+        for number in range(start, stop):
+            point, replicate = divmod(number, plan.duels_per_point)
+            # Seeded by replicate, not duel number: every point gets the same starts
+            summary = run_duel(
+                replicate,
+                plan.master_seed,
+                max_distance=plan.max_distance,
+                ticks=plan.ticks,
+                ship1_parameters=_ship_parameters(points[point], "ship1"),
+                ship2_parameters=_ship_parameters(points[point], "ship2"),
+                cache=cache,
+            )
+            rows.append({"point": point, "summary": dataclasses.asdict(summary)})
+    finally:
+        if cache is not None:
+            cache.close()
+    return rows
+
+
+@dataclasses.dataclass
+class PlanResult:
+    """Every duel of a finished plan, in duel number order"""
+    plan: SweepPlan
+    points: list[dict[str, float]]
+    duels: list[PlannedDuel]
+
+    def result_counters(self) -> list[Counter]:
+        """Results at each design point"""
+        counters = [Counter() for _ in self.points]
+        for duel in self.duels:
+            counters[duel.point][duel.summary.result] += 1
+        return counters
+
+    def rates(self, result: str = "SHIP_1_WINS") -> list[float]:
+        """Fraction of duels at each design point that ended with `result`"""
+        return [counter[result] / self.plan.duels_per_point for counter in self.result_counters()]
+
+    def summary(self) -> str:
+        rv = ""
+        rv += f"DESIGN: {self.plan.design}  POINTS: {len(self.points)}  DUELS: {len(self.duels)}\n"
+        rv += f"{'  '.join(parameter.name for parameter in self.plan.ranges)}  SHIP_1_WINS"
+        for point, rate in zip(self.points, self.rates()):
+            rv += "\n" + "  ".join(f"{value:>{len(name)}.3f}" for name, value in point.items())
+            rv += f"  {rate:>11.1%}"
+        return rv
+
+
+def _write_json(path: Path, document: Any) -> None:
+    """Write atomically, so an interrupted write never leaves a partial checkpoint"""
+    partial = path.with_name(path.name + ".partial")
+    partial.write_text(json.dumps(document), encoding="utf8")
+    os.replace(partial, path)
+
+
+def run_plan(
+    plan: SweepPlan,
+    checkpoint_dir: Union[Path, None] = None,
+    workers: Union[int, None] = None,
+    chunk_size: Union[int, None] = None,
+    cache_path: Union[str, None] = None,
+) -> PlanResult:
+    """Run every duel of a plan, resuming from `checkpoint_dir` if it has some done already.
+
+    Args:
+        plan (SweepPlan): What to run.
+        checkpoint_dir (Path | None, optional): Where to keep finished chunks. Defaults to None, no checkpoints.
+        workers (int | None, optional): Worker processes. Defaults to os.cpu_count(). 1 runs in this process.
+        chunk_size (int | None, optional): Duels per chunk. Defaults to the checkpoint's, or about 4 chunks per worker.
+        cache_path (str | None, optional): SQLite `ResultCache` shared with other sweeps. Defaults to None, no cache.
+
+    Returns:
+        PlanResult: Every duel, in order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    points = plan.points()
+    count = len(points) * plan.duels_per_point
+
+    if checkpoint_dir is not None:
+        checkpoint_dir = Path(checkpoint_dir)
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        plan_path = checkpoint_dir / "plan.json"
+        if plan_path.exists():
+            saved = json.loads(plan_path.read_text(encoding="utf8"))
+            if SweepPlan.from_dict(saved["plan"]) != plan:
+                raise ValueError(f"{checkpoint_dir} holds checkpoints of a different plan")
+            if chunk_size is not None and chunk_size != saved["chunk_size"]:
+                raise ValueError(f"{checkpoint_dir} was checkpointed with chunk_size={saved['chunk_size']}")
+            chunk_size = saved["chunk_size"]
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(count / (workers * 4)))
+    if checkpoint_dir is not None and not plan_path.exists():
+        _write_json(plan_path, {"plan": plan.to_dict(), "chunk_size": chunk_size})
+
+    def chunk_path(start: int) -> Path:
+        return checkpoint_dir / f"chunk-{start:010d}.json"
+
+    chunks: dict[int, list[dict[str, Any]]] = {}
+    pending = []
+    for start in range(0, count, chunk_size):
+        if checkpoint_dir is not None and chunk_path(start).exists():
+            chunks[start] = json.loads(chunk_path(start).read_text(encoding="utf8"))
+        else:
+            pending.append(start)
+
+    def finished(start: int, rows: list[dict[str, Any]]) -> None:
+        chunks[start] = rows
+        if checkpoint_dir is not None:
+            _write_json(chunk_path(start), rows)
+
+    plan_dict = plan.to_dict()
+    if cache_path is not None:
+        cache_path = str(cache_path)
+    if workers == 1:
+        for start in pending:
+            finished(start, _run_plan_chunk(plan_dict, start, min(start + chunk_size, count), cache_path))
+    else:
+        # Only needed here, and slow to import
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_run_plan_chunk, plan_dict, start, min(start + chunk_size, count), cache_path): start
+                for start
+                in pending
+            }
+            # Checkpoint each chunk as soon as it's done, in whatever order
+            for future in concurrent.futures.as_completed(futures):
+                finished(futures[future], future.result())
+
+    duels = [
+        PlannedDuel(point=row["point"], summary=DuelSummary(**row["summary"]))
+        for start in sorted(chunks)
+        for row in chunks[start]
+    ]
+    return PlanResult(plan=plan, points=points, duels=duels)
+
+
+if __name__ == "__main__":
+    import time
+
+    plan = SweepPlan(
+        ranges=[
+            ParameterRange("ship1.speed", 0.5, 2.0),
+            ParameterRange("ship1.turning_speed", 2.0, 30.0),
+            ParameterRange("ship1.weapon_range", 20.0, 80.0),
+        ],
+        design="sobol",
+        count=16,
+        duels_per_point=8,
+    )
+    start = time.perf_counter()
+    result = run_plan(plan, checkpoint_dir=Path("./plan_checkpoint"))
+    print(f"{len(result.duels)} duels in {time.perf_counter() - start:.2f} s")
+    print(result.summary())
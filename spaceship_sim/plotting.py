@@ -0,0 +1,155 @@
+"""
+Plots of duels and sweeps.
+
+matplotlib is only imported when something is plotted, so importing this
+module is cheap. Pass `path` to save a figure instead of showing it, which
+works without a display.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence, Union
+
+if TYPE_CHECKING:
+    from spaceship_sim.recorder import Row
+    from spaceship_sim.sweep import SweepResult
+    from spaceship_sim.vector import Vector
+
+
+def _pyplot(path: Union[Path, str, None]):
+    import matplotlib
+
+    if path is not None:
+        # No display needed to save to a file
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _finish(plt, path: Union[Path, str, None]) -> None:
+    if path is None:
+        plt.show()
+    else:
+        plt.savefig(path)
+        plt.close("all")
+
+
+def plot_duel(rows: Sequence["Row"], text: str = "", path: Union[Path, str, None] = None) -> None:
+    """Both ships' paths in 3D, then strategies, separation and angles by tick.
+    `rows` are `Row`s or `Data`, like `sim.data`. With `path`, both figures are
+    saved, the second with "-ticks" added to its name."""
+    plt = _pyplot(path)
+
+    ship1_x = [row.ship1_position_x for row in rows]
+    ship1_y = [row.ship1_position_y for row in rows]
+    ship1_z = [row.ship1_position_z for row in rows]
+    ship2_x = [row.ship2_position_x for row in rows]
+    ship2_y = [row.ship2_position_y for row in rows]
+    ship2_z = [row.ship2_position_z for row in rows]
+
+    ax_path = plt.axes(projection="3d")
+    ax_path.plot(ship1_x, ship1_y, ship1_z, label="ship1")
+    ax_path.scatter(ship1_x, ship1_y, ship1_z, label="ship1")
+    ax_path.plot(ship2_x, ship2_y, ship2_z, label="ship2")
+    ax_path.scatter(ship2_x, ship2_y, ship2_z, label="ship2")
+    ax_path.legend()
+    ax_path.set_xlabel("x")
+    ax_path.set_ylabel("y")
+    ax_path.set_zlabel("z")
+    _finish(plt, path)
+
+    fig, [[ax_strategy, ax_distance], [ax_angle, ax_text]] = plt.subplots(2, 2)
+    ax_strategy.plot([row.ship1_strategy.replace("-", "\n") for row in rows], label="ship1")
+    ax_strategy.plot([row.ship2_strategy.replace("-", "\n") for row in rows], label="ship2")
+    ax_strategy.legend()
+    ax_strategy.set_title("Strategy")
+    ax_strategy.set_xlabel("Tick")
+
+    ax_distance.plot([row.ship_distance for row in rows])
+    ax_distance.set_title("Ship separation")
+    ax_distance.set_xlabel("Tick")
+
+    ax_angle.plot([row.ship1_angle_to_enemy for row in rows], label="ship1")
+    ax_angle.plot([row.ship2_angle_to_enemy for row in rows], label="ship2")
+    ax_angle.legend()
+    ax_angle.set_title("Angle to enemy ship (deg)")
+    ax_angle.set_xlabel("Tick")
+
+    ax_text.set_title("Parameters")
+    ax_text.text(0.1, 0.1, text)
+    if path is None:
+        _finish(plt, None)
+    else:
+        path = Path(path)
+        _finish(plt, path.with_name(f"{path.stem}-ticks{path.suffix}"))
+
+
+def plot_sweep(sweep: "SweepResult", path: Union[Path, str, None] = None) -> None:
+    """Results by initial distance and by length, length by initial distance,
+    and result counts. Needs a sweep run with `keep_duels`."""
+    plt = _pyplot(path)
+
+    results = [duel.result for duel in sweep.duels]
+    initial_distance = [duel.initial_distance for duel in sweep.duels]
+    simulation_length = [duel.ticks for duel in sweep.duels]
+    result_counter = sweep.result_counter
+
+    fig, [[ax1, ax2], [ax3, ax4]] = plt.subplots(2, 2)
+
+    ax1.scatter(initial_distance, results)
+    ax1.set_title(f"Initial distance")
+    ax1.set_xlabel(f"Results by initial distance")
+    ax1.set_ylabel(f"Result")
+
+    ax2.scatter(simulation_length, results)
+    ax2.set_title(f"Simulation length (ticks)")
+    ax2.set_xlabel(f"Results by Simulation length")
+    ax2.set_ylabel(f"Result")
+
+    ax3.scatter(initial_distance, simulation_length)
+    ax3.set_title(f"Simulation length by initial distance")
+    ax3.set_xlabel(f"Initial distance")
+    ax3.set_ylabel(f"Length (ticks)")
+
+    ax4.bar(result_counter.keys(), result_counter.values())
+    ax4.set_title(f"Total result counts")
+    ax4.set_xlabel(f"Result")
+    ax4.set_ylabel(f"Count")
+
+    _finish(plt, path)
+
+
+def plot_paths(paths: dict[str, Sequence["Vector"]], path: Union[Path, str, None] = None) -> None:
+    """Paths seen from above, x against y, one line for each label"""
+    plt = _pyplot(path)
+    for label, points in paths.items():
+        plt.plot([point.x for point in points], [point.y for point in points], label=label)
+    plt.legend()
+    _finish(plt, path)
+
+
+if __name__ == "__main__":
+    from spaceship_sim.vector import Vector
+    from spaceship_sim.spaceship import Spaceship
+
+    # A slow-turning ship chasing a fast-turning one that stays put
+    slow = Spaceship(name="slow", turning_speed=5.0, speed=2.0, position=Vector(10,10,10))
+    fast = Spaceship(name="fast", turning_speed=20.0, speed=1.0, position=Vector(0,0,0))
+    slow.enemy = fast
+    fast.enemy = slow
+
+    slow_positions: list[Vector] = []
+    fast_positions: list[Vector] = []
+    for tick in range(100):
+        slow_positions.append(slow.position)
+        fast_positions.append(fast.position)
+        slow.move(enemy_position=fast.position, enemy_direction=fast.direction)
+
+    plot_paths({
+        f"{slow.turning_speed} deg per tick, speed={slow.speed}": slow_positions,
+        f"{fast.turning_speed} deg per tick, speed={fast.speed}": fast_positions,
+    })
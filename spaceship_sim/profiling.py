@@ -0,0 +1,132 @@
+"""
+Opt-in per-phase profiling for the tick loop.
+
+Give `Simulation` (or a lone `Spaceship`) a `Profiler` and every tick's
+phases are timed and counted:
+
+    choose_strategy     `Spaceship.choose_strategy`
+    implement_strategy  `Spaceship.implement_strategy`, including `turn_towards`
+    move                the position update at the end of `Spaceship.move`
+    weapon_check        both ships' `is_enemy_in_weapon_range`
+    stall_check         the `StallDetector`, if there is one
+    record              the `Recorder`
+
+With no profiler, each phase costs one `is None` check.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import sys
+import time
+from typing import Callable, Iterable
+
+
+@dataclasses.dataclass
+class PhaseStats:
+    calls: int = 0
+    nanoseconds: int = 0
+    blocks: int = 0
+    """Net change in allocated memory blocks (`sys.getallocatedblocks()`)"""
+
+    @property
+    def seconds(self) -> float:
+        return self.nanoseconds / 1e9
+
+
+ProfileReport = dict[str, PhaseStats]
+"""Phase name to its cumulative stats"""
+
+
+class Profiler:
+    """Cumulative time, call count and net allocations per phase.
+
+    Usage inside instrumented code:
+        token = profiler.start()
+        ...phase one...
+        token = profiler.stop("one", token)
+        ...phase two...
+        profiler.stop("two", token)
+    """
+    def __init__(
+        self,
+        track_allocations: bool = True,
+        hooks: Iterable[Callable[[ProfileReport], None]] = (),
+    ) -> None:
+        """_summary_
+
+        Args:
+            track_allocations (bool, optional): Count allocated blocks too. Defaults to True.
+            hooks (Iterable[Callable[[ProfileReport], None]], optional): Called by `emit()`, e.g. at the end of each duel.
+        """
+        self.track_allocations = track_allocations
+        self.hooks = list(hooks)
+        self.phases: ProfileReport = {}
+
+    def start(self) -> tuple[int, int]:
+        blocks = sys.getallocatedblocks() if self.track_allocations else 0
+        return (time.perf_counter_ns(), blocks)
+
+    def stop(self, phase: str, token: tuple[int, int]) -> tuple[int, int]:
+        """Charge everything since `token` to `phase`, and return a token for the next phase"""
+        now = time.perf_counter_ns()
+        blocks = sys.getallocatedblocks() if self.track_allocations else 0
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.calls += 1
+        stats.nanoseconds += now - token[0]
+        stats.blocks += blocks - token[1]
+        # Exclude our own bookkeeping from the next phase
+        return (time.perf_counter_ns(), sys.getallocatedblocks() if self.track_allocations else 0)
+
+    def report(self) -> ProfileReport:
+        """A copy of the stats so far"""
+        return {phase: dataclasses.replace(stats) for phase, stats in self.phases.items()}
+
+    def add_hook(self, hook: Callable[[ProfileReport], None]) -> None:
+        self.hooks.append(hook)
+
+    def emit(self) -> None:
+        """Send the report so far to every hook"""
+        report = self.report()
+        for hook in self.hooks:
+            hook(report)
+
+    def reset(self) -> None:
+        self.phases = {}
+
+    def summary(self) -> str:
+        total = sum(stats.nanoseconds for stats in self.phases.values()) or 1
+        rv = f"{'PHASE':<20}{'CALLS':>10}{'TOTAL (s)':>12}{'PER CALL (us)':>15}{'SHARE':>8}{'BLOCKS':>10}"
+        for phase, stats in sorted(self.phases.items(), key=lambda item: -item[1].nanoseconds):
+            rv += (
+                f"\n{phase:<20}{stats.calls:>10}{stats.seconds:>12.4f}"
+                f"{stats.nanoseconds / stats.calls / 1e3:>15.2f}"
+                f"{stats.nanoseconds / total:>8.1%}{stats.blocks:>10}"
+            )
+        return rv
+
+
+if __name__ == "__main__":
+    import random
+
+    from spaceship_sim.vector import Vector
+    from spaceship_sim.spaceship import Spaceship
+    from spaceship_sim.simulation import Simulation
+    from spaceship_sim.recorder import OutcomeRecorder
+
+    random.seed(40351)
+    profiler = Profiler(hooks=[lambda report: print(f"duel done, {report['move'].calls} moves so far")])
+    for _ in range(10):
+        sim = Simulation(
+            Spaceship(position=Vector.random_direction() * 1000.0, direction=Vector.random_direction()),
+            Spaceship(position=Vector.random_direction() * 1000.0, direction=Vector.random_direction()),
+            ticks=10_000,
+            recorder=OutcomeRecorder(),
+            profiler=profiler,
+        )
+        sim.run()
+    print(profiler.summary())
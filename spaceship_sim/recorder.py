@@ -0,0 +1,252 @@
+"""
+Per-tick telemetry recorders for `Simulation`.
+
+A recorder writes one fixed-width row of float64s per recorded tick into a
+preallocated `array.array`, so recording doesn't create any per-tick objects.
+Results and strategies are stored as their index in `RESULTS` and their
+`strategies` registry code.
+
+Detail levels:
+    `TraceRecorder()`: every tick
+    `TraceRecorder(every=N)`: every Nth tick, plus the final tick
+    `OutcomeRecorder()`: only the first and final ticks
+    `SummaryRecorder()`: only the first and final ticks, plus optional running
+        aggregates over every tick
+    `Recorder()`: nothing at all
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import array
+import math
+from collections import Counter
+from typing import Iterator, NamedTuple, Union
+
+from spaceship_sim import strategies
+from spaceship_sim.spaceship import Spaceship
+
+
+RESULTS = ("ONGOING", "SHIP_1_WINS", "SHIP_2_WINS", "BOTH_DESTROYED", "STALEMATE")
+"""Every possible simulation result, in the order used for integer result codes"""
+
+_RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+
+
+class Row(NamedTuple):
+    """One recorded tick. Same fields, in the same order, as the `to_csv` columns"""
+    index: int
+    result: str
+    ship1_strategy: str
+    ship2_strategy: str
+
+    ship1_position_x: float
+    ship1_position_y: float
+    ship1_position_z: float
+    ship2_position_x: float
+    ship2_position_y: float
+    ship2_position_z: float
+
+    ship1_direction_x: float
+    ship1_direction_y: float
+    ship1_direction_z: float
+    ship2_direction_x: float
+    ship2_direction_y: float
+    ship2_direction_z: float
+
+    ship_distance: float
+    ship1_angle_to_enemy: float
+    ship2_angle_to_enemy: float
+
+
+ROW_WIDTH = len(Row._fields)
+"""Floats per recorded row"""
+
+# Most rows preallocated up front. Longer duels grow the buffer by doubling.
+MAX_PREALLOCATED_ROWS = 1024
+
+
+class Recorder:
+    """Records nothing. Base class for the other recorders."""
+    def start(self, ticks: int) -> None:
+        """Called once before the first tick, with the tick limit"""
+
+    def wants(self, index: int) -> bool:
+        """Should tick `index` be recorded? The final tick is recorded regardless."""
+        return False
+
+    def record(self, index: int, result: str, ship1: Spaceship, ship2: Spaceship) -> None:
+        pass
+
+    def finish(self) -> None:
+        """Called after the final tick. Recording may resume if the tick limit is raised."""
+
+    def __len__(self) -> int:
+        return 0
+
+    def row(self, number: int) -> Row:
+        raise IndexError(f"Row {number} not recorded")
+
+    def rows(self) -> Iterator[Row]:
+        for number in range(len(self)):
+            yield self.row(number)
+
+
+class TraceRecorder(Recorder):
+    """Records every `every`th tick, plus the final tick, into a flat float64 array"""
+    def __init__(self, every: int = 1) -> None:
+        if every < 1:
+            raise ValueError(f"every must be at least 1, got {every}")
+        self.every = every
+        self.buffer = array.array("d")
+        self._count = 0
+        self._capacity = 0
+
+    def _expected_rows(self, ticks: int) -> int:
+        return min(ticks // self.every + 2, MAX_PREALLOCATED_ROWS)
+
+    def start(self, ticks: int) -> None:
+        self._count = 0
+        self._capacity = max(1, self._expected_rows(ticks))
+        self.buffer = array.array("d", bytes(8 * ROW_WIDTH * self._capacity))
+
+    def wants(self, index: int) -> bool:
+        return index % self.every == 0
+
+    def record(self, index: int, result: str, ship1: Spaceship, ship2: Spaceship) -> None:
+        if self._count == self._capacity:
+            extra = max(self._capacity, 16)
+            self.buffer.frombytes(bytes(8 * ROW_WIDTH * extra))
+            self._capacity += extra
+
+        buffer = self.buffer
+        offset = self._count * ROW_WIDTH
+        ship1_position = ship1.position
+        ship2_position = ship2.position
+        ship1_direction = ship1.direction
+        ship2_direction = ship2.direction
+
+        buffer[offset] = index
+        buffer[offset + 1] = _RESULT_CODES[result]
+        buffer[offset + 2] = ship1.strategy_code
+        buffer[offset + 3] = ship2.strategy_code
+
+        buffer[offset + 4] = ship1_position.x
+        buffer[offset + 5] = ship1_position.y
+        buffer[offset + 6] = ship1_position.z
+        buffer[offset + 7] = ship2_position.x
+        buffer[offset + 8] = ship2_position.y
+        buffer[offset + 9] = ship2_position.z
+
+        buffer[offset + 10] = ship1_direction.x
+        buffer[offset + 11] = ship1_direction.y
+        buffer[offset + 12] = ship1_direction.z
+        buffer[offset + 13] = ship2_direction.x
+        buffer[offset + 14] = ship2_direction.y
+        buffer[offset + 15] = ship2_direction.z
+
+        buffer[offset + 16] = ship1.distance_to_enemy()
+        buffer[offset + 17] = ship1.angle_to_enemy_degree()
+        buffer[offset + 18] = ship2.angle_to_enemy_degree()
+
+        self._count += 1
+
+    def finish(self) -> None:
+        del self.buffer[self._count * ROW_WIDTH:]
+        self._capacity = self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def row(self, number: int) -> Row:
+        if number < 0:
+            number += self._count
+        if not 0 <= number < self._count:
+            raise IndexError(f"Row {number} not recorded")
+        offset = number * ROW_WIDTH
+        values = self.buffer[offset:offset + ROW_WIDTH]
+        return Row(
+            int(values[0]),
+            RESULTS[int(values[1])],
+            strategies.name(int(values[2])),
+            strategies.name(int(values[3])),
+            *values[4:],
+        )
+
+    def column(self, name: str) -> array.array:
+        """Every recorded value of one `Row` field, as raw floats (codes for result and strategies)"""
+        return self.buffer[Row._fields.index(name)::ROW_WIDTH]
+
+
+class OutcomeRecorder(TraceRecorder):
+    """Records only the first tick and the final tick"""
+    def __init__(self) -> None:
+        super().__init__(every=1)
+
+    def _expected_rows(self, ticks: int) -> int:
+        return 2
+
+    def wants(self, index: int) -> bool:
+        return index == 0
+
+
+class SummaryRecorder(OutcomeRecorder):
+    """Records the first and final ticks, like `OutcomeRecorder`, with running
+    aggregates of every tick in between if `aggregates` is set:
+
+        min_distance        closest approach, and `min_distance_index` its tick
+        ship1_strategy_ticks, ship2_strategy_ticks
+                            Counter of ticks spent in each strategy, by code
+
+    Only the final tick's row is written in full, so the ticks between cost
+    one distance and two Counter updates each.
+    """
+    def __init__(self, aggregates: bool = False) -> None:
+        super().__init__()
+        self.aggregates = aggregates
+        self._reset_aggregates()
+
+    def _reset_aggregates(self) -> None:
+        self.min_distance = math.inf
+        self.min_distance_index = -1
+        self.ship1_strategy_ticks: Counter = Counter()
+        self.ship2_strategy_ticks: Counter = Counter()
+        self._last: Union[tuple[int, str, Spaceship, Spaceship], None] = None
+
+    def start(self, ticks: int) -> None:
+        super().start(ticks)
+        self._reset_aggregates()
+
+    def wants(self, index: int) -> bool:
+        return self.aggregates or index == 0
+
+    def record(self, index: int, result: str, ship1: Spaceship, ship2: Spaceship) -> None:
+        if self.aggregates:
+            distance = ship1.distance_to_enemy()
+            if distance < self.min_distance:
+                self.min_distance = distance
+                self.min_distance_index = index
+            self.ship1_strategy_ticks[ship1.strategy_code] += 1
+            self.ship2_strategy_ticks[ship2.strategy_code] += 1
+        if self._count == 0:
+            super().record(index, result, ship1, ship2)
+        else:
+            # Maybe the final tick. Written by finish() if so.
+            self._last = (index, result, ship1, ship2)
+
+    def finish(self) -> None:
+        if self._last is not None:
+            # Replaces the final row of an earlier finish(), if resumed
+            self._count = 1
+            super().record(*self._last)
+            self._last = None
+        super().finish()
+
+    @property
+    def first(self) -> Row:
+        return self.row(0)
+
+    @property
+    def final(self) -> Row:
+        return self.row(-1)
@@ -0,0 +1,465 @@
+"""
+Ship state for large fleets, as structure-of-arrays.
+
+A `ShipRegistry` keeps every ship's state in contiguous NumPy arrays, laid
+out like `batch.ShipArrays`: vectors as (3, n) arrays, so `position[0]` is
+every x coordinate. Each `Spaceship` costs a `__dict__`, five
+`MutableVector`s and a reference to its enemy; a registered ship is one
+column of each array, and its enemy is an index.
+
+`registry[i]` is a `ShipView`, a two-slot proxy with `Spaceship`'s attribute
+API (`position`, `direction`, `speed`, `enemy`, `move()`, ...) that reads and
+writes the arrays. Views are cheap to make and hold no state of their own,
+so two views of the same ship compare equal.
+
+Bulk updates skip the views: `registry.move()` moves every ship at once with
+`batch`'s vectorized `Spaceship.move`, and the `position`, `direction` and
+`speed` arrays can be changed in place. As in `batch`, only the built-in
+strategies are vectorized. Outcomes match `Spaceship`'s, but positions and
+directions can differ in the last bit, where NumPy squares exactly and
+Python's `x ** 2` can be one ulp off.
+
+Views work anywhere a `Spaceship` does through its public attributes,
+including as `Simulation`'s ships, but a registry view is a new object
+each time: compare or hash views, never their `id()`s.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import random
+from typing import Iterator, Sequence, Union
+
+import numpy as np
+
+from spaceship_sim.batch import ShipArrays, weapon_range_squared
+from spaceship_sim.spaceship import Spaceship, StrategyParameters
+from spaceship_sim import strategies
+from spaceship_sim.strategies import PATROL
+from spaceship_sim.vector import MutableVector, Vector, cone_limit, turn_limit
+
+
+class ShipRegistry:
+    """Every ship's state, one column per ship. Ships are numbered in the order they're added."""
+    def __init__(self, capacity: int = 1024) -> None:
+        """_summary_
+
+        Args:
+            capacity (int, optional): Ships to make room for up front. Grows as needed. Defaults to 1024.
+        """
+        self._count = 0
+        self._arrays = ShipArrays(
+            position=np.zeros((3, capacity)),
+            direction=np.zeros((3, capacity)),
+            speed=np.zeros(capacity),
+            turning_speed=np.zeros(capacity),
+            weapon_range=np.zeros(capacity),
+            weapon_angle_degrees=np.zeros(capacity),
+            strategy=np.zeros(capacity, dtype=np.int8),
+            turn_cos=np.zeros(capacity),
+            turn_sin=np.zeros(capacity),
+            weapon_range_squared=np.zeros(capacity),
+            weapon_cone=np.zeros(capacity),
+            chase_distance_factor=np.zeros(capacity),
+            chase_angle_degrees=np.zeros(capacity),
+            evade_retreat=np.zeros(capacity),
+            rng=np.empty(capacity, dtype=object),
+        )
+        self._enemy = np.full(capacity, -1, dtype=np.int64)
+        self._names: list[str] = []
+
+    @classmethod
+    def from_ships(cls, ships: Sequence[Spaceship]) -> "ShipRegistry":
+        """Copy of the ships' state, with enemies among `ships` kept as indices"""
+        registry = cls(capacity=max(1, len(ships)))
+        arrays = ShipArrays.from_ships(ships)
+        for field in dataclasses.fields(ShipArrays):
+            getattr(registry._arrays, field.name)[..., :len(ships)] = getattr(arrays, field.name)
+        numbers = {id(ship): number for number, ship in enumerate(ships)}
+        registry._enemy[:len(ships)] = [
+            numbers.get(id(ship.enemy), -1) if ship.enemy is not None else -1
+            for ship
+            in ships
+        ]
+        registry._names = [ship.name for ship in ships]
+        registry._count = len(ships)
+        return registry
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> "ShipView":
+        if not -self._count <= index < self._count:
+            raise IndexError(f"Ship {index} out of range for {self._count} ships")
+        return ShipView(self, index % self._count)
+
+    def __iter__(self) -> Iterator["ShipView"]:
+        for index in range(self._count):
+            yield ShipView(self, index)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._enemy)
+
+    def _grow(self, capacity: int) -> None:
+        for field in dataclasses.fields(ShipArrays):
+            old = getattr(self._arrays, field.name)
+            new = np.zeros(old.shape[:-1] + (capacity,), dtype=old.dtype)
+            new[..., :self._count] = old[..., :self._count]
+            setattr(self._arrays, field.name, new)
+        enemy = np.full(capacity, -1, dtype=np.int64)
+        enemy[:self._count] = self._enemy[:self._count]
+        self._enemy = enemy
+
+    def add(
+        self,
+        position: Vector = Vector.zero,
+        direction: Vector = Vector.plus_x,
+        speed: float = 1.0,
+        turning_speed: float = 10.0,
+        weapon_range: float = 50.0,
+        weapon_angle_degrees: float = 15.0,
+        name: str = "",
+        rng: Union[random.Random, None] = None,
+        strategy_parameters: StrategyParameters = StrategyParameters(),
+    ) -> "ShipView":
+        """Add a ship, with the same arguments and defaults as `Spaceship`, and return its view"""
+        if self._count == self.capacity:
+            self._grow(2 * self.capacity)
+        ship = ShipView(self, self._count)
+        self._count += 1
+        self._names.append(name)
+        ship.position = position
+        ship.direction = direction.normalized
+        ship.speed = speed
+        ship.turning_speed = turning_speed
+        ship.weapon_range = weapon_range
+        ship.weapon_angle_degrees = weapon_angle_degrees
+        ship.rng = rng
+        ship.strategy_parameters = strategy_parameters
+        ship.strategy_code = PATROL
+        self._enemy[ship.index] = -1
+        return ship
+
+    # Views of the live arrays, for bulk updates in place
+
+    @property
+    def position(self) -> np.ndarray:
+        """Every position, shape (3, n)"""
+        return self._arrays.position[:, :self._count]
+
+    @property
+    def direction(self) -> np.ndarray:
+        """Every direction, shape (3, n)"""
+        return self._arrays.direction[:, :self._count]
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self._arrays.speed[:self._count]
+
+    @property
+    def weapon_range(self) -> np.ndarray:
+        return self._arrays.weapon_range[:self._count]
+
+    @property
+    def strategy_code(self) -> np.ndarray:
+        return self._arrays.strategy[:self._count]
+
+    @property
+    def enemy(self) -> np.ndarray:
+        """Index of every ship's enemy, -1 for none"""
+        return self._enemy[:self._count]
+
+    def is_in_weapon_range(self, index: Union[np.ndarray, Sequence[int]], point: np.ndarray) -> np.ndarray:
+        """`Spaceship.is_in_weapon_range` for many ships at once: whether each
+        ship of `index` has the matching column of `point`, shape (3, len(index)),
+        in its weapon cone"""
+        return self._arrays.take(np.asarray(index, dtype=np.int64)).is_in_weapon_range(point)
+
+    def move(
+        self,
+        index: Union[np.ndarray, Sequence[int], None] = None,
+        enemy_position: Union[np.ndarray, None] = None,
+        enemy_direction: Union[np.ndarray, None] = None,
+        strategy: Union[np.ndarray, int, None] = None,
+    ) -> None:
+        """`Spaceship.move` for many ships at once. Every ship reads the state
+        from before the call, so the order of `index` doesn't matter.
+
+        Args:
+            index (np.ndarray | Sequence[int] | None, optional): Ships to move. Defaults to None, all of them.
+            enemy_position (np.ndarray | None, optional): (3, len(index)) positions to steer by. Defaults to None, each enemy's current position.
+            enemy_direction (np.ndarray | None, optional): (3, len(index)) directions to steer by. Defaults to None, each enemy's current direction.
+            strategy (np.ndarray | int | None, optional): Strategy codes to use instead of choosing. Defaults to None, choose as `Spaceship` does.
+        """
+        if index is None:
+            index = np.arange(self._count)
+        index = np.asarray(index, dtype=np.int64)
+        enemy = self._enemy[index]
+        has_enemy = enemy >= 0
+        # Ships without an enemy patrol, so their own column stands in
+        ships = self._arrays.take(index)
+        enemies = self._arrays.take(np.where(has_enemy, enemy, index))
+        if enemy_position is None:
+            enemy_position = enemies.position
+        if enemy_direction is None:
+            enemy_direction = enemies.direction
+
+        if strategy is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ships.choose_strategy(enemies)
+            ships.strategy[~has_enemy] = PATROL
+        else:
+            ships.strategy = np.broadcast_to(np.asarray(strategy, dtype=np.int8), index.shape).copy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ships.implement_strategy(enemy_position, enemy_direction)
+            ships.advance()
+
+        self._arrays.position[:, index] = ships.position
+        self._arrays.direction[:, index] = ships.direction
+        self._arrays.strategy[index] = ships.strategy
+
+
+class ShipView:
+    """One ship of a `ShipRegistry`, with the attribute API of `Spaceship`"""
+    __slots__ = ("registry", "index")
+
+    def __init__(self, registry: ShipRegistry, index: int) -> None:
+        self.registry = registry
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f"ShipView(name={self.name!r}, position={self.position}, direction={self.direction}), speed={self.speed}, turning_speed={self.turning_speed})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ShipView):
+            return NotImplemented
+        return self.registry is other.registry and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.registry), self.index))
+
+    def _column(self, array: np.ndarray) -> Vector:
+        return Vector(*array[:, self.index].tolist())
+
+    @property
+    def position(self) -> Vector:
+        return self._column(self.registry._arrays.position)
+
+    @position.setter
+    def position(self, value: Vector) -> None:
+        self.registry._arrays.position[:, self.index] = tuple(value)
+
+    @property
+    def direction(self) -> Vector:
+        return self._column(self.registry._arrays.direction)
+
+    @direction.setter
+    def direction(self, value: Vector) -> None:
+        self.registry._arrays.direction[:, self.index] = tuple(value)
+
+    @property
+    def speed(self) -> float:
+        return float(self.registry._arrays.speed[self.index])
+
+    @speed.setter
+    def speed(self, value: float) -> None:
+        self.registry._arrays.speed[self.index] = value
+
+    @property
+    def turning_speed(self) -> float:
+        return float(self.registry._arrays.turning_speed[self.index])
+
+    @turning_speed.setter
+    def turning_speed(self, value: float) -> None:
+        arrays = self.registry._arrays
+        arrays.turning_speed[self.index] = value
+        arrays.turn_cos[self.index], arrays.turn_sin[self.index] = turn_limit(value)
+
+    @property
+    def weapon_range(self) -> float:
+        return float(self.registry._arrays.weapon_range[self.index])
+
+    @weapon_range.setter
+    def weapon_range(self, value: float) -> None:
+        arrays = self.registry._arrays
+        arrays.weapon_range[self.index] = value
+        arrays.weapon_range_squared[self.index] = weapon_range_squared(value)
+
+    @property
+    def weapon_angle_degrees(self) -> float:
+        return float(self.registry._arrays.weapon_angle_degrees[self.index])
+
+    @weapon_angle_degrees.setter
+    def weapon_angle_degrees(self, value: float) -> None:
+        arrays = self.registry._arrays
+        arrays.weapon_angle_degrees[self.index] = value
+        arrays.weapon_cone[self.index] = cone_limit(value)
+
+    @property
+    def name(self) -> str:
+        return self.registry._names[self.index]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self.registry._names[self.index] = value
+
+    @property
+    def rng(self) -> Union[random.Random, None]:
+        return self.registry._arrays.rng[self.index]
+
+    @rng.setter
+    def rng(self, value: Union[random.Random, None]) -> None:
+        self.registry._arrays.rng[self.index] = value
+
+    @property
+    def strategy_parameters(self) -> StrategyParameters:
+        arrays = self.registry._arrays
+        return StrategyParameters(
+            chase_distance_factor=float(arrays.chase_distance_factor[self.index]),
+            chase_angle_degrees=float(arrays.chase_angle_degrees[self.index]),
+            evade_retreat=float(arrays.evade_retreat[self.index]),
+        )
+
+    @strategy_parameters.setter
+    def strategy_parameters(self, value: StrategyParameters) -> None:
+        arrays = self.registry._arrays
+        arrays.chase_distance_factor[self.index] = value.chase_distance_factor
+        arrays.chase_angle_degrees[self.index] = value.chase_angle_degrees
+        arrays.evade_retreat[self.index] = value.evade_retreat
+
+    @property
+    def strategy_code(self) -> int:
+        return int(self.registry._arrays.strategy[self.index])
+
+    @strategy_code.setter
+    def strategy_code(self, value: int) -> None:
+        self.registry._arrays.strategy[self.index] = value
+
+    @property
+    def strategy(self) -> str:
+        """Name of the current strategy. `strategy_code` is the registry code."""
+        return strategies.name(self.strategy_code)
+
+    @strategy.setter
+    def strategy(self, value: str) -> None:
+        self.strategy_code = strategies.code(value)
+
+    @property
+    def enemy(self) -> Union["ShipView", None]:
+        enemy = int(self.registry._enemy[self.index])
+        return None if enemy < 0 else ShipView(self.registry, enemy)
+
+    @enemy.setter
+    def enemy(self, value: Union["ShipView", None]) -> None:
+        if value is not None and value.registry is not self.registry:
+            raise ValueError("The enemy must be in the same registry")
+        self.registry._enemy[self.index] = -1 if value is None else value.index
+
+    def angle_to_enemy_degree(self) -> Union[float, None]:
+        """Angle from current direction to enemy position IN DEGREES"""
+        vector_to_enemy = self.vector_to_enemy()
+        if vector_to_enemy is None:
+            return None
+        return vector_to_enemy.angle_degrees(self.direction)
+
+    def vector_to_enemy(self) -> Union[Vector, None]:
+        """Not normalized"""
+        enemy = self.enemy
+        if enemy is None:
+            return None
+        return enemy.position - self.position
+
+    def direction_to_enemy(self) -> Union[Vector, None]:
+        """Normalized"""
+        vector_to_enemy = self.vector_to_enemy()
+        if vector_to_enemy is None:
+            return None
+        return vector_to_enemy.normalized
+
+    def distance_to_enemy(self) -> Union[float, None]:
+        enemy = self.enemy
+        if enemy is None:
+            return None
+        return self.position.distance(enemy.position)
+
+    def is_enemy_in_weapon_range(self) -> bool:
+        enemy = self.enemy
+        if enemy is None:
+            return False
+        return self.is_in_weapon_range(enemy.position)
+
+    def is_in_weapon_range(self, point: Vector) -> bool:
+        """Same test as `Spaceship.is_in_weapon_range`"""
+        arrays = self.registry._arrays
+        vector_to_target = point - self.position
+        return (
+            vector_to_target.dot(vector_to_target) <= arrays.weapon_range_squared[self.index]
+            and MutableVector(*self.direction).in_cone(vector_to_target, arrays.weapon_cone[self.index])
+        )
+
+    def move(
+        self,
+        enemy_position: Union[Vector, None] = None,
+        enemy_direction: Union[Vector, None] = None,
+        strategy: Union[int, None] = None,
+    ) -> None:
+        """`Spaceship.move`, through `ShipRegistry.move` for this ship alone.
+        Moving many ships one at a time is slow, move them with the registry."""
+        self.registry.move(
+            [self.index],
+            enemy_position=None if enemy_position is None else np.array(tuple(enemy_position)).reshape(3, 1),
+            enemy_direction=None if enemy_direction is None else np.array(tuple(enemy_direction)).reshape(3, 1),
+            strategy=strategy,
+        )
+
+
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    from spaceship_sim.rng import stream
+
+    FLEET_SIZE = 20_000
+    SPREAD = 2_000.0
+
+    def fleet_ships(seed: int) -> list[Spaceship]:
+        rng = stream(40351, seed)
+        return [
+            Spaceship(
+                position=Vector.random_direction(rng) * (rng.random() * SPREAD),
+                direction=Vector.random_direction(rng),
+                rng=rng,
+            )
+            for _ in range(FLEET_SIZE)
+        ]
+
+    tracemalloc.start()
+    ships = fleet_ships(0) + fleet_ships(1)
+    for number, ship in enumerate(ships):
+        ship.enemy = ships[(number + FLEET_SIZE) % len(ships)]
+    objects_memory = tracemalloc.get_traced_memory()[0]
+    registry = ShipRegistry.from_ships(ships)
+    registry_memory = tracemalloc.get_traced_memory()[0] - objects_memory
+    tracemalloc.stop()
+    print(f"{len(ships)} ships: {objects_memory / len(ships):.0f} bytes each as Spaceships, {registry_memory / len(ships):.0f} in a registry")
+
+    # Every Spaceship steers by its enemy's state from before anyone moved, like the registry
+    before = [(ship.enemy.position, ship.enemy.direction) for ship in ships]
+    start = time.perf_counter()
+    for ship, (enemy_position, enemy_direction) in zip(ships, before):
+        ship.move(enemy_position=enemy_position, enemy_direction=enemy_direction)
+    objects_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    registry.move()
+    registry_time = time.perf_counter() - start
+    strategy_mismatches = sum(ship.strategy_code != view.strategy_code for ship, view in zip(ships, registry))
+    largest_difference = max(ship.position.distance(view.position) for ship, view in zip(ships, registry))
+    print(f"One tick: {objects_time * 1000:.1f} ms as Spaceships, {registry_time * 1000:.1f} ms in a registry")
+    print(f"  {strategy_mismatches} different strategies, positions at most {largest_difference:.1e} apart")
+
+    view = registry[0]
+    print(f"{view}\n  enemy {view.enemy.index}, {view.distance_to_enemy():.1f} away, strategy {view.strategy!r}")
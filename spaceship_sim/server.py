@@ -0,0 +1,532 @@
+"""
+Serve many live duels from one asyncio process.
+
+A `SimulationServer` owns any number of sessions, each a `Simulation`, and
+advances them cooperatively: every active session gets `ticks_per_slice`
+ticks in turn, and the scheduler yields to the event loop whenever it has
+run for `slice_seconds`, so clients keep being served.
+
+Subscribers to a session are pushed messages (plain dicts):
+
+    snapshot    full state of both ships at tick `tick`
+    ticks       what changed on each tick since the last message: positions
+                and directions, plus strategies when they change
+    finished    full state at the final tick, and the result
+    error       the session failed and was closed
+
+Each subscriber has a bounded queue. Nothing waits on a slow consumer: when
+its queue is full the pending messages are dropped, and it is sent a fresh
+snapshot to catch up from instead. `finished` is always delivered.
+
+Clients connect over TCP with newline-delimited JSON:
+
+    {"op": "create", "seed": 1, "ticks": 10000, "ship1": {"speed": 2.0}}
+        -> {"type": "created", "session": 0}
+    {"op": "subscribe", "session": 0}       -> the session's messages
+    {"op": "unsubscribe", "session": 0}
+
+Ship positions and directions are random, as in a sweep, unless given as
+[x, y, z] in the ship's parameters. Ships pick their own strategy every tick,
+so it can't be set. "ticks", "seed" and "max_distance" are limited to
+`MAX_TICKS`, `MAX_SEED` and `MAX_DISTANCE`. `Client` speaks this protocol,
+and `SimulationServer.subscribe()` gives in-process access to the same
+messages.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import asyncio
+import collections
+import itertools
+import json
+import math
+import time
+from typing import Any, AsyncIterator, Union
+
+from spaceship_sim.vector import Vector
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.recorder import OutcomeRecorder
+from spaceship_sim.rng import stream
+
+
+Message = dict[str, Any]
+
+
+def _ship_state(ship: Spaceship) -> Message:
+    return {
+        "position": list(ship._position),
+        "direction": list(ship._direction),
+        "strategy": ship.strategy,
+    }
+
+
+SHIP_NUMBERS = ("speed", "turning_speed", "weapon_range", "weapon_angle_degrees")
+"""Ship parameters clients may set to a number. Also "position" and "direction"."""
+
+MAX_TICKS = 1_000_000
+"""Longest duel a client may create, in ticks"""
+MAX_SEED = 2 ** 64 - 1
+"""Largest seed a client may ask for"""
+MAX_DISTANCE = 1e6
+"""Furthest from the origin a client may start random ships"""
+
+
+def _number(value: Any, name: str) -> float:
+    """A finite JSON number as a float. Raises ValueError for anything else."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite, got {value!r}")
+    return value
+
+
+def _integer(value: Any, name: str, low: int, high: int) -> int:
+    """A JSON integer from `low` to `high`. Raises ValueError for anything else."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be from {low} to {high}, got {value!r}")
+    return value
+
+
+def _vector(value: Any, name: str) -> Vector:
+    if not isinstance(value, list) or len(value) != 3:
+        raise ValueError(f"{name} must be [x, y, z], got {value!r}")
+    return Vector(*(_number(coordinate, name) for coordinate in value))
+
+
+def _ship_from_parameters(parameters: Any, rng, max_distance: float) -> Spaceship:
+    """A Spaceship from JSON parameters, with random position and direction unless given.
+    Raises ValueError for anything but the known parameters with valid values."""
+    if not isinstance(parameters, dict):
+        raise ValueError(f"Ship parameters must be an object, got {parameters!r}")
+    unknown = set(parameters) - {*SHIP_NUMBERS, "position", "direction"}
+    if unknown:
+        raise ValueError(f"Unknown ship parameters {sorted(unknown)}")
+    numbers = {name: _number(parameters[name], name) for name in SHIP_NUMBERS if name in parameters}
+
+    random_position = Vector.random_direction(rng) * max_distance
+    random_direction = Vector.random_direction(rng)
+    position = random_position if "position" not in parameters else _vector(parameters["position"], "position")
+    direction = random_direction if "direction" not in parameters else _vector(parameters["direction"], "direction")
+    if direction.magnitude() < 1e-9:
+        raise ValueError(f"direction must not be zero, got {parameters['direction']!r}")
+
+    return Spaceship(position=position, direction=direction, **numbers)
+
+
+class Subscriber:
+    """One consumer's bounded queue of a session's messages. Iterate it with `async for`."""
+    def __init__(self, session_id: int, queue_size: int = 64) -> None:
+        if queue_size < 2:
+            raise ValueError(f"queue_size must be at least 2, got {queue_size}")
+        self.session_id = session_id
+        self.queue_size = queue_size
+        self.dropped = 0
+        """Messages dropped because this subscriber fell behind"""
+        self.needs_snapshot = True
+        self.closed = False
+        self._queue: collections.deque[Message] = collections.deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, message: Message) -> None:
+        """Queue a message without ever waiting. Snapshots and `finished` are
+        "keyframes" that a lagging subscriber can catch up from."""
+        if self.closed:
+            return
+        if len(self._queue) >= self.queue_size:
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            self.needs_snapshot = True
+        if message["type"] != "ticks":
+            self.needs_snapshot = False
+        elif self.needs_snapshot:
+            self.dropped += 1
+            return
+        self._queue.append(message)
+        self._ready.set()
+
+    def close(self) -> None:
+        """No more messages. Those already queued can still be read."""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self) -> Union[Message, None]:
+        """The next message, or None once closed and drained"""
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+    def __aiter__(self) -> "Subscriber":
+        return self
+
+    async def __anext__(self) -> Message:
+        message = await self.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+class Session:
+    """A duel being served, and who's watching it"""
+    def __init__(self, session_id: int, simulation: Simulation) -> None:
+        self.session_id = session_id
+        self.simulation = simulation
+        self.subscribers: list[Subscriber] = []
+        # Strategies as of the last message, so ticks only carry changes
+        self._strategy_codes = (simulation.ship1.strategy_code, simulation.ship2.strategy_code)
+
+    def snapshot(self, message_type: str = "snapshot") -> Message:
+        sim = self.simulation
+        return {
+            "type": message_type,
+            "session": self.session_id,
+            "tick": sim.tick_count,
+            "result": sim.result,
+            "ship1": _ship_state(sim.ship1),
+            "ship2": _ship_state(sim.ship2),
+        }
+
+    def _tick_delta(self, index: int) -> Message:
+        ship1 = self.simulation.ship1
+        ship2 = self.simulation.ship2
+        delta = {"tick": index, "ship1": [*ship1._position, *ship1._direction], "ship2": [*ship2._position, *ship2._direction]}
+        codes = (ship1.strategy_code, ship2.strategy_code)
+        if codes != self._strategy_codes:
+            delta["strategies"] = [ship1.strategy, ship2.strategy]
+            self._strategy_codes = codes
+        return delta
+
+    def advance(self, ticks: int) -> None:
+        """Run up to `ticks` ticks and push them to every subscriber"""
+        sim = self.simulation
+        if not self.subscribers:
+            sim.run(max_ticks=ticks)
+            self._strategy_codes = (sim.ship1.strategy_code, sim.ship2.strategy_code)
+            return
+
+        deltas = [self._tick_delta(index) for index in sim.iter_ticks(ticks)]
+        message = {"type": "ticks", "session": self.session_id, "ticks": deltas}
+        snapshot = None
+        for subscriber in self.subscribers:
+            if not subscriber.needs_snapshot:
+                if deltas:
+                    subscriber.offer(message)
+            elif not sim.finished:
+                # A finished session's last message is a keyframe anyway
+                if snapshot is None:
+                    snapshot = self.snapshot()
+                subscriber.offer(snapshot)
+        if sim.finished:
+            # After the final ticks, so subscribers see every one of them
+            message = self.snapshot("finished")
+            for subscriber in self.subscribers:
+                subscriber.offer(message)
+                subscriber.close()
+
+    def fail(self, error: Exception) -> None:
+        """Tell every subscriber the session broke, and stop their messages"""
+        message = {"type": "error", "session": self.session_id, "error": repr(error)}
+        for subscriber in self.subscribers:
+            subscriber.offer(message)
+            subscriber.close()
+
+
+class SimulationServer:
+    """Many duels, advanced together in time slices on one event loop"""
+    def __init__(
+        self,
+        ticks_per_slice: int = 10,
+        slice_seconds: float = 0.005,
+        queue_size: int = 64,
+    ) -> None:
+        """_summary_
+
+        Args:
+            ticks_per_slice (int, optional): Ticks each session runs per turn. Defaults to 10.
+            slice_seconds (float, optional): Longest the scheduler runs before yielding to the event loop. Defaults to 0.005.
+            queue_size (int, optional): Messages each subscriber can fall behind by before they're dropped. Defaults to 64.
+        """
+        self.ticks_per_slice = ticks_per_slice
+        self.slice_seconds = slice_seconds
+        self.queue_size = queue_size
+        self.sessions: dict[int, Session] = {}
+        self.ticks_run = 0
+        self._ids = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._scheduler: Union[asyncio.Task, None] = None
+        self._tcp_server: Union[asyncio.AbstractServer, None] = None
+
+    def create_session(
+        self,
+        ship1: Spaceship,
+        ship2: Spaceship,
+        ticks: int = 10_000,
+        rng=None,
+    ) -> Session:
+        """Add a duel, which starts on the scheduler's next round.
+        Finished sessions are dropped once their subscribers have been told."""
+        session_id = next(self._ids)
+        sim = Simulation(ship1, ship2, ticks=ticks, recorder=OutcomeRecorder(), adaptive=True, rng=rng)
+        session = self.sessions[session_id] = Session(session_id, sim)
+        self._wakeup.set()
+        return session
+
+    def create_random_session(
+        self,
+        seed: int,
+        ticks: int = 10_000,
+        max_distance: float = 1000.0,
+        ship1_parameters: Union[dict[str, Any], None] = None,
+        ship2_parameters: Union[dict[str, Any], None] = None,
+    ) -> Session:
+        """A duel with random starts, drawn from its own stream like a sweep's.
+        Raises ValueError for invalid settings or ship parameters."""
+        seed = _integer(seed, "seed", 0, MAX_SEED)
+        ticks = _integer(ticks, "ticks", 0, MAX_TICKS)
+        max_distance = _number(max_distance, "max_distance")
+        if not 0.0 <= max_distance <= MAX_DISTANCE:
+            raise ValueError(f"max_distance must be from 0 to {MAX_DISTANCE:g}, got {max_distance!r}")
+        rng = stream(seed)
+        ship1 = _ship_from_parameters(ship1_parameters or {}, rng, max_distance)
+        ship2 = _ship_from_parameters(ship2_parameters or {}, rng, max_distance)
+        return self.create_session(ship1, ship2, ticks=ticks, rng=rng)
+
+    def subscribe(self, session_id: int, queue_size: Union[int, None] = None) -> Subscriber:
+        """Messages of a session, starting with a snapshot of its current state"""
+        session = self.sessions[session_id]
+        subscriber = Subscriber(session_id, self.queue_size if queue_size is None else queue_size)
+        subscriber.offer(session.snapshot())
+        session.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        session = self.sessions.get(subscriber.session_id)
+        if session is not None and subscriber in session.subscribers:
+            session.subscribers.remove(subscriber)
+        subscriber.close()
+
+    def close_session(self, session_id: int) -> None:
+        session = self.sessions.pop(session_id)
+        for subscriber in session.subscribers:
+            subscriber.close()
+
+    async def _schedule(self) -> None:
+        """Round-robin over the sessions forever, yielding every `slice_seconds`"""
+        while True:
+            if not self.sessions:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            deadline = time.perf_counter() + self.slice_seconds
+            for session in list(self.sessions.values()):
+                sim = session.simulation
+                before = sim.tick_count
+                try:
+                    session.advance(self.ticks_per_slice)
+                except Exception as error:
+                    # Only this session is lost, the others carry on
+                    self.sessions.pop(session.session_id, None)
+                    session.fail(error)
+                    continue
+                finally:
+                    self.ticks_run += sim.tick_count - before
+                if sim.finished:
+                    self.sessions.pop(session.session_id, None)
+                if time.perf_counter() >= deadline:
+                    await asyncio.sleep(0)
+                    deadline = time.perf_counter() + self.slice_seconds
+            await asyncio.sleep(0)
+
+    def start(self) -> None:
+        """Start advancing sessions on the running event loop"""
+        if self._scheduler is None:
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """Start the scheduler and listen for clients. Returns the address, for port 0."""
+        self.start()
+        self._tcp_server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._tcp_server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        if self._tcp_server is not None:
+            self._tcp_server.close()
+            await self._tcp_server.wait_closed()
+            self._tcp_server = None
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            try:
+                await self._scheduler
+            except asyncio.CancelledError:
+                pass
+            self._scheduler = None
+        for session_id in list(self.sessions):
+            self.close_session(session_id)
+
+    async def _forward(self, subscriber: Subscriber, writer: asyncio.StreamWriter) -> None:
+        """Copy a subscriber's messages to a connection, at the connection's pace"""
+        async for message in subscriber:
+            writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+            await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribers: dict[int, Subscriber] = {}
+        forwarders: dict[int, asyncio.Task] = {}
+
+        def drop(session_id: int) -> None:
+            self.unsubscribe(subscribers.pop(session_id))
+            forwarders.pop(session_id).cancel()
+
+        async def forward(session_id: int, subscriber: Subscriber) -> None:
+            try:
+                await self._forward(subscriber, writer)
+            finally:
+                # Finished and failed sessions close their subscribers, and a
+                # broken connection ends forwarding. Either way forget them,
+                # unless the session was subscribed to again since.
+                if subscribers.get(session_id) is subscriber:
+                    del subscribers[session_id]
+                    del forwarders[session_id]
+                    self.unsubscribe(subscriber)
+
+        def reply(message: Message) -> None:
+            writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+        try:
+            async for line in reader:
+                try:
+                    request = json.loads(line)
+                    op = request["op"]
+                    if op == "create":
+                        session = self.create_random_session(
+                            seed=request.get("seed", 0),
+                            ticks=request.get("ticks", 10_000),
+                            max_distance=request.get("max_distance", 1000.0),
+                            ship1_parameters=request.get("ship1"),
+                            ship2_parameters=request.get("ship2"),
+                        )
+                        reply({"type": "created", "session": session.session_id})
+                    elif op == "subscribe":
+                        session_id = request["session"]
+                        subscriber = self.subscribe(session_id, request.get("queue_size"))
+                        # Subscribing again starts over from a fresh snapshot
+                        if session_id in subscribers:
+                            drop(session_id)
+                        subscribers[session_id] = subscriber
+                        forwarders[session_id] = asyncio.create_task(forward(session_id, subscriber))
+                    elif op == "unsubscribe":
+                        drop(request["session"])
+                    else:
+                        raise ValueError(f"Unknown op {op!r}")
+                except (ValueError, KeyError, TypeError, ArithmeticError) as error:
+                    reply({"type": "error", "error": repr(error)})
+        finally:
+            for subscriber in subscribers.values():
+                self.unsubscribe(subscriber)
+            for forwarder in forwarders.values():
+                forwarder.cancel()
+            writer.close()
+
+
+class Client:
+    """Talks to a `SimulationServer` over TCP. Messages from every subscription
+    arrive interleaved, in order per session."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "Client":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _send(self, request: Message) -> None:
+        self._writer.write(json.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+
+    async def create(self, seed: int, ticks: int = 10_000, **parameters: Any) -> int:
+        """Create a random session and return its id. Must be called while not
+        reading `messages()`, which would swallow the reply."""
+        await self._send({"op": "create", "seed": seed, "ticks": ticks, **parameters})
+        message = await self.receive()
+        if message is None or message["type"] != "created":
+            raise RuntimeError(f"Couldn't create a session: {message}")
+        return message["session"]
+
+    async def subscribe(self, session_id: int, queue_size: Union[int, None] = None) -> None:
+        await self._send({"op": "subscribe", "session": session_id, "queue_size": queue_size})
+
+    async def unsubscribe(self, session_id: int) -> None:
+        await self._send({"op": "unsubscribe", "session": session_id})
+
+    async def receive(self) -> Union[Message, None]:
+        """The next message, or None once the server has closed the connection"""
+        line = await self._reader.readline()
+        return json.loads(line) if line else None
+
+    async def messages(self) -> AsyncIterator[Message]:
+        while True:
+            message = await self.receive()
+            if message is None:
+                return
+            yield message
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+if __name__ == "__main__":
+    SESSIONS = 2000
+
+    async def main() -> None:
+        server = SimulationServer()
+        host, port = await server.serve()
+
+        # Lots of unwatched duels, plus a few watched ones
+        for seed in range(SESSIONS):
+            server.create_random_session(seed)
+        start = time.perf_counter()
+
+        # In-process subscriber
+        watched = server.create_random_session(seed=40351)
+        updates = 0
+        async for message in server.subscribe(watched.session_id):
+            updates += message["type"] == "ticks"
+            if message["type"] == "finished":
+                print(f"In-process: session {message['session']} {message['result']} at tick {message['tick']} after {updates} updates")
+
+        # A slow consumer with a small queue falls behind, and catches up from snapshots
+        slow = server.subscribe(server.create_random_session(seed=40352).session_id, queue_size=4)
+        kinds = collections.Counter()
+        async for message in slow:
+            kinds[message["type"]] += 1
+            await asyncio.sleep(0.01)
+        print(f"Slow in-process: messages {dict(kinds)}, {slow.dropped} dropped")
+
+        # Over TCP
+        client = await Client.connect(host, port)
+        session_id = await client.create(seed=7, ship1={"speed": 2.0})
+        await client.subscribe(session_id)
+        kinds = collections.Counter()
+        async for message in client.messages():
+            kinds[message["type"]] += 1
+            if message["type"] == "finished":
+                print(f"TCP: session {session_id} {message['result']} at tick {message['tick']}, messages {dict(kinds)}")
+                break
+        await client.close()
+
+        while server.sessions:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        print(f"{SESSIONS + 3} sessions, {server.ticks_run} ticks in {elapsed:.2f} s: {server.ticks_run / elapsed:,.0f} ticks/s")
+        await server.close()
+
+    asyncio.run(main())
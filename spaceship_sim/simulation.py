@@ -0,0 +1,374 @@
+import csv
+import dataclasses
+import math
+import random
+from pathlib import Path
+from typing import Callable, Generator, Union
+
+from spaceship_sim.vector import MutableVector, Vector
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.geometry import RelativeGeometry
+from spaceship_sim import strategies
+from spaceship_sim.strategies import CHASE_DISTANCE
+from spaceship_sim.recorder import RESULTS, Recorder, Row, TraceRecorder
+from spaceship_sim.stall import StallDetector
+from spaceship_sim.profiling import Profiler
+
+
+@dataclasses.dataclass
+class Data:
+    index: int
+    result: str
+    ship1_strategy: str
+    ship2_strategy: str
+
+    ship1_position: Vector
+    ship2_position: Vector
+    ship1_direction: Vector
+    ship2_direction: Vector
+
+    ship1_position_x: float
+    ship1_position_y: float
+    ship1_position_z: float
+    ship2_position_x: float
+    ship2_position_y: float
+    ship2_position_z: float
+
+    ship1_direction_x: float
+    ship1_direction_y: float
+    ship1_direction_z: float
+    ship2_direction_x: float
+    ship2_direction_y: float
+    ship2_direction_z: float
+
+    ship_distance: float
+    ship1_angle_to_enemy: float
+    ship2_angle_to_enemy: float
+
+
+class Simulation:
+    """A duel between two ships.
+
+    Constructing a simulation only sets it up. Advance it with `step()`, `run()`,
+    `run_until()` or `iter_ticks()`, which can be mixed and resumed freely.
+    """
+    def __init__(
+        self,
+        ship1: Spaceship,
+        ship2: Spaceship,
+        ticks: int = 100,
+        recorder: Union[Recorder, None] = None,
+        stall_detector: Union[StallDetector, None] = None,
+        profiler: Union[Profiler, None] = None,
+        adaptive: bool = False,
+        rng: Union[random.Random, None] = None,
+    ) -> None:
+        """_summary_
+
+        Args:
+            ship1 (Spaceship): _description_
+            ship2 (Spaceship): _description_
+            ticks (int, optional): Tick limit. Defaults to 100.
+            recorder (Recorder | None, optional): What to record each tick. Defaults to a full TraceRecorder.
+            stall_detector (StallDetector | None, optional): Ends hopeless duels early as "STALEMATE". Defaults to None.
+            profiler (Profiler | None, optional): Times each phase of every tick, for both ships too. Defaults to None.
+            adaptive (bool, optional): Skip work that can't change the outcome while the ships are far apart. Same results, tick for tick. Ships that override `choose_strategy`, `implement_strategy` or `move` always step in full. Defaults to False.
+            rng (random.Random | None, optional): Random stream for both ships, replacing their own. Defaults to None, leave the ships' as they are.
+        """
+        self.stall_detector = stall_detector
+        self.profiler = profiler
+        self.adaptive = adaptive
+        self.rng = rng
+        self.reset(ship1, ship2, ticks=ticks, recorder=recorder)
+
+    def reset(
+        self,
+        ship1: Spaceship,
+        ship2: Spaceship,
+        ticks: Union[int, None] = None,
+        recorder: Union[Recorder, None] = None,
+    ) -> None:
+        """Set up a new duel in this instance, discarding the previous one.
+        `ticks` defaults to the previous tick limit."""
+        self.ship1 = ship1
+        self.ship2 = ship2
+        if ticks is not None:
+            self.ticks = ticks
+
+        self.ship1.enemy = self.ship2
+        self.ship2.enemy = self.ship1
+        # Other ships, such as registry views, keep their state elsewhere and
+        # are only used through the public attributes
+        spaceships = isinstance(self.ship1, Spaceship) and isinstance(self.ship2, Spaceship)
+        # Worked out once per tick for both ships, and for the recorder
+        self.geometry = RelativeGeometry(self.ship1, self.ship2) if spaceships else None
+        if spaceships:
+            self.ship1.profiler = self.profiler
+            self.ship2.profiler = self.profiler
+        if self.rng is not None:
+            self.ship1.rng = self.rng
+            self.ship2.rng = self.rng
+
+        self.initial_settings = {
+            "ship1": {
+                "direction": self.ship1.direction,
+                "position": self.ship1.position,
+                "speed": self.ship1.speed,
+                "turning_speed": self.ship1.turning_speed,
+                "weapon_angle_degrees": self.ship1.weapon_angle_degrees,
+                "weapon_range": self.ship1.weapon_range,
+                "strategy_parameters": dataclasses.asdict(self.ship1.strategy_parameters),
+            },
+            "ship2": {
+                "direction": self.ship2.direction,
+                "position": self.ship2.position,
+                "speed": self.ship2.speed,
+                "turning_speed": self.ship2.turning_speed,
+                "weapon_angle_degrees": self.ship2.weapon_angle_degrees,
+                "weapon_range": self.ship2.weapon_range,
+                "strategy_parameters": dataclasses.asdict(self.ship2.strategy_parameters),
+            }
+        }
+
+        self.recorder = TraceRecorder() if recorder is None else recorder
+        self.result = "ONGOING"
+        self.tick_count = 0
+        # Quiet ticks left, see `_quiet_horizon`
+        self._quiet_ticks = 0
+        # Ships that choose strategies their own way might not chase when far apart,
+        # ships that move their own way might not move like `Spaceship.chase`,
+        # and only `Spaceship`s can coast
+        self._standard_choice = (
+            spaceships
+            and all(
+                type(ship).choose_strategy is Spaceship.choose_strategy
+                and type(ship).implement_strategy is Spaceship.implement_strategy
+                and type(ship).move is Spaceship.move
+                for ship in (self.ship1, self.ship2)
+            )
+            and strategies.implementation(CHASE_DISTANCE) is strategies.chase
+        )
+        self._data: Union[list[Data], None] = None
+        self.recorder.start(self.ticks)
+        if self.stall_detector is not None:
+            self.stall_detector.reset()
+
+    @property
+    def finished(self) -> bool:
+        """The duel has a result, or has reached the tick limit"""
+        return self.result != "ONGOING" or self.tick_count >= self.ticks
+
+    def _quiet_horizon(self) -> int:
+        """How many of the coming ticks are sure to be "quiet": too far apart for
+        either ship to hit the other, or to pick anything but "chase-distance".
+
+        Each tick the ships close by at most their combined speed, so this is
+        how many ticks that takes to bring them within either weapon range, or
+        either ship's chase distance, less a little for rounding.
+        """
+        if not self._standard_choice:
+            return 0
+        ship1 = self.ship1
+        ship2 = self.ship2
+        threshold = max(
+            ship1.weapon_range,
+            ship2.weapon_range,
+            ship1.strategy_parameters.chase_distance_factor * ship2.weapon_range,
+            ship2.strategy_parameters.chase_distance_factor * ship1.weapon_range,
+        )
+        distance = ship1.distance_to_enemy()
+        gap = distance - threshold - (1e-9 * distance + 1e-6)
+        if gap <= 0.0:
+            return 0
+        closing = abs(ship1.speed) + abs(ship2.speed)
+        if closing == 0.0:
+            return self.ticks
+        return math.ceil(gap / closing) - 1
+
+    def step(self) -> str:
+        """Run one tick and return its result. Does nothing once `finished`."""
+        if self.finished:
+            return self.result
+
+        # Quiet ticks need no weapon checks, and both ships are sure to chase
+        quiet = self._quiet_ticks > 0
+        strategy = CHASE_DISTANCE if quiet else None
+
+        # Ships move between ticks, so the state after the last tick is left as is
+        if self.tick_count > 0:
+            ship1_pos = self.ship1.position
+            ship1_dir = self.ship1.direction
+
+            ship2_pos = self.ship2.position
+            ship2_dir = self.ship2.direction
+
+            self.ship1.move(
+                enemy_position=ship2_pos,
+                enemy_direction=ship2_dir,
+                strategy=strategy,
+            )
+            self.ship2.move(
+                enemy_position=ship1_pos,
+                enemy_direction=ship1_dir,
+                strategy=strategy,
+            )
+
+        index = self.tick_count
+        profiler = self.profiler
+        if profiler is not None:
+            token = profiler.start()
+        if quiet:
+            self._quiet_ticks -= 1
+            result = "ONGOING"
+        else:
+            ship1_win = self.ship1.is_enemy_in_weapon_range()
+            ship2_win = self.ship2.is_enemy_in_weapon_range()
+            if profiler is not None:
+                token = profiler.stop("weapon_check", token)
+
+            if ship1_win and ship2_win:
+                result = "BOTH_DESTROYED"
+            elif ship1_win:
+                result = "SHIP_1_WINS"
+            elif ship2_win:
+                result = "SHIP_2_WINS"
+            else:
+                result = "ONGOING"
+                if self.adaptive:
+                    self._quiet_ticks = self._quiet_horizon()
+
+        self.tick_count = index + 1
+        if result == "ONGOING" and self.stall_detector is not None:
+            if self.stall_detector.is_stalled(self):
+                result = "STALEMATE"
+            if profiler is not None:
+                token = profiler.stop("stall_check", token)
+        self.result = result
+
+        # The final tick is always recorded
+        if self.finished:
+            self.recorder.record(index, result, self.ship1, self.ship2)
+            self.recorder.finish()
+            self._data = None
+        elif self.recorder.wants(index):
+            self.recorder.record(index, result, self.ship1, self.ship2)
+            self._data = None
+        if profiler is not None:
+            profiler.stop("record", token)
+            if self.finished:
+                profiler.emit()
+        return result
+
+    def _coast(self, count: int) -> None:
+        """Run `count` quiet ticks in a tight loop, without weapon checks or
+        strategy choice. Never the final tick, and only with nothing to check
+        or time each tick."""
+        ship1 = self.ship1
+        ship2 = self.ship2
+        recorder = self.recorder
+        ship1_pos = MutableVector()
+        for index in range(self.tick_count, self.tick_count + count):
+            ship1_pos.copy_from(ship1._position)
+            ship1.chase(ship2._position)
+            ship2.chase(ship1_pos)
+            if recorder.wants(index):
+                recorder.record(index, "ONGOING", ship1, ship2)
+                self._data = None
+        self.tick_count += count
+        self._quiet_ticks -= count
+
+    def run(self, max_ticks: Union[int, None] = None) -> str:
+        """Step until `finished`, or until `max_ticks` more ticks have run. Returns the latest result."""
+        if not self.adaptive or self.stall_detector is not None or self.profiler is not None:
+            for _ in self.iter_ticks(max_ticks):
+                pass
+            return self.result
+
+        stop = self.ticks if max_ticks is None else min(self.ticks, self.tick_count + max_ticks)
+        while self.tick_count < stop and not self.finished:
+            # The final tick is left to step(), to be recorded as such
+            count = min(self._quiet_ticks, stop - self.tick_count, self.ticks - 1 - self.tick_count)
+            if count > 0 and self.tick_count > 0:
+                self._coast(count)
+            else:
+                self.step()
+        return self.result
+
+    def run_until(
+        self,
+        predicate: Callable[["Simulation"], bool],
+        max_ticks: Union[int, None] = None,
+    ) -> str:
+        """Step until `predicate(self)` is true after a tick, or as `run()`. Returns the latest result."""
+        for _ in self.iter_ticks(max_ticks):
+            if predicate(self):
+                break
+        return self.result
+
+    def iter_ticks(self, max_ticks: Union[int, None] = None) -> Generator[int, None, None]:
+        """Lazily step until `finished`, or until `max_ticks` more ticks have run.
+        Yields the index of each tick just run, with the ships in their state for that tick."""
+        stop = self.ticks if max_ticks is None else min(self.ticks, self.tick_count + max_ticks)
+        while self.tick_count < stop and not self.finished:
+            self.step()
+            yield self.tick_count - 1
+
+    @property
+    def data(self) -> list[Data]:
+        """Every recorded tick. Built from the recorder on first access."""
+        if self._data is None:
+            self._data = [
+                Data(
+                    **row._asdict(),
+                    ship1_position=Vector(row.ship1_position_x, row.ship1_position_y, row.ship1_position_z),
+                    ship2_position=Vector(row.ship2_position_x, row.ship2_position_y, row.ship2_position_z),
+                    ship1_direction=Vector(row.ship1_direction_x, row.ship1_direction_y, row.ship1_direction_z),
+                    ship2_direction=Vector(row.ship2_direction_x, row.ship2_direction_y, row.ship2_direction_z),
+                )
+                for row
+                in self.recorder.rows()
+            ]
+        return self._data
+
+    def summary(self) -> str:
+        rv = ""
+        rv += f"RESULT: {self.result}\n"
+        rv += f"TICKS: {self.tick_count}"
+
+        for ship, dict_ in self.initial_settings.items():
+            rv += f"\n{ship} initial:\n"
+            rv += "\n".join([
+                f"  {key}: {value}"
+                for key, value
+                in dict_.items()
+            ])
+        return rv
+
+    def to_csv(self, path: Path):
+        with open(path, "w", encoding="utf8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(Row._fields)
+            writer.writerows(self.recorder.rows())
+
+
+if __name__ == "__main__":
+    ship1 = Spaceship(position=Vector(0,0,0), direction=Vector(0,1,0))
+    ship2 = Spaceship(position=Vector(200,200,200), direction=Vector(-1,0,0))
+
+    sim = Simulation(ship1, ship2, 1000)
+    sim.run()
+    # print(sim.data)
+
+    sim.to_csv(Path("./data.csv"))
+
+    for entry in sim.data:
+        print(f"-----------------")
+        print(f"INDEX: {entry.index} {entry.result}")
+        # print(f"1: {entry.ship1_position_} @ {entry.ship1_direction} {entry.ship1_strategy}")
+        # print(f"2: {entry.ship2_position} @ {entry.ship2_direction} {entry.ship2_strategy}")
+        print(f"dist: {entry.ship_distance}  angle1: {entry.ship1_angle_to_enemy}  angle2: {entry.ship2_angle_to_enemy}")
+
+    from spaceship_sim.plotting import plot_duel
+
+    plot_duel(sim.data, text=sim.summary())
+    print(sim.summary())
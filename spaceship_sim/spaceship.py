@@ -0,0 +1,326 @@
+import dataclasses
+import math
+import random
+from typing import TYPE_CHECKING, Union
+from spaceship_sim.vector import MutableVector, Vector, cone_limit, in_cone_array, turn_limit
+from spaceship_sim import strategies
+from spaceship_sim.strategies import BUILTIN, CHASE_ANGLE, CHASE_DISTANCE, EVADE, IMPLEMENTATIONS, PATROL
+
+if TYPE_CHECKING:
+    from spaceship_sim.geometry import RelativeGeometry
+    from spaceship_sim.profiling import Profiler
+
+
+STRATEGIES = BUILTIN
+"""Every strategy `Spaceship.choose_strategy` can pick, in code order. See `strategies` for the registry."""
+
+STRATEGY_VERSION = "3"
+"""Bump whenever a change to `Spaceship` changes how duels play out, to invalidate cached results"""
+
+
+@dataclasses.dataclass(frozen=True)
+class StrategyParameters:
+    """The tunable thresholds of `Spaceship.choose_strategy` and `implement_strategy`.
+    The defaults are the original hard-coded behavior."""
+    chase_distance_factor: float = 2.0
+    """Chase the enemy's position while further away than this many of its weapon ranges"""
+    chase_angle_degrees: float = 90.0
+    """Once closer, chase while the enemy is less than this far off the nose, otherwise evade"""
+    evade_retreat: float = 0.0
+    """How far evading turns away from the enemy, from 0.0 (perpendicular) to 1.0 (straight away)"""
+
+
+class Spaceship:
+    def __init__(
+        self,
+        position: Vector = Vector.zero,
+        direction: Vector = Vector.plus_x,
+        speed: float = 1.0,
+        turning_speed: float = 10.0,
+        weapon_range: float = 50.0,
+        weapon_angle_degrees = 15.0,
+        name: str = "",
+        enemy: Union["Spaceship", None] = None,
+        profiler: Union["Profiler", None] = None,
+        rng: Union[random.Random, None] = None,
+        strategy_parameters: StrategyParameters = StrategyParameters(),
+    ) -> None:
+        """_summary_
+
+        Args:
+            position (Vector, optional): _description_. Defaults to Vector.zero.
+            direction (Vector, optional): _description_. Defaults to Vector.plus_x.
+            speed (float, optional): Speed in UNITS PER TICK. Defaults to 1.0.
+            turning_speed (float, optional): Max turn in DEGREES PER TICK. Defaults to 10.0.
+            weapon_range (float, optional): Max weapon rang in UNITS. Defaults to 10.0.
+            weapon_angle_degrees (float, optional): Max weapon cylindrical angle in DEGREES. Defaults to 15.0.
+            name (str, optional): _description_. Defaults to "".
+            profiler (Profiler | None, optional): Times each phase of `move`. Defaults to None.
+            rng (random.Random | None, optional): Source of the random turns of "patrol" and "evade". Defaults to None, the global `random` module.
+            strategy_parameters (StrategyParameters, optional): Thresholds for choosing and implementing strategies. Defaults to the original ones.
+        """
+        # State lives in MutableVectors updated in place each tick. The
+        # position and direction properties hand out Vector snapshots.
+        self._position = MutableVector()
+        self._direction = MutableVector()
+        # Scratch space, reused every tick
+        self._to_enemy = MutableVector()
+        self._candidate = MutableVector()
+        self._desired = MutableVector()
+        # Shared with the enemy by `Simulation`, see `geometry`
+        self._geometry: Union["RelativeGeometry", None] = None
+        self._geometry_first = True
+
+        self.position = position
+        self.direction = direction.normalized
+        self.speed = speed
+        self.turning_speed = turning_speed
+        self.weapon_range = weapon_range
+        self.weapon_angle_degrees = weapon_angle_degrees
+        self.name = name
+        self.enemy = enemy
+        self.profiler = profiler
+        self.rng = rng
+        self.strategy_parameters = strategy_parameters
+
+        self.strategy_code = PATROL
+
+    def __repr__(self) -> str:
+        return f"Spaceship(name={self.name!r}, position={self.position}, direction={self.direction}), speed={self.speed}, turning_speed={self.turning_speed})"
+
+    @property
+    def position(self) -> Vector:
+        return self._position.snapshot()
+
+    @position.setter
+    def position(self, value: Vector) -> None:
+        self._position.copy_from(value)
+        if self._geometry is not None:
+            self._geometry.invalidate()
+
+    @property
+    def direction(self) -> Vector:
+        return self._direction.snapshot()
+
+    @direction.setter
+    def direction(self, value: Vector) -> None:
+        self._direction.copy_from(value)
+        if self._geometry is not None:
+            self._geometry.invalidate()
+
+    @property
+    def enemy(self) -> Union["Spaceship", None]:
+        return self._enemy
+
+    @enemy.setter
+    def enemy(self, value: Union["Spaceship", None]) -> None:
+        self._enemy = value
+        # Any shared geometry was for the old enemy
+        self._geometry = None
+
+    @property
+    def strategy(self) -> str:
+        """Name of the current strategy. `strategy_code` is the registry code."""
+        return strategies.name(self.strategy_code)
+
+    @strategy.setter
+    def strategy(self, value: str) -> None:
+        self.strategy_code = strategies.code(value)
+
+    @property
+    def turning_speed(self) -> float:
+        return self._turning_speed
+
+    @turning_speed.setter
+    def turning_speed(self, value: float) -> None:
+        self._turning_speed = value
+        self._turn_cos, self._turn_sin = turn_limit(value)
+
+    @property
+    def weapon_range(self) -> float:
+        return self._weapon_range
+
+    @weapon_range.setter
+    def weapon_range(self, value: float) -> None:
+        self._weapon_range = value
+        # Nothing is in a negative range
+        self._weapon_range_squared = value * value if value >= 0.0 else -math.inf
+
+    @property
+    def weapon_angle_degrees(self) -> float:
+        return self._weapon_angle_degrees
+
+    @weapon_angle_degrees.setter
+    def weapon_angle_degrees(self, value: float) -> None:
+        self._weapon_angle_degrees = value
+        self._weapon_cone = cone_limit(value)
+
+    def turn_towards(self, point: Union[Vector, MutableVector]) -> None:
+        """Turn towards the given point, subject to turn speed limit"""
+        desired_direction = self._desired
+        desired_direction.set_difference(point, self._position)
+        self._direction.turn_with_rate_limit(desired_direction, self._turn_cos, self._turn_sin)
+        if self._geometry is not None:
+            self._geometry.invalidate()
+
+    def angle_to_enemy_degree(self) -> Union[float, None]:
+        """Angle from current direction to enemy position IN DEGREES"""
+        if self._geometry is not None:
+            return self._geometry.angle_degrees(self._geometry_first)
+        if self.enemy is None:
+            return None
+        vector_to_enemy = self._to_enemy
+        vector_to_enemy.set_difference(self.enemy._position, self._position)
+        return vector_to_enemy.angle_degrees(self._direction)
+    
+    def vector_to_enemy(self) -> Union[Vector, None]:
+        """Not normalized"""
+        if self.enemy is None:
+            return None
+        return self.enemy.position - self.position
+    
+    def direction_to_enemy(self) -> Union[Vector, None]:
+        """Normalized"""
+        if self.enemy is None:
+            return None
+        return self.vector_to_enemy().normalized
+
+    def distance_to_enemy(self) -> Union[float, None]:
+        if self._geometry is not None:
+            return self._geometry.distance()
+        if self.enemy is None:
+            return None
+        return self._position.distance(self.enemy._position)
+
+    def choose_strategy(
+        self,
+        enemy_position: Vector | None = None,
+        enemy_direction: Vector | None = None,
+    ) -> None:
+        if self.enemy is None:
+            self.strategy_code = PATROL
+            return
+        
+        parameters = self.strategy_parameters
+        geometry = self._geometry
+        if geometry is not None:
+            if geometry.distance() > parameters.chase_distance_factor * self.enemy.weapon_range:
+                self.strategy_code = CHASE_DISTANCE
+            elif geometry.angle_degrees(self._geometry_first) < parameters.chase_angle_degrees:
+                self.strategy_code = CHASE_ANGLE
+            else:
+                self.strategy_code = EVADE
+            return
+
+        vector_to_enemy = self._to_enemy
+        vector_to_enemy.set_difference(self.enemy._position, self._position)
+        distance = vector_to_enemy.magnitude()
+        if distance > parameters.chase_distance_factor * self.enemy.weapon_range:
+            self.strategy_code = CHASE_DISTANCE
+        elif vector_to_enemy.angle_degrees(self._direction) < parameters.chase_angle_degrees:
+            self.strategy_code = CHASE_ANGLE
+        else:
+            self.strategy_code = EVADE
+
+    def implement_strategy(
+        self,
+        enemy_position: Vector | None = None,
+        enemy_direction: Vector | None = None,
+    ) -> None:
+        """Turn the ship some direction, as the current strategy's registered function does"""
+        IMPLEMENTATIONS[self.strategy_code](self, enemy_position, enemy_direction)
+
+    def chase(self, enemy_position: Union[Vector, MutableVector]) -> None:
+        """Same as `move` when `choose_strategy` is sure to pick "chase-distance",
+        with no profiling"""
+        self.strategy_code = CHASE_DISTANCE
+        vector_to_enemy = self._to_enemy
+        vector_to_enemy.set_difference(enemy_position, self._position)
+        self.turn_towards(vector_to_enemy)
+        self._position.add_normalized(self._direction, self.speed)
+        if self._geometry is not None:
+            self._geometry.invalidate()
+
+    def is_enemy_in_weapon_range(self) -> bool:
+        geometry = self._geometry
+        if geometry is not None:
+            return (
+                geometry.distance_squared() <= self._weapon_range_squared
+                and self._direction.in_cone(geometry.offset(self._geometry_first), self._weapon_cone)
+            )
+        if self.enemy is None:
+            return False
+        return self.is_in_weapon_range(self.enemy.position)
+
+    def is_in_weapon_range(self, point: Vector) -> bool:
+        """Point is in weapon range if the angle to it is less than the max cylindrical angle
+        and the distance is less than the max weapon range"""
+        vector_to_target = self._to_enemy
+        vector_to_target.set_difference(point, self._position)
+        return (
+            vector_to_target.dot(vector_to_target) <= self._weapon_range_squared
+            and self._direction.in_cone(vector_to_target, self._weapon_cone)
+        )
+
+    def is_in_weapon_range_array(self, points):
+        """`is_in_weapon_range` for many points at once, as a NumPy array of
+        shape (3, n). Returns a boolean array of shape (n,)."""
+        import numpy as np
+
+        position = np.array(tuple(self._position)).reshape(3, 1)
+        direction = np.array(tuple(self._direction))
+        vector_to_target = np.asarray(points, dtype=np.float64) - position
+        distance_squared = (
+            vector_to_target[0] * vector_to_target[0]
+            + vector_to_target[1] * vector_to_target[1]
+            + vector_to_target[2] * vector_to_target[2]
+        )
+        return (distance_squared <= self._weapon_range_squared) & in_cone_array(
+            direction,
+            vector_to_target,
+            self._weapon_cone,
+        )
+    
+    def move(
+        self,
+        enemy_position: Vector | None = None,
+        enemy_direction: Vector | None = None,
+        strategy: Union[int, None] = None,
+    ) -> None:
+        """Move in the current direction of travel at the current speed,
+        subject to the current strategy.
+
+        Pass `strategy`, a strategy code, when the strategy `choose_strategy`
+        would pick is already known, to skip choosing it.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            token = profiler.start()
+        if strategy is None:
+            self.choose_strategy(enemy_position=enemy_position, enemy_direction=enemy_direction)
+        else:
+            self.strategy_code = strategy
+        if profiler is not None:
+            token = profiler.stop("choose_strategy", token)
+        self.implement_strategy(enemy_position=enemy_position, enemy_direction=enemy_direction)
+        if profiler is not None:
+            token = profiler.stop("implement_strategy", token)
+        self._position.add_normalized(self._direction, self.speed)
+        if self._geometry is not None:
+            self._geometry.invalidate()
+        if profiler is not None:
+            profiler.stop("move", token)
+
+if __name__ == "__main__":
+    slow = Spaceship(name="slow", turning_speed=5.0, speed=2.0, position=Vector(10,10,10))
+    fast = Spaceship(name="fast", turning_speed=20.0, speed=1.0, position=Vector(0,0,0))
+    slow.enemy = fast
+    fast.enemy = slow
+
+    print(slow)
+
+    for tick in range(100):
+        print(f"{tick=}  {slow.position=}  {slow.direction=}")
+        slow.move(enemy_position=fast.position, enemy_direction=fast.direction)
+
+    # `python -m spaceship_sim.plotting` plots these paths
@@ -0,0 +1,137 @@
+"""
+Early termination for duels that can't, or apparently won't, resolve.
+
+Pass a `StallDetector` to `Simulation` and it ends such duels with the result
+"STALEMATE" instead of running them to the tick limit as "ONGOING".
+
+By default only duels that provably can't resolve are ended, so a default
+detector never changes the outcome of a duel, only how long a hopeless one
+takes. The periodic check also ends duels that merely look stuck, and is
+opt-in because it sometimes ends one that would have gone on to resolve.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import collections
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from spaceship_sim.simulation import Simulation
+
+
+class StallDetector:
+    """Checked by `Simulation` after every tick that ends "ONGOING".
+
+    Two checks:
+        Out of reach: the ships are further apart than they could close, at
+        their combined speed, before the tick limit, plus the longer weapon
+        range. Exact, up to a little slack for rounding: such a duel would
+        always have ended "ONGOING".
+
+        Periodic geometry (opt-in): the relative geometry (separation, both
+        angles to the enemy and both strategies), rounded to the given
+        tolerances, has gone through the same cycle of at most `max_period`
+        checks `repeats` times in a row. A heuristic, since the ships'
+        absolute positions also affect steering. Only an unbroken run of
+        full periods counts, not a geometry that merely comes back now and
+        then, which dogfights that go on to resolve often do. Even so it can
+        end a duel that would have resolved: a seeded dogfight that is won
+        after 7316 ticks repeats three full periods by tick 504. So it only
+        runs if asked for, when a few wrong "STALEMATE"s are worth the time
+        saved.
+    """
+    def __init__(
+        self,
+        distance_tolerance: float = 0.01,
+        angle_tolerance: float = 0.1,
+        repeats: int = 3,
+        check_every: int = 1,
+        periodic: bool = False,
+        max_period: int = 500,
+    ) -> None:
+        """_summary_
+
+        Args:
+            distance_tolerance (float, optional): Separation rounding, in UNITS. Defaults to 0.01.
+            angle_tolerance (float, optional): Angle rounding, in DEGREES. Defaults to 0.1.
+            repeats (int, optional): Full periods in a row that count as periodic. Defaults to 3.
+            check_every (int, optional): Ticks between periodic geometry checks. Defaults to 1.
+            periodic (bool, optional): Use the periodic geometry check at all. Defaults to False, as it can change outcomes.
+            max_period (int, optional): Longest cycle looked for, in checks. Defaults to 500.
+        """
+        if repeats < 2:
+            raise ValueError(f"repeats must be at least 2, got {repeats}")
+        if max_period < 1:
+            raise ValueError(f"max_period must be at least 1, got {max_period}")
+        self.distance_tolerance = distance_tolerance
+        self.angle_tolerance = angle_tolerance
+        self.repeats = repeats
+        self.check_every = check_every
+        self.periodic = periodic
+        self.max_period = max_period
+        # The latest keys, enough for `repeats` periods of `max_period`
+        self._history: collections.deque[tuple] = collections.deque(maxlen=repeats * max_period)
+        # Number of checks so far, and the check each key in `_history` was last seen at
+        self._checks = 0
+        self._last_seen: dict[tuple, int] = {}
+
+    def reset(self) -> None:
+        """Forget everything seen so far, ready for a new duel"""
+        self._history.clear()
+        self._checks = 0
+        self._last_seen.clear()
+
+    def is_out_of_reach(self, sim: "Simulation") -> bool:
+        remaining = sim.ticks - sim.tick_count
+        closing = remaining * (abs(sim.ship1.speed) + abs(sim.ship2.speed))
+        reach = max(sim.ship1.weapon_range, sim.ship2.weapon_range)
+        distance = sim.ship1.distance_to_enemy()
+        # Slack for rounding in the positions, so a closable gap is never declared out of reach
+        slack = 1e-9 * (distance + closing) + 1e-6
+        return distance - closing > reach + slack
+
+    def is_repeating(self, sim: "Simulation") -> bool:
+        key = (
+            round(sim.ship1.distance_to_enemy() / self.distance_tolerance),
+            round(sim.ship1.angle_to_enemy_degree() / self.angle_tolerance),
+            round(sim.ship2.angle_to_enemy_degree() / self.angle_tolerance),
+            sim.ship1.strategy_code,
+            sim.ship2.strategy_code,
+        )
+        check = self._checks
+        self._checks += 1
+        history = self._history
+        last_seen = self._last_seen
+        if len(history) == history.maxlen:
+            # Keys seen too long ago for any period to reach are forgotten,
+            # so this never holds more than `history` does
+            oldest = history[0]
+            if last_seen[oldest] == check - history.maxlen:
+                del last_seen[oldest]
+        history.append(key)
+        last = last_seen.get(key)
+        last_seen[key] = check
+        if last is None:
+            return False
+
+        # The only period worth testing is the gap since this key was last seen
+        period = check - last
+        span = self.repeats * period
+        if period > self.max_period or span > len(history):
+            return False
+        end = len(history) - 1
+        return all(
+            history[end - offset] == history[end - offset - period]
+            for offset in range(span - period)
+        )
+
+    def is_stalled(self, sim: "Simulation") -> bool:
+        if self.is_out_of_reach(sim):
+            return True
+        return (
+            self.periodic
+            and sim.tick_count % self.check_every == 0
+            and self.is_repeating(sim)
+        )
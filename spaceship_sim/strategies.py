@@ -0,0 +1,157 @@
+"""
+The strategy registry: compact integer codes for everything a ship can do.
+
+A strategy is a function that turns a ship, given where its enemy is and
+which way it's heading:
+
+    def kamikaze(ship: Spaceship, enemy_position: Vector, enemy_direction: Vector) -> None:
+        ship.turn_towards(enemy_position + enemy_direction * 10.0)
+
+    KAMIKAZE = register("kamikaze", kamikaze)
+
+`Spaceship` keeps the code of its current strategy in `strategy_code`, and
+`implement_strategy` calls the registered function through a list lookup.
+Recorders and trajectory files store the codes too. Only this module turns
+them back into names.
+
+The built-in strategies always have the same codes, in `BUILTIN` order.
+Strategies registered later get the next free codes, so register them in the
+same order in every process that reads or writes their codes.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+from typing import TYPE_CHECKING, Callable, Union
+
+from spaceship_sim.vector import MutableVector, Vector
+
+if TYPE_CHECKING:
+    from spaceship_sim.spaceship import Spaceship
+
+
+Strategy = Callable[["Spaceship", Union[Vector, MutableVector, None], Union[Vector, MutableVector, None]], None]
+"""Turns a ship: `strategy(ship, enemy_position, enemy_direction)`"""
+
+_names: list[str] = []
+_codes: dict[str, int] = {}
+
+IMPLEMENTATIONS: list[Strategy] = []
+"""Every registered strategy function, indexed by code. Add to it with `register()`."""
+
+
+def register(name: str, strategy: Strategy) -> int:
+    """Add a strategy under a new name and return its code"""
+    if name in _codes:
+        raise ValueError(f"Strategy {name!r} is already registered, as code {_codes[name]}")
+    _codes[name] = len(_names)
+    _names.append(name)
+    IMPLEMENTATIONS.append(strategy)
+    return _codes[name]
+
+
+def code(name: str) -> int:
+    """The code of a registered strategy"""
+    try:
+        return _codes[name]
+    except KeyError:
+        raise ValueError(f"Invalid strategy {name!r}") from None
+
+
+def name(code: int) -> str:
+    """The name of the strategy with this code"""
+    return _names[code]
+
+
+def implementation(code: int) -> Strategy:
+    return IMPLEMENTATIONS[code]
+
+
+def names() -> tuple[str, ...]:
+    """Every registered strategy, in code order"""
+    return tuple(_names)
+
+
+# Built-in strategies
+
+def patrol(ship: "Spaceship", enemy_position, enemy_direction) -> None:
+    """Turn randomly"""
+    ship.turn_towards(Vector.random_direction(ship.rng))
+
+
+def chase(ship: "Spaceship", enemy_position, enemy_direction) -> None:
+    """Turn straight towards the enemy"""
+    vector_to_enemy = ship._to_enemy
+    vector_to_enemy.set_difference(enemy_position, ship._position)
+    ship.turn_towards(vector_to_enemy)
+
+
+def evade(ship: "Spaceship", enemy_position, enemy_direction) -> None:
+    """Move perpendicular to enemy direction AND vector to enemy"""
+    # Two possible vectors:
+    vector_to_enemy = ship._to_enemy
+    vector_to_enemy.set_difference(enemy_position, ship._position)
+    candidate = ship._candidate
+    candidate.set_cross(vector_to_enemy, enemy_direction)
+
+    # If parallel, special case.
+    # Indicated by cross product being zero
+    # Just pick a random direction perpendicular to enemy direction
+    # Do this by picking a random direction and crossing that with the enemy direction
+    while candidate.is_zero():
+        candidate.copy_from(Vector.random_direction(ship.rng).cross(enemy_direction))
+
+    # Choose the one that's the smallest turn. I.E., the one that
+    # makes the smallest angle with the current direction.
+    # The other candidate is the negation.
+    angle_1 = candidate.angle_degrees(ship._direction)
+    candidate.negate()
+    angle_2 = candidate.angle_degrees(ship._direction)
+    if angle_1 < angle_2:
+        candidate.negate()
+    retreat = ship.strategy_parameters.evade_retreat
+    if retreat != 0.0:
+        # Lean away from the enemy, keeping the same point semantics
+        candidate.copy_from(
+            candidate.snapshot().normalized * (1.0 - retreat)
+            - vector_to_enemy.snapshot().normalized * retreat
+        )
+    ship.turn_towards(candidate)
+
+
+PATROL = register("patrol", patrol)
+CHASE_DISTANCE = register("chase-distance", chase)
+CHASE_ANGLE = register("chase-angle", chase)
+EVADE = register("evade", evade)
+
+BUILTIN = names()
+"""The built-in strategies, in code order"""
+
+
+if __name__ == "__main__":
+    # Register with the module Spaceship uses, not this script's copy of it
+    from spaceship_sim import strategies
+    from spaceship_sim.vector import Vector
+    from spaceship_sim.spaceship import Spaceship
+    from spaceship_sim.simulation import Simulation
+
+    def kamikaze(ship: "Spaceship", enemy_position, enemy_direction) -> None:
+        """Aim ahead of the enemy"""
+        ship.turn_towards(enemy_position + enemy_direction * 10.0)
+
+    KAMIKAZE = strategies.register("kamikaze", kamikaze)
+
+    class KamikazeShip(Spaceship):
+        def choose_strategy(self, enemy_position=None, enemy_direction=None) -> None:
+            self.strategy_code = KAMIKAZE
+
+    sim = Simulation(
+        KamikazeShip(position=Vector(0.0, 0.0, 0.0)),
+        Spaceship(position=Vector(300.0, 40.0, 0.0), direction=Vector(0.0, 1.0, 0.0)),
+        ticks=2000,
+        adaptive=True,
+    )
+    sim.run()
+    print(f"{strategies.names() = }")
+    print(f"{sim.result} after {sim.tick_count} ticks, last strategies {sim.data[-1].ship1_strategy!r} and {sim.data[-1].ship2_strategy!r}")
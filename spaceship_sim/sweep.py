@@ -0,0 +1,228 @@
+"""
+Run many random duels, spread over a pool of worker processes.
+
+Every duel gets its own seed, derived from a master seed and the duel's index,
+so a sweep gives bit-identical results whatever the worker count or chunking.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import math
+import os
+import random
+from collections import Counter
+from typing import Union
+
+from spaceship_sim.vector import Vector
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.recorder import SummaryRecorder
+from spaceship_sim.aggregate import SweepAggregate
+from spaceship_sim.cache import ResultCache, duel_key
+from spaceship_sim.rng import derive_seed
+
+
+@dataclasses.dataclass(frozen=True)
+class DuelSummary:
+    """Everything a sweep keeps about one duel"""
+    index: int
+    seed: int
+    result: str
+    ticks: int
+    initial_distance: float
+    initial_ship1_angle: float
+    initial_ship2_angle: float
+
+
+@dataclasses.dataclass
+class SweepResult:
+    """Merged output of a sweep. `duels` is in duel index order, and empty
+    unless the sweep was run with `keep_duels`."""
+    master_seed: int
+    aggregate: SweepAggregate
+    duels: list[DuelSummary] = dataclasses.field(default_factory=list)
+    cache_hits: int = 0
+
+    @property
+    def result_counter(self) -> Counter:
+        return self.aggregate.result_counter
+
+    @property
+    def mean_ticks(self) -> float:
+        return self.aggregate.mean_ticks
+
+    @property
+    def min_ticks(self) -> int:
+        return self.aggregate.min_ticks
+
+    @property
+    def max_ticks(self) -> int:
+        return self.aggregate.max_ticks
+
+    def summary(self) -> str:
+        rv = ""
+        rv += f"MASTER SEED: {self.master_seed}\n"
+        rv += f"CACHE HITS: {self.cache_hits}\n"
+        rv += self.aggregate.summary()
+        return rv
+
+
+def duel_seed(master_seed: int, index: int) -> int:
+    """Independent, reproducible 64-bit seed for one duel of a sweep"""
+    return derive_seed(master_seed, index)
+
+
+def run_duel(
+    index: int,
+    master_seed: int,
+    max_distance: float = 1000.0,
+    ticks: int = 10_000,
+    ship1_parameters: Union[dict[str, float], None] = None,
+    ship2_parameters: Union[dict[str, float], None] = None,
+    cache: Union[ResultCache, None] = None,
+) -> DuelSummary:
+    """Run duel number `index` of the sweep seeded with `master_seed`.
+    Ship parameters, like `speed`, are passed on to `Spaceship` and don't
+    change the random starting positions and directions. With a `cache`,
+    an identical duel already run is looked up instead."""
+    seed = duel_seed(master_seed, index)
+    # The duel's own stream, for its starting positions and any random turns
+    rng = random.Random(seed)
+
+    ship1 = Spaceship(
+        position=Vector.random_direction(rng) * max_distance,
+        direction=Vector.random_direction(rng),
+        **(ship1_parameters or {}),
+    )
+    ship2 = Spaceship(
+        position=Vector.random_direction(rng) * max_distance,
+        direction=Vector.random_direction(rng),
+        **(ship2_parameters or {}),
+    )
+    sim = Simulation(ship1, ship2, ticks=ticks, recorder=SummaryRecorder(), adaptive=True, rng=rng)
+    try:
+        if cache is not None:
+            key = duel_key(sim.initial_settings, seed, ticks)
+            cached = cache.get(key)
+            if cached is not None:
+                return DuelSummary(index=index, seed=seed, **cached)
+
+        sim.run()
+        initial = sim.recorder.first
+        outcome = {
+            "result": sim.result,
+            "ticks": sim.tick_count,
+            "initial_distance": initial.ship_distance,
+            "initial_ship1_angle": initial.ship1_angle_to_enemy,
+            "initial_ship2_angle": initial.ship2_angle_to_enemy,
+        }
+        if cache is not None:
+            cache.put(key, outcome)
+        return DuelSummary(index=index, seed=seed, **outcome)
+    finally:
+        # The ships point at each other. Unlink them so the duel, and its RNG
+        # state, is freed now rather than whenever the cycle collector runs.
+        ship1.enemy = None
+        ship2.enemy = None
+
+
+def _run_chunk(
+    start: int,
+    stop: int,
+    master_seed: int,
+    max_distance: float,
+    ticks: int,
+    bins: int,
+    keep_duels: bool,
+    cache_path: Union[str, None],
+) -> tuple[list[DuelSummary], SweepAggregate, int]:
+    aggregate = SweepAggregate(max_distance=max_distance, ticks=ticks, bins=bins)
+    duels = []
+    cache = None if cache_path is None else ResultCache(cache_path)
+    try:
+        for index in range(start, stop):
+            duel = run_duel(index, master_seed, max_distance=max_distance, ticks=ticks, cache=cache)
+            aggregate.add(duel)
+            if keep_duels:
+                duels.append(duel)
+    finally:
+        if cache is not None:
+            cache.close()
+    return (duels, aggregate, 0 if cache is None else cache.hits)
+
+
+def run_sweep(
+    count: int,
+    master_seed: int,
+    workers: Union[int, None] = None,
+    max_distance: float = 1000.0,
+    ticks: int = 10_000,
+    chunk_size: Union[int, None] = None,
+    keep_duels: bool = True,
+    bins: int = 20,
+    cache_path: Union[str, None] = None,
+) -> SweepResult:
+    """Run `count` random duels.
+
+    Args:
+        count (int): Number of duels.
+        master_seed (int): Seed every per-duel seed is derived from.
+        workers (int | None, optional): Worker processes. Defaults to os.cpu_count(). 1 runs in this process.
+        max_distance (float, optional): Distance of each ship from the origin at the start. Defaults to 1000.0.
+        ticks (int, optional): Tick limit for each duel. Defaults to 10_000.
+        chunk_size (int | None, optional): Duels per task sent to a worker. Defaults to about 4 tasks per worker.
+        keep_duels (bool, optional): Keep every DuelSummary. Without them, memory use doesn't grow with `count`. Defaults to True.
+        bins (int, optional): Bins per histogram of the aggregate. Defaults to 20.
+        cache_path (str | None, optional): SQLite `ResultCache` to look duels up in and add them to. Defaults to None, no cache.
+
+    Returns:
+        SweepResult: Merged statistics, plus per-duel summaries in index order if kept.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(count / (workers * 4)))
+
+    starts = list(range(0, count, chunk_size))
+    stops = [min(start + chunk_size, count) for start in starts]
+    master_seeds = [master_seed] * len(starts)
+    max_distances = [max_distance] * len(starts)
+    tick_limits = [ticks] * len(starts)
+    bin_counts = [bins] * len(starts)
+    keeps = [keep_duels] * len(starts)
+    cache_paths = [None if cache_path is None else str(cache_path)] * len(starts)
+    arguments = (starts, stops, master_seeds, max_distances, tick_limits, bin_counts, keeps, cache_paths)
+
+    aggregate = SweepAggregate(max_distance=max_distance, ticks=ticks, bins=bins)
+    duels = []
+    cache_hits = 0
+    if workers == 1:
+        for chunk_duels, chunk_aggregate, chunk_hits in map(_run_chunk, *arguments):
+            duels += chunk_duels
+            aggregate.merge(chunk_aggregate)
+            cache_hits += chunk_hits
+    else:
+        # Only needed here, and slow to import
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields chunks in submission order, so duels stay in index order
+            for chunk_duels, chunk_aggregate, chunk_hits in executor.map(_run_chunk, *arguments):
+                duels += chunk_duels
+                aggregate.merge(chunk_aggregate)
+                cache_hits += chunk_hits
+
+    return SweepResult(master_seed=master_seed, aggregate=aggregate, duels=duels, cache_hits=cache_hits)
+
+
+if __name__ == "__main__":
+    import time
+
+    for workers in [1, 2, 4]:
+        start = time.perf_counter()
+        sweep = run_sweep(40, master_seed=40351, workers=workers)
+        print(f"{workers} workers: {time.perf_counter() - start:.2f} s")
+    print(sweep.summary())
@@ -0,0 +1,241 @@
+"""
+Binary trajectory files: many duels' recorded ticks in one memory-mappable file.
+
+Layout (all little-endian):
+    header   32 bytes: magic, format version, bytes per value, values per row
+    records  one fixed-stride row of float32/float64 per recorded tick, every
+             duel back to back, with the same fields as `recorder.Row`
+    index    JSON: per duel, the initial settings, result, tick count and the
+             row offset and row count of its records
+    trailer  16 bytes: byte offset of the index, then the magic again
+
+The index goes at the end so duels can be streamed in as they finish.
+`TrajectoryReader` memory-maps the records and hands out zero-copy NumPy views.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import csv
+import json
+import struct
+from pathlib import Path
+from typing import Any, Union
+
+import numpy as np
+
+from spaceship_sim.recorder import RESULTS, ROW_WIDTH, Row, TraceRecorder
+from spaceship_sim.simulation import Simulation
+from spaceship_sim import strategies
+from spaceship_sim.vector import Vector
+
+
+MAGIC = b"SSIMTRJ\0"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIII12x")
+_TRAILER = struct.Struct("<Q8s")
+
+_COLUMN = {name: number for number, name in enumerate(Row._fields)}
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, Vector):
+        return list(value)
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    return value
+
+
+class TrajectoryWriter:
+    """Appends duels to a trajectory file. Use as a context manager, or call `close()`."""
+    def __init__(self, path: Path, dtype: Union[str, np.dtype] = "float64") -> None:
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        if self.dtype.kind != "f" or self.dtype.itemsize not in (4, 8):
+            raise ValueError(f"dtype must be float32 or float64, got {dtype!r}")
+        self.path = Path(path)
+        self._file = open(self.path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.dtype.itemsize, ROW_WIDTH))
+        self._rows = 0
+        self._duels: list[dict[str, Any]] = []
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, sim: Simulation) -> None:
+        """Append every row recorded so far by a simulation, normally a finished one"""
+        if not isinstance(sim.recorder, TraceRecorder):
+            raise TypeError(f"Need a TraceRecorder to write a trajectory, got {type(sim.recorder).__name__}")
+        rows = np.frombuffer(sim.recorder.buffer, dtype=np.float64)[:len(sim.recorder) * ROW_WIDTH]
+        rows = rows.astype(self.dtype, copy=False)
+        self._file.write(rows.tobytes())
+        self._duels.append({
+            "initial_settings": _jsonable(sim.initial_settings),
+            "result": sim.result,
+            "ticks": sim.tick_count,
+            "offset": self._rows,
+            "rows": len(sim.recorder),
+        })
+        self._rows += len(sim.recorder)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(json.dumps({"duels": self._duels}).encode("utf8"))
+        self._file.write(_TRAILER.pack(index_offset, MAGIC))
+        self._file.close()
+
+
+class DuelTrajectory:
+    """Zero-copy views of one duel's records. Vector columns are (rows, 3) arrays."""
+    def __init__(self, rows: np.ndarray, info: dict[str, Any]) -> None:
+        self.rows = rows
+        self.initial_settings: dict[str, Any] = info["initial_settings"]
+        self.result: str = info["result"]
+        self.ticks: int = info["ticks"]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _vector(self, name: str) -> np.ndarray:
+        column = _COLUMN[name + "_x"]
+        return self.rows[:, column:column + 3]
+
+    @property
+    def index(self) -> np.ndarray:
+        return self.rows[:, _COLUMN["index"]]
+
+    @property
+    def result_codes(self) -> np.ndarray:
+        """Index into `RESULTS` for every row"""
+        return self.rows[:, _COLUMN["result"]]
+
+    @property
+    def ship1_strategy_codes(self) -> np.ndarray:
+        """`strategies` registry code for every row"""
+        return self.rows[:, _COLUMN["ship1_strategy"]]
+
+    @property
+    def ship2_strategy_codes(self) -> np.ndarray:
+        return self.rows[:, _COLUMN["ship2_strategy"]]
+
+    @property
+    def ship1_position(self) -> np.ndarray:
+        return self._vector("ship1_position")
+
+    @property
+    def ship2_position(self) -> np.ndarray:
+        return self._vector("ship2_position")
+
+    @property
+    def ship1_direction(self) -> np.ndarray:
+        return self._vector("ship1_direction")
+
+    @property
+    def ship2_direction(self) -> np.ndarray:
+        return self._vector("ship2_direction")
+
+    @property
+    def distance(self) -> np.ndarray:
+        return self.rows[:, _COLUMN["ship_distance"]]
+
+    @property
+    def ship1_angle_to_enemy(self) -> np.ndarray:
+        return self.rows[:, _COLUMN["ship1_angle_to_enemy"]]
+
+    @property
+    def ship2_angle_to_enemy(self) -> np.ndarray:
+        return self.rows[:, _COLUMN["ship2_angle_to_enemy"]]
+
+    def row(self, number: int) -> Row:
+        values = self.rows[number].tolist()
+        return Row(
+            int(values[0]),
+            RESULTS[int(values[1])],
+            strategies.name(int(values[2])),
+            strategies.name(int(values[3])),
+            *values[4:],
+        )
+
+
+class TrajectoryReader:
+    """Memory-maps a trajectory file. `reader[i]` is duel number i."""
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            magic, version, itemsize, row_width = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a trajectory file")
+            if version != VERSION:
+                raise ValueError(f"{self.path} is trajectory format version {version}, expected {VERSION}")
+            if row_width != ROW_WIDTH:
+                raise ValueError(f"{self.path} has {row_width} values per row, expected {ROW_WIDTH}")
+
+            file.seek(-_TRAILER.size, 2)
+            trailer_offset = file.tell()
+            index_offset, end_magic = _TRAILER.unpack(file.read(_TRAILER.size))
+            if end_magic != MAGIC:
+                raise ValueError(f"{self.path} is truncated or was not closed")
+            file.seek(index_offset)
+            self._duels: list[dict[str, Any]] = json.loads(file.read(trailer_offset - index_offset))["duels"]
+
+        self.dtype = np.dtype(f"<f{itemsize}")
+        row_count = (index_offset - _HEADER.size) // (itemsize * ROW_WIDTH)
+        if row_count:
+            self.records = np.memmap(
+                self.path,
+                dtype=self.dtype,
+                mode="r",
+                offset=_HEADER.size,
+                shape=(row_count, ROW_WIDTH),
+            )
+        else:
+            self.records = np.empty((0, ROW_WIDTH), dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self._duels)
+
+    def __getitem__(self, duel: int) -> DuelTrajectory:
+        info = self._duels[duel]
+        return DuelTrajectory(self.records[info["offset"]:info["offset"] + info["rows"]], info)
+
+
+def to_csv(trajectory_path: Path, csv_path: Path, duel: int = 0) -> None:
+    """Write one duel of a trajectory file in the same format as `Simulation.to_csv`"""
+    trajectory = TrajectoryReader(trajectory_path)[duel]
+    with open(csv_path, "w", encoding="utf8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(Row._fields)
+        writer.writerows(trajectory.row(number) for number in range(len(trajectory)))
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from spaceship_sim.spaceship import Spaceship
+
+    random.seed(40351)
+    path = Path("./trajectories.bin")
+    start = time.perf_counter()
+    with TrajectoryWriter(path) as writer:
+        for _ in range(10):
+            sim = Simulation(
+                Spaceship(position=Vector.random_direction() * 1000.0, direction=Vector.random_direction()),
+                Spaceship(position=Vector.random_direction() * 1000.0, direction=Vector.random_direction()),
+                ticks=10_000,
+            )
+            sim.run()
+            writer.add(sim)
+    print(f"Wrote {path} ({path.stat().st_size} bytes) in {time.perf_counter() - start:.2f} s")
+
+    reader = TrajectoryReader(path)
+    for number in range(len(reader)):
+        duel = reader[number]
+        print(f"{number}: {duel.result} after {duel.ticks} ticks, closest approach {duel.distance.min():.2f}")
+    to_csv(path, Path("./data.csv"), duel=0)
@@ -0,0 +1,281 @@
+"""
+Tune `StrategyParameters` by how often they win.
+
+Candidates are scored against a fixed `opponent` over a `DuelBank`: the same
+seeded duels for every candidate, down to the random turns, so differences in
+score come from the parameters and not from luck of the draw (common random
+numbers). Each duel is fought twice, with the candidate as ship 1 and as
+ship 2, and scores 1 for a win, 0.5 for a draw or timeout and 0 for a loss.
+
+Every candidate of a round is run in one `BatchSimulation` per chunk of the
+bank, and chunks are spread over worker processes.
+
+Searches:
+    random_search         uniform samples of the `TUNABLE` ranges
+    evolution_strategy    a separable evolution strategy in the spirit of
+                          CMA-ES: sample around a mean, move the mean to the
+                          weighted best half, and adapt each parameter's step
+                          size to how far the best half spread
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import math
+import os
+import random
+from typing import Sequence, Union
+
+import numpy as np
+
+from spaceship_sim.batch import BOTH_DESTROYED, ONGOING, SHIP_1_WINS, SHIP_2_WINS, BatchSimulation
+from spaceship_sim.rng import stream
+from spaceship_sim.spaceship import Spaceship, StrategyParameters
+from spaceship_sim.vector import Vector
+
+
+TUNABLE: dict[str, tuple[float, float]] = {
+    "chase_distance_factor": (0.5, 6.0),
+    "chase_angle_degrees": (0.0, 180.0),
+    "evade_retreat": (0.0, 1.0),
+}
+"""The `StrategyParameters` fields searched, and the range each is searched over"""
+
+
+def _from_unit(unit: Sequence[float]) -> StrategyParameters:
+    """Parameters from a point in the unit cube, one coordinate per `TUNABLE` field"""
+    return StrategyParameters(**{
+        name: low + float(value) * (high - low)
+        for (name, (low, high)), value
+        in zip(TUNABLE.items(), unit)
+    })
+
+
+def _to_unit(parameters: StrategyParameters) -> np.ndarray:
+    return np.array([
+        (getattr(parameters, name) - low) / (high - low)
+        for name, (low, high)
+        in TUNABLE.items()
+    ])
+
+
+@dataclasses.dataclass(frozen=True)
+class DuelBank:
+    """A fixed set of seeded duels, the same for every candidate"""
+    count: int = 200
+    master_seed: int = 40351
+    max_distance: float = 1000.0
+    ticks: int = 10_000
+
+    def ships(
+        self,
+        index: int,
+        ship1_parameters: StrategyParameters,
+        ship2_parameters: StrategyParameters,
+    ) -> tuple[Spaceship, Spaceship]:
+        """Duel number `index`, with fresh copies of its random streams"""
+        position1, direction1, position2, direction2 = Vector.random_directions(4, stream(self.master_seed, index))
+        turns = stream(self.master_seed, index, "turns")
+        return (
+            Spaceship(
+                position=position1 * self.max_distance,
+                direction=direction1,
+                rng=turns,
+                strategy_parameters=ship1_parameters,
+            ),
+            Spaceship(
+                position=position2 * self.max_distance,
+                direction=direction2,
+                rng=turns,
+                strategy_parameters=ship2_parameters,
+            ),
+        )
+
+
+def _score_chunk(
+    candidates: list[StrategyParameters],
+    opponent: StrategyParameters,
+    bank: DuelBank,
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    """Total score of each candidate over duels `start` to `stop` of the bank, from both sides"""
+    ship1s = []
+    ship2s = []
+    for candidate in candidates:
+        for index in range(start, stop):
+            ship1, ship2 = bank.ships(index, candidate, opponent)
+            ship1s.append(ship1)
+            ship2s.append(ship2)
+            ship1, ship2 = bank.ships(index, opponent, candidate)
+            ship1s.append(ship1)
+            ship2s.append(ship2)
+    batch = BatchSimulation(ship1s, ship2s, ticks=bank.ticks)
+    batch.run()
+
+    result = batch.result.reshape(len(candidates), stop - start, 2)
+    as_ship1 = result[:, :, 0]
+    as_ship2 = result[:, :, 1]
+    draws = (result == BOTH_DESTROYED) | (result == ONGOING)
+    return (
+        (as_ship1 == SHIP_1_WINS).sum(axis=1)
+        + (as_ship2 == SHIP_2_WINS).sum(axis=1)
+        + 0.5 * draws.sum(axis=(1, 2))
+    )
+
+
+def score(
+    candidates: Sequence[StrategyParameters],
+    bank: DuelBank,
+    opponent: StrategyParameters = StrategyParameters(),
+    workers: Union[int, None] = None,
+) -> list[float]:
+    """Mean score of each candidate against `opponent` over the bank, from 0.0 to 1.0
+
+    Args:
+        candidates (Sequence[StrategyParameters]): Parameters to score.
+        bank (DuelBank): Duels to score them on.
+        opponent (StrategyParameters, optional): Who they fight. Defaults to the original thresholds.
+        workers (int | None, optional): Worker processes. Defaults to os.cpu_count(). 1 runs in this process.
+    """
+    if bank.count < 1:
+        raise ValueError(f"Need at least one duel in the bank to score on, got count={bank.count}")
+    candidates = list(candidates)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunk_size = max(1, math.ceil(bank.count / workers))
+    starts = list(range(0, bank.count, chunk_size))
+    arguments = (
+        [candidates] * len(starts),
+        [opponent] * len(starts),
+        [bank] * len(starts),
+        starts,
+        [min(start + chunk_size, bank.count) for start in starts],
+    )
+    if workers == 1:
+        totals = sum(map(_score_chunk, *arguments))
+    else:
+        # Only needed here, and slow to import
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            totals = sum(executor.map(_score_chunk, *arguments))
+    return (totals / (2 * bank.count)).tolist()
+
+
+@dataclasses.dataclass
+class TuningResult:
+    """Every candidate scored by a search, in order"""
+    history: list[tuple[StrategyParameters, float]] = dataclasses.field(default_factory=list)
+
+    @property
+    def best(self) -> StrategyParameters:
+        return max(self.history, key=lambda entry: entry[1])[0]
+
+    @property
+    def best_score(self) -> float:
+        return max(score for _, score in self.history)
+
+    def summary(self) -> str:
+        rv = ""
+        rv += f"CANDIDATES: {len(self.history)}\n"
+        rv += f"BEST SCORE: {self.best_score:.3f}\n"
+        rv += "BEST PARAMETERS:\n"
+        rv += "\n".join([
+            f"  {name}: {value:.3f}"
+            for name, value
+            in dataclasses.asdict(self.best).items()
+        ])
+        return rv
+
+
+def random_search(
+    bank: DuelBank,
+    evaluations: int = 64,
+    seed: int = 0,
+    opponent: StrategyParameters = StrategyParameters(),
+    workers: Union[int, None] = None,
+    batch_size: int = 16,
+) -> TuningResult:
+    """Score `evaluations` uniformly random candidates, starting with `opponent` itself for reference"""
+    rng = random.Random(seed)
+    candidates = [opponent] + [
+        _from_unit([rng.random() for _ in TUNABLE])
+        for _ in range(evaluations - 1)
+    ]
+    result = TuningResult()
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        result.history += zip(batch, score(batch, bank, opponent=opponent, workers=workers))
+    return result
+
+
+def evolution_strategy(
+    bank: DuelBank,
+    generations: int = 10,
+    population: int = 16,
+    seed: int = 0,
+    start: StrategyParameters = StrategyParameters(),
+    step_size: float = 0.2,
+    opponent: StrategyParameters = StrategyParameters(),
+    workers: Union[int, None] = None,
+) -> TuningResult:
+    """Evolve parameters from `start`, `population` candidates per generation
+
+    Args:
+        bank (DuelBank): Duels to score candidates on.
+        generations (int, optional): Rounds of sampling and selection. Defaults to 10.
+        population (int, optional): Candidates scored per generation. Defaults to 16.
+        seed (int, optional): Seed for sampling candidates. Defaults to 0.
+        start (StrategyParameters, optional): Initial mean. Defaults to the original thresholds.
+        step_size (float, optional): Initial spread, as a fraction of each `TUNABLE` range. Defaults to 0.2.
+        opponent (StrategyParameters, optional): Who candidates fight. Defaults to the original thresholds.
+        workers (int | None, optional): Worker processes. Defaults to os.cpu_count(). 1 runs in this process.
+    """
+    generator = np.random.default_rng(seed)
+    dimensions = len(TUNABLE)
+    mean = np.clip(_to_unit(start), 0.0, 1.0)
+    sigma = np.full(dimensions, step_size)
+    # Log-rank weights over the better half, as in CMA-ES
+    parents = max(1, population // 2)
+    weights = np.log(parents + 0.5) - np.log(np.arange(1, parents + 1))
+    weights /= weights.sum()
+    result = TuningResult()
+    for _ in range(generations):
+        units = np.clip(mean + sigma * generator.standard_normal((population, dimensions)), 0.0, 1.0)
+        candidates = [_from_unit(unit) for unit in units]
+        scores = score(candidates, bank, opponent=opponent, workers=workers)
+        result.history += zip(candidates, scores)
+
+        best = np.argsort(scores)[::-1][:parents]
+        steps = units[best] - mean
+        mean = mean + weights @ steps
+        # Smoothed towards the spread of the selected steps, never collapsing entirely
+        sigma = np.maximum(0.7 * sigma + 0.3 * np.sqrt(weights @ (steps * steps)), 0.01)
+    return result
+
+
+if __name__ == "__main__":
+    import time
+
+    bank = DuelBank(count=40, ticks=3000)
+
+    start = time.perf_counter()
+    baseline = score([StrategyParameters()], bank)[0]
+    print(f"Original thresholds against themselves: {baseline:.3f} ({time.perf_counter() - start:.2f} s)")
+
+    start = time.perf_counter()
+    search = random_search(bank, evaluations=16, seed=1)
+    print(f"Random search, {time.perf_counter() - start:.2f} s")
+    print(search.summary())
+
+    start = time.perf_counter()
+    evolved = evolution_strategy(bank, generations=4, population=8, seed=1)
+    print(f"Evolution strategy, {time.perf_counter() - start:.2f} s")
+    print(evolved.summary())
+
+    # Scores on the tuning bank are optimistic. Check on duels it never saw.
+    held_out = DuelBank(count=40, master_seed=1, ticks=3000)
+    print(f"Held out: {score([evolved.best], held_out)[0]:.3f}")
@@ -0,0 +1,588 @@
+"""
+A simple 3D Cartesian vector class.
+Not particularly efficient. Not particularly thoroughly tested.
+
+Author: David Mayo <dcmayo@gmail.com>
+
+License: MIT
+"""
+
+import dataclasses
+import math
+import random
+from typing import ClassVar, Generator, NamedTuple, Union
+
+
+epsilon = 1e-9
+"""Floating point fudge factor"""
+
+
+class CacheInfo(NamedTuple):
+    """Hit/miss counts for the per-instance `Vector.magnitude` and `Vector.normalized` caches"""
+    hits: int
+    misses: int
+
+
+class _CacheStats:
+    __slots__ = ("hits", "misses")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+_cache_stats = _CacheStats()
+
+
+def cache_info() -> CacheInfo:
+    """Cache statistics for every `Vector` since start up, or since the last `cache_clear_stats()`"""
+    return CacheInfo(hits=_cache_stats.hits, misses=_cache_stats.misses)
+
+
+def cache_clear_stats() -> None:
+    _cache_stats.hits = 0
+    _cache_stats.misses = 0
+
+
+class _VectorCache:
+    """Slots for values `Vector` computes on first use and keeps for the lifetime
+    of the instance, so they are freed along with the vector. Kept out of the
+    dataclass fields, so __init__, equality, hashing and asdict() ignore them."""
+    __slots__ = ("_magnitude", "_normalized")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Vector(_VectorCache):
+    """
+    A simple 3D Cartesian vector class.
+    Not particularly efficient. Not particularly thoroughly tested.
+    """
+    x: float = 0.0
+    y: float = 0.0
+    z: float = 0.0
+
+
+    def __neg__(self) -> "Vector":
+        return Vector(
+            x = -self.x,
+            y = -self.y,
+            z = -self.z,
+        )
+
+    def __add__(self, other: "Vector") -> "Vector":
+        return Vector(
+            x = self.x + other.x,
+            y = self.y + other.y,
+            z = self.z + other.z,
+        )
+    
+    def __sub__(self, other: "Vector") -> "Vector":
+        return Vector(
+            x = self.x - other.x,
+            y = self.y - other.y,
+            z = self.z - other.z,
+        )
+    
+    def __mul__(self, other: float) -> "Vector":
+        return Vector(
+            x = self.x * other,
+            y = self.y * other,
+            z = self.z * other,
+        )
+    
+    def __rmul__(self, other: float) -> "Vector":
+        return self * other
+    
+    def __truediv__(self, other: float) -> "Vector":
+        return self * (1.0 / other)
+    
+    def __eq__(self, other: "Vector") -> bool:
+        return (
+            abs(self.x - other.x) < epsilon
+            and abs(self.y - other.y) < epsilon
+            and abs(self.z - other.z) < epsilon
+        )
+    
+    def __ne__(self, other: "Vector") -> bool:
+        return (
+            self.x != other.x
+            or self.y != other.y
+            or self.z != other.z
+        )
+    
+    # For casting to tuple, list, etc.
+    def __iter__(self) -> Generator[float, None, None]:
+        yield self.x
+        yield self.y
+        yield self.z
+
+    # for vector[0], vector[-2:], etc.
+    def __getitem__(self, index: Union[int, slice]) -> float:
+        return tuple(self)[index]
+    
+
+    def dot(self, other: "Vector") -> float:
+        return (
+            self.x * other.x
+            + self.y * other.y
+            + self.z * other.z
+        )
+    
+    def cross(self, other: "Vector") -> "Vector":
+        """Cross product (assumes right-handed coordinate system)"""
+        # Formula: https://math.libretexts.org/Bookshelves/Calculus/Calculus_(OpenStax)/12%3A_Vectors_in_Space/12.04%3A_The_Cross_Product
+        x = self.y * other.z - self.z * other.y
+        y = -(self.x * other.z - self.z * other.x)
+        z = self.x * other.y - self.y * other.x
+        return Vector(x=x, y=y, z=z)
+    
+    def magnitude(self) -> float:
+        try:
+            magnitude = self._magnitude
+        except AttributeError:
+            _cache_stats.misses += 1
+            magnitude = math.sqrt(
+                self.x ** 2
+                + self.y ** 2
+                + self.z ** 2
+            )
+            object.__setattr__(self, "_magnitude", magnitude)
+        else:
+            _cache_stats.hits += 1
+        return magnitude
+    
+    def distance(self, other: "Vector") -> float:
+        return (other - self).magnitude()
+    
+    def angle(self, other: "Vector") -> float:
+        """Angle in radians, 0.0 <= angle <= pi"""
+        denominator = self.magnitude() * other.magnitude()
+        if denominator < epsilon:
+            raise ZeroDivisionError(f"One or both magnitudes too close to zero: {self!r}, {other!r}")
+        cosine = self.dot(other) / denominator
+        # Clamp this to [-1.0, 1.0] because of floating point problems yielding 1.000000000003 etc.
+        if cosine < -1.0:
+            cosine = -1.0
+        if cosine > 1.0:
+            cosine = 1.0
+        return math.acos(cosine)
+    
+    def angle_degrees(self, other: "Vector") -> float:
+        return math.degrees(self.angle(other))
+
+    def rotate_towards(self, other: "Vector", angle: float) -> "Vector":
+        """_summary_
+
+        Args:
+            other (Vector): _description_
+            angle (float): angle IN RADIANS
+
+        Returns:
+            Vector: _description_
+        """
+        # Method from https://stackoverflow.com/a/22101541/11700208
+        rotation_axis = self.cross(other).cross(self).normalized
+        return math.cos(angle) * self + math.sin(angle) * rotation_axis
+    
+    def rotate_towards_degrees(self, other: "Vector", angle: float) -> "Vector":
+        """_summary_
+
+        Args:
+            other (Vector): _description_
+            angle (float): angle IN DEGREES
+
+        Returns:
+            Vector: _description_
+        """
+        return self.rotate_towards(
+            other=other,
+            angle=math.radians(angle)
+        )
+
+    @property
+    def normalized(self) -> "Vector":
+        try:
+            normalized = self._normalized
+        except AttributeError:
+            _cache_stats.misses += 1
+            normalized = self / self.magnitude()
+            object.__setattr__(self, "_normalized", normalized)
+        else:
+            _cache_stats.hits += 1
+        return normalized
+    
+    def __str__(self) -> str:
+        return f"<{self.x:.4f},{self.y:.4f},{self.z:.4f}>"
+    
+    # Set below the class, since instances can't be made until it exists
+    zero: ClassVar["Vector"]
+    """<0, 0, 0>"""
+    plus_x: ClassVar["Vector"]
+    """<1, 0, 0>"""
+
+
+    @classmethod
+    def random_direction(cls, rng: Union[random.Random, None] = None) -> "Vector":
+        """Get a random normalized vector, from a spherically uniform distribution.
+        Draws from `rng`, or the global `random` module if None."""
+        if rng is None:
+            rng = random
+        # Technique from https://mathworld.wolfram.com/SpherePointPicking.html
+        x = rng.gauss()
+        y = rng.gauss()
+        z = rng.gauss()
+        return Vector(x=x, y=y, z=z).normalized
+
+    @classmethod
+    def random_directions(cls, count: int, rng: Union[random.Random, None] = None) -> list["Vector"]:
+        """`count` random normalized vectors, the same as `count` calls to `random_direction`"""
+        if rng is None:
+            rng = random
+        gauss = rng.gauss
+        directions = []
+        for _ in range(count):
+            x = gauss()
+            y = gauss()
+            z = gauss()
+            directions.append(Vector(x=x, y=y, z=z).normalized)
+        return directions
+
+
+Vector.zero = Vector(0.0, 0.0, 0.0)
+Vector.plus_x = Vector(1.0, 0.0, 0.0)
+
+
+class MutableVector:
+    """
+    A 3D Cartesian vector that is updated in place, for hot loops.
+
+    Methods mirror `Vector`'s, and do the same floating point operations in
+    the same order, so results match `Vector` bit for bit. Mutating methods
+    return None. Arguments can be `Vector`s or `MutableVector`s.
+
+    `snapshot()` is a frozen `Vector` copy, made at most once between changes.
+    Change the vector through its methods, not by assigning x/y/z, or the
+    snapshot goes stale.
+    """
+    __slots__ = ("x", "y", "z", "_snapshot")
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+        self._snapshot: Union[Vector, None] = None
+
+    def __repr__(self) -> str:
+        return f"MutableVector(x={self.x!r}, y={self.y!r}, z={self.z!r})"
+
+    def __str__(self) -> str:
+        return f"<{self.x:.4f},{self.y:.4f},{self.z:.4f}>"
+
+    def __iter__(self) -> Generator[float, None, None]:
+        yield self.x
+        yield self.y
+        yield self.z
+
+    def snapshot(self) -> Vector:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = Vector(self.x, self.y, self.z)
+        return snapshot
+
+    def set(self, x: float, y: float, z: float) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+        self._snapshot = None
+
+    def copy_from(self, other: Union[Vector, "MutableVector"]) -> None:
+        self.x = other.x
+        self.y = other.y
+        self.z = other.z
+        # A Vector is immutable, so it can be the snapshot as is
+        self._snapshot = other if isinstance(other, Vector) else None
+
+    def set_difference(self, a: Union[Vector, "MutableVector"], b: Union[Vector, "MutableVector"]) -> None:
+        """self = a - b"""
+        self.x = a.x - b.x
+        self.y = a.y - b.y
+        self.z = a.z - b.z
+        self._snapshot = None
+
+    def set_cross(self, a: Union[Vector, "MutableVector"], b: Union[Vector, "MutableVector"]) -> None:
+        """self = a.cross(b)"""
+        x = a.y * b.z - a.z * b.y
+        y = -(a.x * b.z - a.z * b.x)
+        z = a.x * b.y - a.y * b.x
+        self.x = x
+        self.y = y
+        self.z = z
+        self._snapshot = None
+
+    def negate(self) -> None:
+        self.x = -self.x
+        self.y = -self.y
+        self.z = -self.z
+        self._snapshot = None
+
+    def is_zero(self) -> bool:
+        """Same as `vector == Vector.zero`"""
+        return abs(self.x) < epsilon and abs(self.y) < epsilon and abs(self.z) < epsilon
+
+    def dot(self, other: Union[Vector, "MutableVector"]) -> float:
+        return (
+            self.x * other.x
+            + self.y * other.y
+            + self.z * other.z
+        )
+
+    def magnitude(self) -> float:
+        return math.sqrt(
+            self.x ** 2
+            + self.y ** 2
+            + self.z ** 2
+        )
+
+    def distance(self, other: Union[Vector, "MutableVector"]) -> float:
+        return math.sqrt(
+            (other.x - self.x) ** 2
+            + (other.y - self.y) ** 2
+            + (other.z - self.z) ** 2
+        )
+
+    def angle_degrees(self, other: Union[Vector, "MutableVector"]) -> float:
+        """Angle in degrees, 0.0 <= angle <= 180.0"""
+        denominator = self.magnitude() * math.sqrt(other.x ** 2 + other.y ** 2 + other.z ** 2)
+        if denominator < epsilon:
+            raise ZeroDivisionError(f"One or both magnitudes too close to zero: {self!r}, {other!r}")
+        cosine = self.dot(other) / denominator
+        if cosine < -1.0:
+            cosine = -1.0
+        if cosine > 1.0:
+            cosine = 1.0
+        return math.degrees(math.acos(cosine))
+
+    def normalize(self) -> None:
+        """self = self.normalized"""
+        scale = 1.0 / self.magnitude()
+        self.x *= scale
+        self.y *= scale
+        self.z *= scale
+        self._snapshot = None
+
+    def add_normalized(self, other: Union[Vector, "MutableVector"], length: float) -> None:
+        """self += other.normalized * length"""
+        scale = 1.0 / math.sqrt(other.x ** 2 + other.y ** 2 + other.z ** 2)
+        self.x += other.x * scale * length
+        self.y += other.y * scale * length
+        self.z += other.z * scale * length
+        self._snapshot = None
+
+    def rotate_towards(self, other: Union[Vector, "MutableVector"], angle: float) -> None:
+        """self = self.rotate_towards(other, angle), with angle IN RADIANS"""
+        x, y, z = self.x, self.y, self.z
+        # self.cross(other)
+        cx = y * other.z - z * other.y
+        cy = -(x * other.z - z * other.x)
+        cz = x * other.y - y * other.x
+        # .cross(self)
+        ax = cy * z - cz * y
+        ay = -(cx * z - cz * x)
+        az = cx * y - cy * x
+        # .normalized
+        scale = 1.0 / math.sqrt(ax ** 2 + ay ** 2 + az ** 2)
+        ax *= scale
+        ay *= scale
+        az *= scale
+        cosine = math.cos(angle)
+        sine = math.sin(angle)
+        self.x = x * cosine + ax * sine
+        self.y = y * cosine + ay * sine
+        self.z = z * cosine + az * sine
+        self._snapshot = None
+
+    def in_cone(self, other: Union[Vector, "MutableVector"], limit: float) -> bool:
+        """Angle from self to other is no more than the half angle of a cone,
+        given as its `cone_limit`. Same as `angle_degrees(other) <= angle`, up to
+        rounding at the edge, with no square roots or trig. False where
+        `angle_degrees` would raise.
+        """
+        x, y, z = self.x, self.y, self.z
+        ox, oy, oz = other.x, other.y, other.z
+        dd = x * x + y * y + z * z
+        oo = ox * ox + oy * oy + oz * oz
+        dot = x * ox + y * oy + z * oz
+        product = dd * oo
+        # Comparing signed squares keeps the sign of the cosine without a sqrt
+        return product >= epsilon * epsilon and dot * abs(dot) >= limit * product
+
+    def turn_with_rate_limit(
+        self,
+        desired: Union[Vector, "MutableVector"],
+        max_turn_cos: float,
+        max_turn_sin: float,
+    ) -> None:
+        """In place version of `turn_with_rate_limit`, with self as the direction"""
+        x, y, z = self.x, self.y, self.z
+        wx, wy, wz = desired.x, desired.y, desired.z
+        dd = x * x + y * y + z * z
+        ww = wx * wx + wy * wy + wz * wz
+        dw = x * wx + y * wy + z * wz
+        denominator = math.sqrt(dd * ww)
+        if denominator < epsilon:
+            raise ZeroDivisionError(f"One or both magnitudes too close to zero: {self!r}, {desired!r}")
+        if dw >= max_turn_cos * denominator:
+            scale = 1.0 / math.sqrt(ww)
+            self.x = wx * scale
+            self.y = wy * scale
+            self.z = wz * scale
+        else:
+            # (self x desired) x self, without the cross products
+            ax = wx * dd - x * dw
+            ay = wy * dd - y * dw
+            az = wz * dd - z * dw
+            scale = max_turn_sin / math.sqrt(ax * ax + ay * ay + az * az)
+            self.x = x * max_turn_cos + ax * scale
+            self.y = y * max_turn_cos + ay * scale
+            self.z = z * max_turn_cos + az * scale
+        self._snapshot = None
+
+
+def cone_limit(max_angle_degrees: float) -> float:
+    """cos * |cos| of a cone's half angle IN DEGREES, for `MutableVector.in_cone`.
+
+    Cones of 180 degrees or more hold everything, given as -inf so rounding
+    can never leave anything out. Negative angles hold nothing (+inf).
+    """
+    if max_angle_degrees >= 180.0:
+        return -math.inf
+    if max_angle_degrees < 0.0:
+        return math.inf
+    cosine = math.cos(math.radians(max_angle_degrees))
+    return cosine * abs(cosine)
+
+
+def in_cone_array(direction, offset, limit):
+    """`MutableVector.in_cone` for NumPy arrays of vectors with shape (3, n),
+    or a single direction of shape (3,) against many offsets. `limit` is a
+    `cone_limit` or an array of them.
+    """
+    dd = direction[0] * direction[0] + direction[1] * direction[1] + direction[2] * direction[2]
+    oo = offset[0] * offset[0] + offset[1] * offset[1] + offset[2] * offset[2]
+    dot = direction[0] * offset[0] + direction[1] * offset[1] + direction[2] * offset[2]
+    product = dd * oo
+    return (product >= epsilon * epsilon) & (dot * abs(dot) >= limit * product)
+
+
+def turn_limit(max_turn_degrees: float) -> tuple[float, float]:
+    """The (cos, sin) of a max turn IN DEGREES, for `turn_with_rate_limit`.
+
+    Any turn of 180 degrees or more is unlimited, given as (-inf, 0.0) so
+    rounding can never make a turn look too big.
+    """
+    if max_turn_degrees >= 180.0:
+        return (-math.inf, 0.0)
+    radians = math.radians(max_turn_degrees)
+    return (math.cos(radians), math.sin(radians))
+
+
+def turn_with_rate_limit(
+    direction: Union[Vector, MutableVector],
+    desired: Union[Vector, MutableVector],
+    max_turn_cos: float,
+    max_turn_sin: float,
+) -> Vector:
+    """Turn `direction` towards `desired` by at most the angle whose cos and sin
+    are given (see `turn_limit`). Within that angle, the result is `desired`
+    normalized.
+
+    Same as `angle_degrees` followed by `normalized` or `rotate_towards`,
+    within `epsilon`, but in one pass: cosines are compared instead of angles,
+    so there's no acos, no degree conversion and no cross products.
+    """
+    turned = MutableVector(direction.x, direction.y, direction.z)
+    turned.turn_with_rate_limit(desired, max_turn_cos, max_turn_sin)
+    return turned.snapshot()
+
+
+def turn_with_rate_limit_array(direction, desired, max_turn_cos, max_turn_sin):
+    """`turn_with_rate_limit` for NumPy arrays of vectors with shape (3, n),
+    and cos/sin arrays of shape (n,). Same operations in the same order as the
+    scalar version. NaN where the scalar version would raise.
+    """
+    import numpy as np
+
+    dd = direction[0] * direction[0] + direction[1] * direction[1] + direction[2] * direction[2]
+    ww = desired[0] * desired[0] + desired[1] * desired[1] + desired[2] * desired[2]
+    dw = direction[0] * desired[0] + direction[1] * desired[1] + direction[2] * desired[2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denominator = np.sqrt(dd * ww)
+        snap = dw >= max_turn_cos * denominator
+        snapped = desired * (1.0 / np.sqrt(ww))
+        axis = desired * dd - direction * dw
+        scale = max_turn_sin / np.sqrt(axis[0] * axis[0] + axis[1] * axis[1] + axis[2] * axis[2])
+        rotated = direction * max_turn_cos + axis * scale
+        turned = np.where(snap, snapped, rotated)
+    turned[:, denominator < epsilon] = np.nan
+    return turned
+
+
+def random_directions_array(count: int, generator=None):
+    """`count` random normalized vectors as a NumPy array of shape (3, count),
+    from a `numpy.random.Generator` like `rng.philox()`. Much faster than
+    `Vector.random_directions` for large counts, but a different stream."""
+    import numpy as np
+
+    if generator is None:
+        generator = np.random.default_rng()
+    directions = generator.standard_normal((3, count))
+    directions /= np.sqrt(directions[0] * directions[0] + directions[1] * directions[1] + directions[2] * directions[2])
+    return directions
+
+
+if __name__ == "__main__":
+    vec1 = Vector(1,2,2)
+    vec2 = Vector(3,4,0)
+
+    print(f"{vec1 = }  {vec2 = }")
+    print(f"{vec1.magnitude() = }  {vec2.magnitude() = }")
+    print(f"{vec1.distance(vec2) = }  {vec2.distance(vec1) = }")
+    print(f"{vec1 + vec2 = }")
+    print(f"{vec2 + vec1 = }")
+    print(f"{vec1 - vec2 = }")
+    print(f"{vec2 - vec1 = }")
+    print(f"{vec1 * 3.0 = }")
+    print(f"{3.0 * vec1 = }")
+    print(f"{vec1 / 3.0 = }")
+    print(f"{vec1.normalized = }  {vec2.normalized = }")
+    print(f"{vec1.dot(vec2) = }  {vec2.dot(vec1) = }")
+    print(f"{tuple(vec1) = }  {tuple(vec1)}")
+    print(f"{vec2[0] = }  {vec2[1] = }  {vec2[2] = }")
+    print(f"{vec2[0:2] = }  {vec2[-2:] = }  {vec2[:] = }")
+    print(f"{vec2 == vec1 = }  {vec2 == vec2 = }  {vec1 == vec1 = }")
+    print(f"{vec1.cross(vec2) = }  {vec2.cross(vec1) = }")
+    print(f"{vec1.cross(vec2) == -vec2.cross(vec1) = }")
+    print(f"{vec1.angle(vec2) = }  {vec2.angle(vec1) = }")
+    print(f"{vec1.angle_degrees(vec2) = }  {vec2.angle_degrees(vec1) = }")
+    print(f"{vec1.angle_degrees(vec1) = }  {vec1.angle_degrees(-vec1) = }")
+    for _ in range(10):
+        print(f"{Vector.random_direction() = }")
+    print(f"{Vector.zero = }")
+    print(f"{Vector.plus_x = }")
+    
+    print(f"==============")
+    vec1 = Vector(10,0,0)
+    vec2 = Vector(0,1,0)
+    print(f"{vec1.rotate_towards(vec2, math.radians(30)) = }")
+    print(f"{vec1.rotate_towards_degrees(vec2, 30) = }")
+
+    for angle in range(0, 375, 15):
+        print(f"{angle}: {vec1.rotate_towards_degrees(vec2, angle)}")
+
+    print(f"==============")
+    print(f"{cache_info() = }")
+    print(f"==============")
+    mutable = MutableVector(10, 0, 0)
+    mutable.rotate_towards(Vector(0, 1, 0), math.radians(30))
+    print(f"{mutable = }  {mutable.snapshot() == vec1.rotate_towards_degrees(vec2, 30) = }")
+    print(f"{turn_with_rate_limit(vec1, vec2, *turn_limit(30)) == vec1.rotate_towards_degrees(vec2, 30) = }")
@@ -0,0 +1,72 @@
+from spaceship_sim import strategies
+from spaceship_sim.recorder import TraceRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def far_apart_duel(index: int, adaptive: bool, ship_class: type = Spaceship) -> Simulation:
+    # Far enough apart that most ticks are quiet and get coasted through
+    rng = stream(40351, index, "adaptive")
+    return Simulation(
+        ship_class(position=Vector.random_direction(rng) * 1500.0, direction=Vector.random_direction(rng)),
+        ship_class(position=Vector.random_direction(rng) * 1500.0, direction=Vector.random_direction(rng)),
+        ticks=10_000,
+        recorder=TraceRecorder(),
+        adaptive=adaptive,
+        rng=rng,
+    )
+
+
+def test_adaptive_is_tick_for_tick_identical():
+    for index in range(40):
+        full = far_apart_duel(index, adaptive=False)
+        adaptive = far_apart_duel(index, adaptive=True)
+        full.run()
+        adaptive.run()
+        assert adaptive.result == full.result
+        assert adaptive.tick_count == full.tick_count
+        assert tuple(adaptive.ship1.position) == tuple(full.ship1.position)
+        assert tuple(adaptive.ship2.position) == tuple(full.ship2.position)
+        # Coasted ticks are recorded by `Simulation._coast`, not `step()`
+        assert list(adaptive.recorder.rows()) == list(full.recorder.rows())
+
+
+class CountingShip(Spaceship):
+    moves = 0
+
+    def move(self, *args, **kwargs) -> None:
+        CountingShip.moves += 1
+        super().move(*args, **kwargs)
+
+
+def test_adaptive_steps_ships_that_override_move():
+    CountingShip.moves = 0
+    sim = far_apart_duel(0, adaptive=True, ship_class=CountingShip)
+    sim.run()
+    assert CountingShip.moves == 2 * (sim.tick_count - 1)
+
+
+def test_adaptive_steps_a_replaced_chase_distance_strategy():
+    calls = []
+
+    def counting_chase(ship, enemy_position, enemy_direction) -> None:
+        calls.append(ship)
+        strategies.chase(ship, enemy_position, enemy_direction)
+
+    builtin = strategies.IMPLEMENTATIONS[strategies.CHASE_DISTANCE]
+    strategies.IMPLEMENTATIONS[strategies.CHASE_DISTANCE] = counting_chase
+    try:
+        sim = far_apart_duel(0, adaptive=True)
+        sim.run()
+    finally:
+        strategies.IMPLEMENTATIONS[strategies.CHASE_DISTANCE] = builtin
+    full = far_apart_duel(0, adaptive=False)
+    full.run()
+    assert (sim.result, sim.tick_count) == (full.result, full.tick_count)
+    chasing = sum(
+        (row.ship1_strategy == "chase-distance") + (row.ship2_strategy == "chase-distance")
+        for row in list(full.recorder.rows())[1:]
+    )
+    assert len(calls) == chasing > 0
@@ -0,0 +1,42 @@
+from spaceship_sim.batch import BatchSimulation
+from spaceship_sim.recorder import OutcomeRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def random_pair(index: int) -> tuple[Spaceship, Spaceship]:
+    position1, direction1, position2, direction2 = Vector.random_directions(4, stream(40351, index))
+    turns = stream(40351, index, "turns")
+    return (
+        Spaceship(position=position1 * 300.0, direction=direction1, rng=turns),
+        Spaceship(position=position2 * 300.0, direction=direction2, rng=turns),
+    )
+
+
+def test_batch_matches_per_duel_simulations():
+    pairs = [random_pair(index) for index in range(40)]
+    batch = BatchSimulation([pair[0] for pair in pairs], [pair[1] for pair in pairs], ticks=3000)
+    batch.run()
+    assert batch.finished
+
+    for index in range(40):
+        sim = Simulation(*random_pair(index), ticks=3000, recorder=OutcomeRecorder(), rng=stream(40351, index, "turns"))
+        sim.run()
+        assert (batch.results()[index], batch.ticks[index]) == (sim.result, sim.tick_count)
+    assert set(batch.results()) >= {"SHIP_1_WINS", "SHIP_2_WINS"}
+
+
+def test_batch_steps_like_run():
+    pairs = [random_pair(index) for index in range(10)]
+    stepped = BatchSimulation([pair[0] for pair in pairs], [pair[1] for pair in pairs], ticks=3000)
+    while not stepped.finished:
+        stepped.step()
+    pairs = [random_pair(index) for index in range(10)]
+    chunked = BatchSimulation([pair[0] for pair in pairs], [pair[1] for pair in pairs], ticks=3000)
+    while not chunked.finished:
+        chunked.run(max_ticks=100)
+    assert stepped.results() == chunked.results()
+    assert list(stepped.ticks) == list(chunked.ticks)
+    assert stepped.tick_count == chunked.tick_count
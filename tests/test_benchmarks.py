@@ -0,0 +1,23 @@
+import json
+
+from benchmarks import Measurement, compare, missing
+
+
+def write_baseline(path, values):
+    path.write_text(json.dumps({"benchmarks": {name: {"value": value} for name, value in values.items()}}), encoding="utf8")
+
+
+def test_compare_flags_slowdowns_beyond_the_tolerance(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    write_baseline(baseline, {"fast": 1.0, "slow": 1.0})
+    measurements = [Measurement("fast", 1.1, "us"), Measurement("slow", 1.5, "us")]
+    regressions = compare(measurements, baseline, tolerance=0.2)
+    assert len(regressions) == 1 and regressions[0].startswith("slow:")
+
+
+def test_compare_flags_benchmarks_missing_from_either_side(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    write_baseline(baseline, {"kept": 1.0, "dropped": 1.0})
+    measurements = [Measurement("kept", 1.0, "us"), Measurement("added", 1.0, "us")]
+    assert sorted(problem.split(":")[0] for problem in missing(measurements, baseline)) == ["added", "dropped"]
+    assert compare(measurements, baseline, tolerance=0.2) == []
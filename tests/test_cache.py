@@ -0,0 +1,55 @@
+from spaceship_sim import cache
+from spaceship_sim.cache import ResultCache, duel_key
+
+
+def test_get_and_put(tmp_path):
+    with ResultCache(tmp_path / "results.sqlite") as results:
+        assert results.get("missing") is None
+        results.put("key", {"result": "SHIP_1_WINS", "ticks": 12})
+        assert results.get("key") == {"result": "SHIP_1_WINS", "ticks": 12}
+        assert (results.hits, results.misses, len(results)) == (1, 1, 1)
+
+    with ResultCache(tmp_path / "results.sqlite") as reopened:
+        assert reopened.get("key") == {"result": "SHIP_1_WINS", "ticks": 12}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    with ResultCache(tmp_path / "results.sqlite", max_entries=10) as results:
+        for number in range(10):
+            results.put(f"key{number}", number)
+        assert results.get("key0") == 0
+        results.put("key10", 10)
+        # Evicts down to 9 entries, oldest first
+        assert len(results) == 9
+        assert results.get("key1") is None and results.get("key2") is None
+        assert results.get("key0") == 0 and results.get("key10") == 10
+
+    with ResultCache(tmp_path / "results.sqlite", max_entries=5) as smaller:
+        assert smaller.evict() == 4
+        assert len(smaller) == 5
+
+
+def test_byte_limit(tmp_path):
+    with ResultCache(tmp_path / "results.sqlite", max_bytes=100) as results:
+        for number in range(50):
+            results.put(f"key{number}", "x" * 8)
+            assert results.size_bytes <= 100
+        assert results.get("key49") == "x" * 8
+
+
+def test_strategy_version_bump_purges_old_entries(tmp_path, monkeypatch):
+    settings = {"ship1": {"speed": 1.0}, "ship2": {"speed": 1.0}}
+    with ResultCache(tmp_path / "results.sqlite") as results:
+        old_key = duel_key(settings, seed=1, ticks=100)
+        results.put(old_key, "SHIP_1_WINS")
+        results.put(duel_key(settings, seed=2, ticks=100), "SHIP_2_WINS")
+
+        monkeypatch.setattr(cache, "STRATEGY_VERSION", "bumped")
+        new_key = duel_key(settings, seed=1, ticks=100)
+        assert new_key != old_key
+        assert results.get(new_key) is None
+        results.put(new_key, "BOTH_DESTROYED")
+
+        assert results.purge_stale() == 2
+        assert len(results) == 1
+        assert results.get(new_key) == "BOTH_DESTROYED"
@@ -0,0 +1,76 @@
+import csv
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).parents[1]
+
+
+def spaceship_sim(*args: str) -> subprocess.CompletedProcess:
+    """Run the CLI in a fresh interpreter, as the `spaceship-sim` script does"""
+    return subprocess.run(
+        [sys.executable, "-m", "spaceship_sim.cli", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_run(tmp_path):
+    done = spaceship_sim("run", "--seed", "7", "--index", "3", "--ticks", "2000", "--csv", str(tmp_path / "duel.csv"))
+    assert done.returncode == 0, done.stderr
+    result, _, ticks = done.stdout.split()[:3]
+    with open(tmp_path / "duel.csv", encoding="utf8", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0][:2] == ["index", "result"]
+    assert len(rows) - 1 == int(ticks)
+    assert rows[-1][1] == result
+
+
+def test_sweep():
+    from spaceship_sim.sweep import run_sweep
+
+    done = spaceship_sim("sweep", "6", "--workers", "1", "--ticks", "2000", "--max-distance", "300")
+    assert done.returncode == 0, done.stderr
+    expected = run_sweep(6, 40351, workers=1, ticks=2000, max_distance=300.0, keep_duels=False)
+    assert done.stdout.strip() == expected.summary().strip()
+
+
+def test_export(tmp_path):
+    from spaceship_sim.deltastream import DeltaStreamReader
+    from spaceship_sim.trajectory import TrajectoryReader
+
+    for name, reader in (("duels.dlt", DeltaStreamReader), ("duels.bin", TrajectoryReader)):
+        done = spaceship_sim("export", str(tmp_path / name), "--count", "3", "--ticks", "2000")
+        assert done.returncode == 0, done.stderr
+        assert len(reader(tmp_path / name)) == 3
+
+    done = spaceship_sim("export", str(tmp_path / "duel.csv"), "--ticks", "2000")
+    assert done.returncode == 0, done.stderr
+    assert (tmp_path / "duel.csv").exists()
+
+    assert spaceship_sim("export", str(tmp_path / "duels.csv"), "--count", "2").returncode == 2
+    assert spaceship_sim("export", str(tmp_path / "duels.txt")).returncode == 2
+    assert spaceship_sim("unknown").returncode == 2
+
+
+def test_plot(tmp_path):
+    pytest.importorskip("matplotlib")
+    done = spaceship_sim("plot", "--ticks", "2000", "--output", str(tmp_path / "duel.png"))
+    assert done.returncode == 0, done.stderr
+    assert (tmp_path / "duel.png").stat().st_size > 0
+
+
+def test_run_leaves_out_heavy_imports():
+    code = (
+        "import sys\n"
+        "from spaceship_sim import cli\n"
+        "assert cli.main(['run', '--ticks', '1000']) == 0\n"
+        "print(sorted({'numpy', 'matplotlib', 'sqlite3', 'concurrent.futures', 'multiprocessing'} & set(sys.modules)))\n"
+    )
+    done = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.splitlines()[-1] == "[]"
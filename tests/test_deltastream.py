@@ -0,0 +1,79 @@
+import numpy as np
+
+from spaceship_sim.deltastream import DeltaStreamReader, DeltaStreamWriter, from_trajectory
+from spaceship_sim.recorder import ROW_WIDTH, TraceRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.trajectory import TrajectoryWriter
+from spaceship_sim.vector import Vector
+
+
+def recorded_duel(index: int, every: int = 1) -> Simulation:
+    rng = stream(40351, index)
+    sim = Simulation(
+        Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+        Spaceship(position=Vector.random_direction(rng) * 1000.0, direction=Vector.random_direction(rng)),
+        ticks=10_000,
+        recorder=TraceRecorder(every=every),
+        rng=rng,
+    )
+    sim.run()
+    return sim
+
+
+def recorded_rows(sim: Simulation) -> np.ndarray:
+    return np.frombuffer(sim.recorder.buffer, dtype=np.float64)[:len(sim.recorder) * ROW_WIDTH].reshape(-1, ROW_WIDTH)
+
+
+def assert_rows_match(decoded: np.ndarray, expected: np.ndarray) -> None:
+    # Index, result and strategy codes are exact, positions and directions within half a quantum
+    assert np.array_equal(decoded[:, :4], expected[:, :4])
+    assert np.abs(decoded[:, 4:10] - expected[:, 4:10]).max() <= 0.5e-3 + 1e-9
+    assert np.abs(decoded[:, 10:16] - expected[:, 10:16]).max() <= 0.5e-6 + 1e-12
+    assert np.allclose(decoded[:, 16], expected[:, 16], atol=2e-3)
+
+
+def test_round_trip_to_per_tick_rows(tmp_path):
+    sims = [recorded_duel(index) for index in range(3)] + [recorded_duel(3, every=7)]
+    path = tmp_path / "duels.dlt"
+    with DeltaStreamWriter(path, block_rows=100) as writer:
+        for sim in sims:
+            writer.add(sim)
+
+    with DeltaStreamReader(path) as reader:
+        assert len(reader) == len(sims)
+        for number, sim in enumerate(sims):
+            duel = reader[number]
+            assert (duel.result, duel.ticks) == (sim.result, sim.tick_count)
+            assert_rows_match(duel.rows, recorded_rows(sim))
+            assert duel.row(len(duel) - 1).result == sim.result
+
+
+def test_tick_range_from_the_middle_of_a_stream(tmp_path):
+    sim = recorded_duel(0, every=3)
+    path = tmp_path / "duels.dlt"
+    with DeltaStreamWriter(path, block_rows=64) as writer:
+        writer.add(sim)
+
+    expected = recorded_rows(sim)
+    middle = sim.tick_count // 2
+    with DeltaStreamReader(path) as reader:
+        # Starts and ends inside blocks, and between recorded ticks
+        for start, stop in ((middle, middle + 500), (middle + 1, middle + 2), (190, 193), (0, 1)):
+            part = reader.ticks(0, start, stop)
+            wanted = (expected[:, 0] >= start) & (expected[:, 0] < stop)
+            assert len(part) == wanted.sum()
+            assert_rows_match(part.rows, expected[wanted])
+
+
+def test_from_trajectory_matches_writing_directly(tmp_path):
+    sims = [recorded_duel(index) for index in range(2)]
+    with TrajectoryWriter(tmp_path / "duels.bin") as writer:
+        for sim in sims:
+            writer.add(sim)
+    from_trajectory(tmp_path / "duels.bin", tmp_path / "converted.dlt")
+    with DeltaStreamWriter(tmp_path / "direct.dlt") as writer:
+        for sim in sims:
+            writer.add(sim)
+    assert (tmp_path / "converted.dlt").read_bytes() == (tmp_path / "direct.dlt").read_bytes()
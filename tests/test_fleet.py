@@ -0,0 +1,61 @@
+import numpy as np
+
+from spaceship_sim.fleet import FleetSimulation, SpatialGrid, nearest
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def brute_nearest(points, targets):
+    offset = targets[:, None, :] - points[:, :, None]
+    return np.argmin(offset[0] * offset[0] + offset[1] * offset[1] + offset[2] * offset[2], axis=1)
+
+
+def test_grid_pairs_include_every_pair_within_a_cell():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-100, 100, (3, 300))
+    queries = rng.uniform(-120, 120, (3, 200))
+    query, found = SpatialGrid(points, 15.0).pairs(queries)
+    offset = points[:, None, :] - queries[:, :, None]
+    close = set(zip(*np.nonzero(np.sqrt((offset ** 2).sum(axis=0)) <= 15.0)))
+    assert close <= set(zip(query.tolist(), found.tolist()))
+    assert len(set(zip(query.tolist(), found.tolist()))) == len(query)
+
+
+def test_nearest_matches_comparing_every_pair():
+    rng = np.random.default_rng(1)
+    for spread in (10.0, 1_000.0):
+        points = rng.normal(0.0, spread, (3, 500))
+        targets = rng.normal(spread, spread, (3, 400))
+        expected = brute_nearest(points, targets)
+        assert (nearest(points, targets, 1.0) == expected).all()
+        hint = rng.integers(-1, 400, 500)
+        assert (nearest(points, targets, 1.0, hint) == expected).all()
+
+
+def test_nearest_with_no_targets():
+    assert (nearest(np.zeros((3, 4)), np.zeros((3, 0)), 1.0) == -1).all()
+
+
+def test_ships_facing_each_other_in_range_destroy_each_other():
+    ship1 = Spaceship(position=Vector(0, 0, 0), direction=Vector(1, 0, 0))
+    ship2 = Spaceship(position=Vector(10, 0, 0), direction=Vector(-1, 0, 0))
+    battle = FleetSimulation([ship1], [ship2], ticks=10)
+    assert battle.run() == "BOTH_DESTROYED"
+    assert battle.tick_count == 1
+    assert [index for index, _ in battle.destroyed] == [0, 0]
+    # Cells smaller than the weapon range are searched further out
+    assert FleetSimulation([ship1], [ship2], ticks=10, cell_size=3.0).run() == "BOTH_DESTROYED"
+
+
+def test_spaceships_are_copied_and_left_as_they_were():
+    rng = np.random.default_rng(2)
+    fleets = [
+        [Spaceship(position=Vector(*rng.normal(center, 50.0, 3)), direction=Vector(*rng.normal(0.0, 1.0, 3))) for _ in range(30)]
+        for center in (-100.0, 100.0)
+    ]
+    before = [ship.position for ship in fleets[0] + fleets[1]]
+    battle = FleetSimulation(fleets[0], fleets[1], ticks=500)
+    battle.run()
+    assert battle.result != "ONGOING"
+    assert [ship.position for ship in fleets[0] + fleets[1]] == before
+    assert len(battle.destroyed) + len(battle.fleet1) + len(battle.fleet2) == 60
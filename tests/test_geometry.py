@@ -0,0 +1,67 @@
+from spaceship_sim.recorder import TraceRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def random_duel(index: int, cached: bool) -> Simulation:
+    rng = stream(40351, index, "geometry")
+    sim = Simulation(
+        Spaceship(position=Vector.random_direction(rng) * 300.0, direction=Vector.random_direction(rng)),
+        Spaceship(position=Vector.random_direction(rng) * 300.0, direction=Vector.random_direction(rng)),
+        ticks=3000,
+        recorder=TraceRecorder(),
+        rng=rng,
+    )
+    if not cached:
+        # Setting `enemy` detaches the shared geometry, so both ships compute everything themselves
+        sim.ship1.enemy = sim.ship2
+        sim.ship2.enemy = sim.ship1
+        assert sim.ship1._geometry is None and sim.ship2._geometry is None
+    return sim
+
+
+def outcome(sim: Simulation) -> tuple:
+    return sim.result, sim.tick_count, tuple(sim.ship1.position), tuple(sim.ship2.position), list(sim.recorder.rows())
+
+
+def test_cached_geometry_duel_equals_uncached():
+    for index in range(10):
+        cached = random_duel(index, cached=True)
+        uncached = random_duel(index, cached=False)
+        cached.run()
+        uncached.run()
+        assert outcome(cached) == outcome(uncached)
+
+
+def filled_cache(sim: Simulation) -> None:
+    sim.ship1.distance_to_enemy()
+    sim.ship1.angle_to_enemy_degree()
+    sim.ship2.angle_to_enemy_degree()
+
+
+def geometry(sim: Simulation) -> tuple:
+    return sim.ship1.distance_to_enemy(), sim.ship1.angle_to_enemy_degree(), sim.ship2.angle_to_enemy_degree()
+
+
+def test_setting_position_or_direction_invalidates_the_cache():
+    for index in range(10):
+        cached = random_duel(index, cached=True)
+        uncached = random_duel(index, cached=False)
+        for sim in (cached, uncached):
+            sim.run(max_ticks=50)
+        # Moved and turned from outside the tick loop, one change at a time
+        for change in (
+            lambda sim: setattr(sim.ship1, "position", sim.ship1.position + Vector(25.0, -10.0, 5.0)),
+            lambda sim: setattr(sim.ship2, "position", Vector(0.0, 0.0, 0.0)),
+            lambda sim: setattr(sim.ship1, "direction", Vector(1.0, 0.0, 0.0)),
+            lambda sim: setattr(sim.ship2, "direction", Vector(0.0, 0.0, 1.0)),
+        ):
+            for sim in (cached, uncached):
+                filled_cache(sim)
+                change(sim)
+            assert geometry(cached) == geometry(uncached)
+        cached.run()
+        uncached.run()
+        assert outcome(cached) == outcome(uncached)
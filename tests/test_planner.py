@@ -0,0 +1,53 @@
+import dataclasses
+
+import pytest
+
+from spaceship_sim import planner
+from spaceship_sim.planner import ParameterRange, SweepPlan, run_plan
+
+
+PLAN = SweepPlan(
+    ranges=[ParameterRange("ship1.speed", 0.5, 2.0), ParameterRange("ship2.weapon_range", 20.0, 80.0)],
+    design="lhs",
+    count=4,
+    duels_per_point=3,
+    max_distance=300.0,
+    ticks=3000,
+)
+
+
+def test_interrupted_plan_resumes_to_the_same_result(tmp_path, monkeypatch):
+    run_chunk = planner._run_plan_chunk
+    started = []
+
+    def interrupted_after_two_chunks(plan_dict, start, stop, cache_path=None):
+        if len(started) == 2:
+            raise KeyboardInterrupt
+        started.append(start)
+        return run_chunk(plan_dict, start, stop, cache_path)
+
+    monkeypatch.setattr(planner, "_run_plan_chunk", interrupted_after_two_chunks)
+    with pytest.raises(KeyboardInterrupt):
+        run_plan(PLAN, checkpoint_dir=tmp_path, workers=1, chunk_size=4)
+    assert len(list(tmp_path.glob("chunk-*.json"))) == 2
+
+    resumed_starts = []
+
+    def recorded(plan_dict, start, stop, cache_path=None):
+        resumed_starts.append(start)
+        return run_chunk(plan_dict, start, stop, cache_path)
+
+    monkeypatch.setattr(planner, "_run_plan_chunk", recorded)
+    resumed = run_plan(PLAN, checkpoint_dir=tmp_path, workers=1)
+    assert sorted(resumed_starts) == [8]
+
+    uninterrupted = run_plan(PLAN, workers=1, chunk_size=5)
+    assert resumed.duels == uninterrupted.duels
+    assert resumed.result_counters() == uninterrupted.result_counters()
+    assert len(resumed.duels) == 12
+
+
+def test_checkpoints_of_a_different_plan_are_refused(tmp_path):
+    run_plan(PLAN, checkpoint_dir=tmp_path, workers=1, chunk_size=4)
+    with pytest.raises(ValueError):
+        run_plan(dataclasses.replace(PLAN, ticks=2000), checkpoint_dir=tmp_path, workers=1)
@@ -0,0 +1,23 @@
+from spaceship_sim.recorder import MAX_PREALLOCATED_ROWS, ROW_WIDTH, TraceRecorder
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def test_huge_tick_limit_preallocates_a_bounded_buffer():
+    recorder = TraceRecorder()
+    recorder.start(10**10)
+    assert len(recorder.buffer) == ROW_WIDTH * MAX_PREALLOCATED_ROWS
+
+
+def test_buffer_grows_past_the_preallocated_rows():
+    ship1 = Spaceship(position=Vector(0, 0, 0), direction=Vector(1, 0, 0))
+    ship2 = Spaceship(position=Vector(100, 0, 0), direction=Vector(-1, 0, 0))
+    Simulation(ship1, ship2)
+    recorder = TraceRecorder()
+    recorder.start(10**10)
+    for index in range(3 * MAX_PREALLOCATED_ROWS):
+        recorder.record(index, "ONGOING", ship1, ship2)
+    recorder.finish()
+    assert len(recorder) == 3 * MAX_PREALLOCATED_ROWS
+    assert recorder.row(len(recorder) - 1).index == 3 * MAX_PREALLOCATED_ROWS - 1
@@ -0,0 +1,50 @@
+import random
+
+from spaceship_sim.fleet import FleetSimulation
+from spaceship_sim.recorder import OutcomeRecorder
+from spaceship_sim.registry import ShipRegistry
+from spaceship_sim.rng import derive_seed
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def random_ships(seed: int, index: int, count: int = 2, max_distance: float = 300.0) -> list[Spaceship]:
+    rng = random.Random(derive_seed(seed, index))
+    return [
+        Spaceship(position=Vector.random_direction(rng) * max_distance, direction=Vector.random_direction(rng))
+        for _ in range(count)
+    ]
+
+
+def test_views_fight_a_duel_like_spaceships():
+    for index in range(10):
+        ship1, ship2 = random_ships(40351, index)
+        registry = ShipRegistry.from_ships([ship1, ship2])
+        ships = Simulation(ship1, ship2, ticks=3000, recorder=OutcomeRecorder(), rng=random.Random(index))
+        views = Simulation(registry[0], registry[1], ticks=3000, recorder=OutcomeRecorder(), rng=random.Random(index))
+        ships.run()
+        views.run()
+        assert (views.result, views.tick_count) == (ships.result, ships.tick_count)
+        assert views.result != "ONGOING"
+
+
+def test_registry_from_views():
+    registry = ShipRegistry.from_ships(random_ships(1, 0))
+    copy = ShipRegistry.from_ships(list(registry))
+    assert [view.position for view in copy] == [view.position for view in registry]
+    assert [view.weapon_range for view in copy] == [view.weapon_range for view in registry]
+
+
+def test_fleet_battle_between_views():
+    registry = ShipRegistry.from_ships(random_ships(2, 0, count=40, max_distance=100.0))
+    battle = FleetSimulation(list(registry)[:20], list(registry)[20:], ticks=2000)
+    while not battle.finished:
+        battle.step()
+        if battle.result == "ONGOING":
+            assert all(ship.enemy in battle.fleet2 for ship in battle.fleet1)
+            assert all(ship.enemy in battle.fleet1 for ship in battle.fleet2)
+    assert battle.result != "ONGOING"
+    destroyed = [ship for _, ship in battle.destroyed]
+    assert len(destroyed) == len(set(destroyed))
+    assert len(destroyed) + len(battle.fleet1) + len(battle.fleet2) == 40
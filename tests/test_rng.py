@@ -0,0 +1,25 @@
+from spaceship_sim.rng import derive_seed, stream
+from spaceship_sim.sweep import run_sweep
+
+
+def test_derived_seeds_do_not_collide_across_key_boundaries():
+    assert derive_seed(1, "a:b") != derive_seed(1, "a", "b")
+    assert derive_seed(1, "a", "b:c") != derive_seed(1, "a:b", "c")
+    assert derive_seed(1, 2) != derive_seed(1, "2")
+    assert derive_seed(12, 3) != derive_seed(1, 23)
+    assert derive_seed(1, 2, 3) == derive_seed(1, 2, 3)
+
+
+def test_streams_are_independent_of_creation_order():
+    later = stream(40351, 7).random()
+    for index in range(7):
+        stream(40351, index).random()
+    assert stream(40351, 7).random() == later
+
+
+def test_sweep_is_the_same_for_any_worker_count():
+    serial = run_sweep(24, 40351, workers=1, max_distance=300.0, ticks=3000)
+    for workers, chunk_size in ((2, None), (3, 5)):
+        parallel = run_sweep(24, 40351, workers=workers, max_distance=300.0, ticks=3000, chunk_size=chunk_size)
+        assert parallel.duels == serial.duels
+        assert parallel.result_counter == serial.result_counter
@@ -0,0 +1,132 @@
+import asyncio
+import gc
+import weakref
+
+from spaceship_sim.server import Client, SimulationServer
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=30))
+
+
+def test_invalid_ship_parameters_are_rejected_and_the_server_keeps_going():
+    async def main():
+        server = SimulationServer()
+        host, port = await server.serve()
+        healthy = server.create_random_session(seed=1, ticks=200)
+        client = await Client.connect(host, port)
+        for parameters in (
+            {"ship1": {"speed": "2"}},
+            {"ship1": {"direction": [0, 0, 0]}},
+            {"ship1": {"position": [1, 2]}},
+            {"ship1": {"color": "red"}},
+            {"ship1": {"strategy": "evade"}},
+            {"ship1": {"weapon_range": float("nan")}},
+            {"ticks": 10 ** 12},
+            {"ticks": -1},
+            {"ticks": 100.0},
+            {"seed": -1},
+            {"seed": 2 ** 64},
+            {"seed": "1"},
+            {"max_distance": 1e12},
+            {"max_distance": -5.0},
+        ):
+            await client._send({"op": "create", "seed": 1, **parameters})
+            reply = await client.receive()
+            assert reply["type"] == "error", parameters
+        assert await client.create(seed=2, ship1={"speed": 2}) >= 0
+        await client.close()
+        while healthy.session_id in server.sessions:
+            await asyncio.sleep(0.01)
+        assert healthy.simulation.finished
+        await server.close()
+
+    run(main())
+
+
+def test_a_failing_session_is_closed_alone_with_an_error():
+    async def main():
+        server = SimulationServer()
+        server.start()
+        # A bad value that slipped past validation fails inside the scheduler
+        broken = server.create_session(Spaceship(position=Vector(1000.0, 0.0, 0.0)), Spaceship(), ticks=200)
+        broken.simulation.ship1.speed = "2"
+        healthy = server.create_random_session(seed=1, ticks=200)
+        messages = [message async for message in server.subscribe(broken.session_id)]
+        assert messages[-1]["type"] == "error"
+        while healthy.session_id in server.sessions:
+            await asyncio.sleep(0.01)
+        assert healthy.simulation.tick_count > 0
+        await server.close()
+
+    run(main())
+
+
+def test_subscribers_see_every_tick_before_finished():
+    async def main():
+        server = SimulationServer(ticks_per_slice=7)
+        session = server.create_random_session(seed=3, ticks=50)
+        subscriber = server.subscribe(session.session_id)
+        server.start()
+        ticks = []
+        async for message in subscriber:
+            if message["type"] == "ticks":
+                ticks += [delta["tick"] for delta in message["ticks"]]
+            last = message
+        assert last["type"] == "finished"
+        assert ticks == list(range(last["tick"]))
+        await server.close()
+
+    run(main())
+
+
+def test_subscribing_twice_replaces_the_first_subscription():
+    async def main():
+        server = SimulationServer()
+        host, port = await server.serve()
+        session = server.create_random_session(seed=4, ticks=10_000)
+        client = await Client.connect(host, port)
+        await client.subscribe(session.session_id)
+        await client.subscribe(session.session_id)
+        await asyncio.sleep(0.05)
+        assert len(session.subscribers) == 1
+        await client.close()
+        await server.close()
+
+    run(main())
+
+
+class RecordingServer(SimulationServer):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.subscribed = []
+
+    def subscribe(self, session_id, queue_size=None):
+        subscriber = super().subscribe(session_id, queue_size)
+        self.subscribed.append(weakref.ref(subscriber))
+        return subscriber
+
+
+def test_connections_forget_finished_sessions():
+    async def main():
+        server = RecordingServer(ticks_per_slice=1)
+        host, port = await server.serve()
+        client = await Client.connect(host, port)
+        for seed in range(10):
+            session_id = await client.create(seed=seed, ticks=500)
+            await client.subscribe(session_id)
+            async for message in client.messages():
+                assert message["type"] != "error"
+                if message["type"] == "finished":
+                    break
+        await asyncio.sleep(0.05)
+        gc.collect()
+        # The connection may still be holding on to the latest one, but no more
+        assert not server.sessions
+        assert len([subscriber for subscriber in server.subscribed if subscriber() is not None]) <= 1
+        await client.close()
+        await server.close()
+
+    run(main())
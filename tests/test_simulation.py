@@ -0,0 +1,62 @@
+from spaceship_sim.recorder import TraceRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def random_duel(index: int, ticks: int = 3000) -> Simulation:
+    rng = stream(40351, index)
+    return Simulation(
+        Spaceship(position=Vector.random_direction(rng) * 300.0, direction=Vector.random_direction(rng)),
+        Spaceship(position=Vector.random_direction(rng) * 300.0, direction=Vector.random_direction(rng)),
+        ticks=ticks,
+        recorder=TraceRecorder(),
+        rng=rng,
+    )
+
+
+def outcome(sim: Simulation) -> tuple:
+    return sim.result, sim.tick_count, tuple(sim.ship1.position), tuple(sim.ship2.position), list(sim.recorder.rows())
+
+
+def test_step_run_and_run_until_agree():
+    for index in range(10):
+        stepped = random_duel(index)
+        while not stepped.finished:
+            stepped.step()
+
+        ran = random_duel(index)
+        ran.run()
+
+        chunked = random_duel(index)
+        while not chunked.finished:
+            chunked.run(max_ticks=7)
+
+        until = random_duel(index)
+        until.run_until(lambda sim: sim.tick_count == 50)
+        assert until.finished or until.tick_count == 50
+        until.run_until(lambda sim: False)
+
+        assert outcome(stepped)[0] != "ONGOING"
+        assert outcome(ran) == outcome(stepped)
+        assert outcome(chunked) == outcome(stepped)
+        assert outcome(until) == outcome(stepped)
+
+
+def test_nothing_runs_once_finished():
+    sim = random_duel(0)
+    sim.run()
+    assert sim.finished
+    finished = outcome(sim)
+    assert sim.step() == sim.result
+    assert sim.run() == sim.result
+    assert sim.run_until(lambda sim: False, max_ticks=10) == sim.result
+    assert list(sim.iter_ticks()) == []
+    assert outcome(sim) == finished
+
+
+def test_run_stops_at_the_tick_limit():
+    sim = random_duel(0, ticks=5)
+    sim.run()
+    assert (sim.result, sim.tick_count, len(sim.recorder)) == ("ONGOING", 5, 5)
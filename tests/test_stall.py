@@ -0,0 +1,54 @@
+from spaceship_sim.recorder import OutcomeRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.stall import StallDetector
+from spaceship_sim.vector import Vector
+
+
+def circling_duel(stall_detector):
+    rng = stream(99, 144)
+    ship1 = Spaceship(position=Vector.random_direction(rng) * 500, direction=Vector.random_direction(rng), weapon_range=5, weapon_angle_degrees=1)
+    ship2 = Spaceship(position=Vector.random_direction(rng) * 500, direction=Vector.random_direction(rng), weapon_range=5, weapon_angle_degrees=1)
+    return Simulation(ship1, ship2, ticks=10_000, recorder=OutcomeRecorder(), stall_detector=stall_detector, rng=rng)
+
+
+def test_default_detector_does_not_end_a_duel_that_resolves():
+    plain = circling_duel(None)
+    plain.run()
+    assert (plain.result, plain.tick_count) == ("SHIP_1_WINS", 7316)
+
+    detected = circling_duel(StallDetector())
+    detected.run()
+    assert (detected.result, detected.tick_count) == ("SHIP_1_WINS", 7316)
+
+
+def test_reversing_ships_are_not_out_of_reach():
+    ship1 = Spaceship(position=Vector(0, 0, 0), direction=Vector(-1, 0, 0), speed=-5.0, weapon_range=10.0)
+    ship2 = Spaceship(position=Vector(100, 0, 0), direction=Vector(1, 0, 0), speed=-5.0, weapon_range=10.0)
+    sim = Simulation(ship1, ship2, ticks=10)
+    assert not StallDetector().is_out_of_reach(sim)
+
+    sim = Simulation(ship1, ship2, ticks=4)
+    assert StallDetector().is_out_of_reach(sim)
+
+
+def test_gap_closed_exactly_at_the_limit_is_not_out_of_reach():
+    ship1 = Spaceship(position=Vector(0.1, 0, 0), direction=Vector(1, 0, 0), speed=0.1, weapon_range=0.3)
+    ship2 = Spaceship(position=Vector(1.0, 0, 0), direction=Vector(-1, 0, 0), speed=0.2, weapon_range=0.3)
+    sim = Simulation(ship1, ship2, ticks=2)
+    assert not StallDetector().is_out_of_reach(sim)
+
+
+def test_periodic_check_is_opt_in():
+    periodic = circling_duel(StallDetector(periodic=True))
+    periodic.run()
+    assert (periodic.result, periodic.tick_count) == ("STALEMATE", 504)
+
+
+def test_periodic_check_remembers_only_its_window():
+    detector = StallDetector(periodic=True, max_period=20)
+    sim = circling_duel(detector)
+    sim.run(max_ticks=3000)
+    assert len(detector._last_seen) <= len(detector._history) == 3 * 20
+    assert detector._checks > 3 * 20
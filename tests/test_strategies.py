@@ -0,0 +1,55 @@
+import pytest
+
+from spaceship_sim import strategies
+from spaceship_sim.recorder import TraceRecorder
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+def test_builtin_codes_round_trip():
+    assert strategies.BUILTIN == ("patrol", "chase-distance", "chase-angle", "evade")
+    for code, name in enumerate(strategies.BUILTIN):
+        assert strategies.code(name) == code
+        assert strategies.name(code) == name
+    with pytest.raises(ValueError):
+        strategies.code("no-such-strategy")
+    with pytest.raises(ValueError):
+        strategies.register("evade", strategies.evade)
+
+
+def test_registered_strategy_is_used_by_implement_strategy():
+    calls = []
+
+    def hold_course(ship, enemy_position, enemy_direction) -> None:
+        calls.append((ship, enemy_position, enemy_direction))
+
+    code = strategies.register("test-hold-course", hold_course)
+    assert code >= len(strategies.BUILTIN)
+    assert strategies.code("test-hold-course") == code
+    assert strategies.name(code) == "test-hold-course"
+    assert strategies.implementation(code) is hold_course
+
+    ship = Spaceship(position=Vector(0.0, 0.0, 0.0), direction=Vector(1.0, 0.0, 0.0))
+    ship.strategy = "test-hold-course"
+    assert ship.strategy_code == code
+    enemy_position = Vector(100.0, 0.0, 0.0)
+    enemy_direction = Vector(0.0, 1.0, 0.0)
+    ship.implement_strategy(enemy_position=enemy_position, enemy_direction=enemy_direction)
+    assert calls == [(ship, enemy_position, enemy_direction)]
+    assert ship.direction == Vector(1.0, 0.0, 0.0)
+
+    class HoldingShip(Spaceship):
+        def choose_strategy(self, enemy_position=None, enemy_direction=None) -> None:
+            self.strategy_code = code
+
+    sim = Simulation(
+        HoldingShip(position=Vector(0.0, 0.0, 0.0), direction=Vector(0.0, 0.0, 1.0)),
+        Spaceship(position=Vector(300.0, 0.0, 0.0), direction=Vector(0.0, 1.0, 0.0)),
+        ticks=50,
+        recorder=TraceRecorder(),
+    )
+    sim.run()
+    rows = list(sim.recorder.rows())
+    assert [row.ship1_strategy for row in rows[1:]] == ["test-hold-course"] * (len(rows) - 1)
+    assert sim.ship1.direction == Vector(0.0, 0.0, 1.0)
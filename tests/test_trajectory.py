@@ -0,0 +1,62 @@
+import numpy as np
+
+from spaceship_sim.recorder import TraceRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.trajectory import TrajectoryReader, TrajectoryWriter, to_csv
+from spaceship_sim.vector import Vector
+
+
+def random_duel(index: int) -> Simulation:
+    rng = stream(40351, index)
+    sim = Simulation(
+        Spaceship(position=Vector.random_direction(rng) * 300.0, direction=Vector.random_direction(rng)),
+        Spaceship(position=Vector.random_direction(rng) * 300.0, direction=Vector.random_direction(rng)),
+        ticks=2000,
+        recorder=TraceRecorder(),
+        rng=rng,
+    )
+    sim.run()
+    return sim
+
+
+def test_trajectory_round_trip(tmp_path):
+    sims = [random_duel(index) for index in range(5)]
+    path = tmp_path / "duels.bin"
+    with TrajectoryWriter(path) as writer:
+        for sim in sims:
+            writer.add(sim)
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == len(sims)
+    assert isinstance(reader.records, np.memmap)
+    for sim, duel in zip(sims, reader):
+        assert (duel.result, duel.ticks, len(duel)) == (sim.result, sim.tick_count, sim.tick_count)
+        assert [duel.row(number) for number in range(len(duel))] == list(sim.recorder.rows())
+        assert list(duel.distance) == [row.ship_distance for row in sim.recorder.rows()]
+
+
+def test_float32_trajectory_round_trip(tmp_path):
+    sim = random_duel(0)
+    path = tmp_path / "duels.bin"
+    with TrajectoryWriter(path, dtype="float32") as writer:
+        writer.add(sim)
+
+    duel = TrajectoryReader(path)[0]
+    expected = [row.ship1_position_x for row in sim.recorder.rows()]
+    assert duel.ship1_position.dtype == np.float32
+    assert np.allclose(duel.ship1_position[:, 0], expected, rtol=1e-6)
+
+
+def test_csv_export_matches_simulation_to_csv(tmp_path):
+    sims = [random_duel(index) for index in range(3)]
+    path = tmp_path / "duels.bin"
+    with TrajectoryWriter(path) as writer:
+        for sim in sims:
+            writer.add(sim)
+
+    for number, sim in enumerate(sims):
+        sim.to_csv(tmp_path / "simulation.csv")
+        to_csv(path, tmp_path / "trajectory.csv", duel=number)
+        assert (tmp_path / "trajectory.csv").read_bytes() == (tmp_path / "simulation.csv").read_bytes()
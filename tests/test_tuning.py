@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from spaceship_sim.spaceship import StrategyParameters
+from spaceship_sim.tuning import DuelBank, score
+
+
+def test_empty_bank_is_refused():
+    with pytest.raises(ValueError):
+        score([StrategyParameters()], DuelBank(count=0), workers=1)
+
+
+def test_score_is_the_same_in_parallel():
+    candidates = [StrategyParameters(), StrategyParameters(chase_angle_degrees=120.0, evade_retreat=0.3)]
+    bank = DuelBank(count=6, max_distance=300.0, ticks=3000)
+    serial = score(candidates, bank, workers=1)
+    assert score(candidates, bank, workers=2) == serial
+    assert all(0.0 <= value <= 1.0 for value in serial)
+
+
+def test_import_leaves_out_concurrent_futures():
+    code = "import sys, spaceship_sim.tuning; print('concurrent.futures' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parents[1], capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,35 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from spaceship_sim.recorder import OutcomeRecorder
+from spaceship_sim.rng import stream
+from spaceship_sim.simulation import Simulation
+from spaceship_sim.spaceship import Spaceship
+from spaceship_sim.vector import Vector
+
+
+@pytest.mark.parametrize("adaptive", [True, False])
+def test_long_run_does_not_grow_memory_with_ticks(adaptive):
+    # Never resolves within the limit, so every tick runs
+    rng = stream(99, 11)
+    ship1 = Spaceship(position=Vector.random_direction(rng) * 1000, direction=Vector.random_direction(rng), weapon_range=5, weapon_angle_degrees=1)
+    ship2 = Spaceship(position=Vector.random_direction(rng) * 1000, direction=Vector.random_direction(rng), weapon_range=5, weapon_angle_degrees=1)
+    sim = Simulation(ship1, ship2, ticks=10_000, recorder=OutcomeRecorder(), adaptive=adaptive, rng=rng)
+
+    tracemalloc.start()
+    try:
+        sim.run(max_ticks=1_000)
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        sim.run(max_ticks=8_000)
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert (sim.result, sim.tick_count) == ("ONGOING", 9_000)
+    # A few objects' worth, nowhere near a byte per tick
+    assert after - before < 4_096
+    assert peak - before < 16_384